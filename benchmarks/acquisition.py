@@ -0,0 +1,138 @@
+"""
+benchmarks/acquisition.py
+-------------------------
+
+Compare the sampling rate of threaded acquisition, one thread per adapter,
+with :py:class:`smbus3.acquisition.AcquisitionPool`, one worker process per
+adapter. Both modes write into the same shared memory rings, which the main
+process drains while decoding every frame.
+
+Without ``--bus``, adapters are simulated: the transfer ioctl fills the
+buffer and sleeps for ``--io-us`` microseconds, and workers are forked so
+that they inherit the simulation::
+
+    python benchmarks/acquisition.py --adapters 1 2 4
+    python benchmarks/acquisition.py --bus 1 3 --addr 0x40
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import smbus3.smbus3
+from smbus3 import SMBus
+from smbus3.acquisition import AcquisitionPool, SampleRing
+from smbus3.sampling import Sampler
+
+REGISTERS = 8
+LENGTH = 4
+
+
+def simulated_ioctl(io_us):
+    """Stand-in for ioctl, answering every transfer after ``io_us`` microseconds."""
+
+    def ioctl(fd, request, arg):
+        if request == smbus3.smbus3.I2C_FUNCS:
+            arg.value = smbus3.smbus3.I2cFunc.SMBUS_READ_I2C_BLOCK
+        elif request == smbus3.smbus3.I2C_SMBUS:
+            block = arg.data.contents.block
+            for idx in range(1, block[0] + 1):
+                block[idx] = idx
+            if io_us:
+                time.sleep(io_us / 1e6)
+
+    return ioctl
+
+
+def decode(frame):
+    """Representative decoding of one frame into signed words."""
+    return [
+        int.from_bytes(frame[idx : idx + 2], "little", signed=True)
+        for idx in range(0, len(frame), 2)
+    ]
+
+
+def drain(rings, seconds):
+    """Consume and decode samples for ``seconds``, returning the rate."""
+    end = time.monotonic() + seconds
+    count = 0
+    while time.monotonic() < end:
+        for ring in rings:
+            with ring.batch() as samples:
+                for sample in samples:
+                    decode(sample.frame)
+                count += len(samples)
+        time.sleep(0.001)
+    return count / seconds
+
+
+def sample_into(bus, registers, ring, stop):
+    """Thread body of the threaded mode."""
+    sampler = Sampler(SMBus(bus), registers, 0)
+    while not stop.is_set():
+        sample = sampler.sample()
+        ring.push(sample.seq, sample.timestamp_ns, sample.frame)
+    sampler.bus.close()
+
+
+def run_threads(tasks, seconds):
+    """Samples per second with one thread per adapter."""
+    rings = [SampleRing(REGISTERS * LENGTH, 4096) for _ in tasks]
+    stop = threading.Event()
+    workers = [
+        threading.Thread(target=sample_into, args=(bus, registers, ring, stop))
+        for (bus, registers), ring in zip(tasks, rings)  # noqa: B905
+    ]
+    for worker in workers:
+        worker.start()
+    rate = drain(rings, seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    for ring in rings:
+        ring.close()
+    return rate
+
+
+def run_processes(tasks, seconds, start_method):
+    """Samples per second with one worker process per adapter."""
+    with AcquisitionPool(tasks, 0, slots=4096, start_method=start_method) as pool:
+        return drain(pool.rings, seconds)
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--bus", nargs="+", help="real adapters, numbers or paths")
+    parser.add_argument("--addr", type=lambda x: int(x, 0), default=0x40)
+    parser.add_argument("--adapters", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--io-us", type=float, default=50.0)
+    args = parser.parse_args()
+
+    registers = [(args.addr, idx * LENGTH, LENGTH) for idx in range(REGISTERS)]
+    if args.bus is not None:
+        buses = [int(bus) if bus.isdigit() else bus for bus in args.bus]
+        counts, start_method, nodes = [len(buses)], None, []
+    else:
+        # Regular files stand in for the device nodes of simulated adapters
+        counts, start_method = args.adapters, "fork"
+        nodes = [tempfile.NamedTemporaryFile() for _ in range(max(counts))]
+        buses = [node.name for node in nodes]
+        mock.patch("smbus3.smbus3.ioctl", simulated_ioctl(args.io_us)).start()
+    for count in counts:
+        tasks = [(bus, registers) for bus in buses[:count]]
+        threaded = run_threads(tasks, args.seconds)
+        processes = run_processes(tasks, args.seconds, start_method)
+        print(
+            f"{count:>3} adapters  threads {threaded:9.0f} samples/s"
+            f"  processes {processes:9.0f} samples/s  ({processes / threaded:4.2f}x)"
+        )
+    for node in nodes:
+        node.close()
+
+
+if __name__ == "__main__":
+    main()
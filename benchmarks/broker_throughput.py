@@ -0,0 +1,82 @@
+"""
+benchmarks/broker_throughput.py
+-------------------------------
+
+Compare register read throughput of N concurrent clients going through a
+:py:class:`smbus3.broker.BusBroker` against N threads sharing direct
+:py:class:`smbus3.SMBus` access (serialized by a lock, as they would have to
+be to avoid interleaving).
+
+Requires a real adapter and a device answering at the given address::
+
+    python benchmarks/broker_throughput.py --bus 1 --addr 0x50 --clients 8
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from smbus3 import SMBus
+from smbus3.broker import BusBroker, SMBusClient
+
+
+def run_threads(clients, target):
+    """Run ``target`` in ``clients`` threads, returning elapsed seconds."""
+    threads = [threading.Thread(target=target) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def bench_direct(args):
+    """Every thread reads through one shared SMBus guarded by a lock."""
+    lock = threading.Lock()
+    with SMBus(args.bus) as bus:
+
+        def worker():
+            for _ in range(args.count):
+                with lock:
+                    bus.read_byte_data(args.addr, args.register)
+
+        return run_threads(args.clients, worker)
+
+
+def bench_broker(args):
+    """Every thread reads through its own broker client connection."""
+    path = os.path.join(tempfile.mkdtemp(), "broker.sock")
+    with BusBroker(args.bus, path, combine=args.combine) as broker:
+
+        def worker():
+            with SMBusClient(path) as client:
+                for _ in range(args.count):
+                    client.read_byte_data(args.addr, args.register)
+
+        elapsed = run_threads(args.clients, worker)
+        print(f"broker: {broker.requests} requests in {broker.transfers} transfers")
+        return elapsed
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--bus", type=int, default=1)
+    parser.add_argument("--addr", type=lambda x: int(x, 0), default=0x50)
+    parser.add_argument("--register", type=lambda x: int(x, 0), default=0)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--no-combine", dest="combine", action="store_false")
+    args = parser.parse_args()
+
+    total = args.clients * args.count
+    for name, bench in (("direct", bench_direct), ("broker", bench_broker)):
+        elapsed = bench(args)
+        print(f"{name}: {total} reads in {elapsed:.3f}s ({total / elapsed:.0f} reads/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+benchmarks/buffers.py
+---------------------
+
+Time raw I2C reads and writes (``SMBus.i2c_rd()`` and ``SMBus.i2c_wr()``)
+with per-message ctypes buffers and structures, then with messages leased
+from a :py:class:`smbus3.buffers.BufferPool`, and check that the pooled
+loop allocates no buffer once warm. The transfer ioctl does nothing, so the
+times are the library's own cost::
+
+    python benchmarks/buffers.py --transfers 200000 --length 16
+"""
+
+import argparse
+import tempfile
+import time
+from unittest import mock
+
+from smbus3 import SMBus
+from smbus3.buffers import BufferPool
+
+
+def noop_ioctl(fd, request, arg=0):
+    """Stand-in for ioctl, doing nothing."""
+    return 0
+
+
+def loop(bus, transfers, length, pool):
+    """Alternate reads and writes, returning ns per transfer."""
+    data = bytes(range(length))
+    start = time.perf_counter_ns()
+    for _ in range(transfers // 2):
+        if pool is None:
+            bus.i2c_rd(0x40, length)
+            bus.i2c_wr(0x40, data)
+        else:
+            pool.release(bus.i2c_rd(0x40, length))
+            pool.release(bus.i2c_wr(0x40, data))
+    return (time.perf_counter_ns() - start) / transfers
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--transfers", type=int, default=200000)
+    parser.add_argument("--length", type=int, default=16)
+    args = parser.parse_args()
+
+    pool = BufferPool()
+    with tempfile.NamedTemporaryFile() as node, mock.patch("smbus3.smbus3.ioctl", noop_ioctl):
+        with SMBus(node.name) as bus:
+            print(f"allocated: {loop(bus, args.transfers, args.length, None):8.0f} ns/transfer")
+            bus.pool = pool
+            print(f"pooled:    {loop(bus, args.transfers, args.length, pool):8.0f} ns/transfer")
+    print(f"pool: {pool.stats}, {pool.free_bytes} bytes idle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+benchmarks/free_threading.py
+----------------------------
+
+Measure how acquisition scales with threads, one adapter per thread, when
+every sample is read over the bus and decoded in pure Python. Run it with a
+free-threaded interpreter (e.g. ``python3.13t``) and with the regular build
+to compare: with the GIL, decoding does not scale past one core.
+
+Without ``--bus``, adapters are simulated: the transfer ioctl fills the
+buffer and sleeps for ``--io-us`` microseconds, like a kernel transfer that
+releases the interpreter::
+
+    python3.13t benchmarks/free_threading.py --threads 1 2 4 8
+    python3.13t benchmarks/free_threading.py --bus 1 3 --addr 0x40
+"""
+
+import argparse
+import sys
+import threading
+import time
+from unittest import mock
+
+import smbus3.smbus3
+from smbus3 import SMBus
+from smbus3.pec import crc8
+
+WORDS = 16
+
+
+def simulated_ioctl(io_us):
+    """Stand-in for ioctl, answering every transfer after ``io_us`` microseconds."""
+
+    def ioctl(fd, request, arg):
+        if request == smbus3.smbus3.I2C_FUNCS:
+            arg.value = smbus3.smbus3.I2cFunc.I2C | smbus3.smbus3.I2cFunc.SMBUS_READ_I2C_BLOCK
+        elif request == smbus3.smbus3.I2C_SMBUS:
+            block = arg.data.contents.block
+            for idx in range(1, 2 * WORDS + 1):
+                block[idx] = idx
+            if io_us:
+                time.sleep(io_us / 1e6)
+
+    return ioctl
+
+
+def decode(words):
+    """Representative pure-Python decoding of one sample."""
+    scaled = [((word ^ 0x8000) - 0x8000) * 0.125 for word in words]
+    checksum = crc8(bytes(word & 0xFF for word in words))
+    return sum(scaled) / len(scaled), checksum
+
+
+def acquire(bus, i2c_addr, seconds, counts, slot):
+    """Read and decode samples for ``seconds``, counting them in ``counts[slot]``."""
+    deadline = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < deadline:
+        decode(bus.read_words(i2c_addr, 0x00, WORDS))
+        count += 1
+    counts[slot] = count
+
+
+def run(buses, i2c_addr, threads, seconds):
+    """Samples per second with ``threads`` threads spread over ``buses``."""
+    opened = [SMBus(buses[idx % len(buses)], shared=True) for idx in range(threads)]
+    counts = [0] * threads
+    workers = [
+        threading.Thread(target=acquire, args=(opened[idx], i2c_addr, seconds, counts, idx))
+        for idx in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    for bus in opened:
+        bus.close()
+    return sum(counts) / seconds
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--bus", type=int, nargs="+", help="real adapters, one per thread")
+    parser.add_argument("--addr", type=lambda x: int(x, 0), default=0x40)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--io-us", type=float, default=100.0)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    patches = []
+    if args.bus is None:
+        patches = [
+            mock.patch("smbus3.smbus3.os.open", lambda *a: 1000),
+            mock.patch("smbus3.smbus3.os.close", lambda fd: None),
+            mock.patch("smbus3.smbus3.ioctl", simulated_ioctl(args.io_us)),
+        ]
+    for patch in patches:
+        patch.start()
+    try:
+        base = None
+        for threads in args.threads:
+            # Simulated adapters: one per thread
+            buses = args.bus or list(range(threads))
+            rate = run(buses, args.addr, threads, args.seconds)
+            base = base or rate / threads
+            print(f"{threads:>3} threads {rate:10.0f} samples/s  speedup {rate / base:5.2f}x")
+    finally:
+        for patch in patches:
+            patch.stop()
+
+
+if __name__ == "__main__":
+    main()
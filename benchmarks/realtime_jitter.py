@@ -0,0 +1,109 @@
+"""
+benchmarks/realtime_jitter.py
+-----------------------------
+
+Measure the timing jitter of a periodic sampling loop, first as a regular
+thread, then with real-time options (CPU pinning, ``SCHED_FIFO``, locked and
+pre-faulted memory). Options which are not permitted are reported and
+skipped; run as root, or with ``CAP_SYS_NICE`` and ``CAP_IPC_LOCK``, to
+apply them all.
+
+Without ``--bus``, the adapter is simulated: the transfer ioctl fills the
+buffer and sleeps for ``--io-us`` microseconds. Load the machine (e.g. with
+``stress-ng --cpu 0``) to see the difference::
+
+    python benchmarks/realtime_jitter.py --rate 1000 --cpu 1 --priority 80
+    python benchmarks/realtime_jitter.py --bus 1 --addr 0x40 --cpu 1 --priority 80
+"""
+
+import argparse
+import tempfile
+import time
+from itertools import islice
+from unittest import mock
+
+import smbus3.smbus3
+from smbus3 import SMBus
+from smbus3.realtime import RealtimeOptions
+from smbus3.sampling import Sampler
+
+REGISTERS = 4
+LENGTH = 2
+
+
+def simulated_ioctl(io_us):
+    """Stand-in for ioctl, answering every transfer after ``io_us`` microseconds."""
+
+    def ioctl(fd, request, arg):
+        if request == smbus3.smbus3.I2C_FUNCS:
+            arg.value = smbus3.smbus3.I2cFunc.SMBUS_READ_I2C_BLOCK
+        elif request == smbus3.smbus3.I2C_SMBUS:
+            block = arg.data.contents.block
+            for idx in range(1, block[0] + 1):
+                block[idx] = idx
+            if io_us:
+                time.sleep(io_us / 1e6)
+
+    return ioctl
+
+
+def measure(bus, registers, rate, seconds, realtime):
+    """Run the sampling loop, returning its jitter statistics and options report."""
+    sampler = Sampler(bus, registers, 1 / rate, clock=time.CLOCK_MONOTONIC, realtime=realtime)
+    for _ in islice(sampler, int(rate * seconds)):
+        pass
+    return sampler.jitter.statistics(), sampler.realtime_report
+
+
+def show(label, stats):
+    """Print one line of statistics, in microseconds."""
+    deviation = "  ".join(
+        f"p{percentile} {value / 1000:8.1f}" for percentile, value in stats.deviation_ns.items()
+    )
+    print(
+        f"{label:<10} interval {stats.interval_mean_ns / 1000:8.1f} "
+        f"+/- {stats.interval_stddev_ns / 1000:6.1f} us  deviation (us) {deviation}"
+    )
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--bus", help="real adapter, number or path")
+    parser.add_argument("--addr", type=lambda x: int(x, 0), default=0x40)
+    parser.add_argument("--rate", type=float, default=1000.0, help="samples per second")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--io-us", type=float, default=100.0)
+    parser.add_argument("--cpu", type=int, nargs="+", help="CPUs to pin the loop to")
+    parser.add_argument("--priority", type=int, default=80, help="SCHED_FIFO priority")
+    parser.add_argument("--prefault", type=int, default=8 << 20, help="bytes of heap")
+    args = parser.parse_args()
+
+    registers = [(args.addr, idx * LENGTH, LENGTH) for idx in range(REGISTERS)]
+    node = None
+    if args.bus is None:
+        # A regular file stands in for the device node of the simulated adapter
+        node = tempfile.NamedTemporaryFile()
+        path = node.name
+        mock.patch("smbus3.smbus3.ioctl", simulated_ioctl(args.io_us)).start()
+    else:
+        path = int(args.bus) if args.bus.isdigit() else args.bus
+    realtime = RealtimeOptions(args.cpu, args.priority, lock_memory=True, prefault=args.prefault)
+    with SMBus(path) as bus:
+        stats, _ = measure(bus, registers, args.rate, args.seconds, None)
+        show("regular", stats)
+        stats, report = measure(bus, registers, args.rate, args.seconds, realtime)
+        show("real-time", stats)
+    print(
+        f"applied: affinity={report.affinity and sorted(report.affinity)} "
+        f"priority={report.priority} memory_locked={report.memory_locked} "
+        f"prefaulted={report.prefaulted}"
+    )
+    for option, reason in report.errors.items():
+        print(f"skipped {option}: {reason}")
+    if node is not None:
+        node.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+benchmarks/script.py
+--------------------
+
+Replay a polling sequence of register reads, one ``i2c_rdwr()`` call per
+line as a line-by-line interpreter would, then as a compiled
+:py:mod:`smbus3.script` plan packing the lines into combined transfers.
+The adapter is simulated with ``--byte-us`` microseconds of wire time per
+byte, or real with ``--bus``::
+
+    python benchmarks/script.py --reads 500
+    python benchmarks/script.py --bus 1 --addr 0x40 --reads 200
+"""
+
+import argparse
+import time
+
+from smbus3 import SMBus, i2c_msg
+from smbus3.script import compile_script
+from smbus3.simulator import RegisterDevice, SimulatedAdapter, simulate
+
+REPEAT = 20
+
+
+def timed(function):
+    """Best time of REPEAT calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def run(bus, addr, reads):
+    """Time both ways of running the sequence and print the results."""
+    registers = [idx * 7 & 0xFF for idx in range(reads)]
+    script = "\n".join(f"w1@0x{addr:02x} {register} r2" for register in registers)
+
+    def per_line():
+        for register in registers:
+            bus.i2c_rdwr(i2c_msg.write(addr, [register]), i2c_msg.read(addr, 2))
+
+    plan = compile_script(script)
+    print(f"per line: {reads:5d} ioctls {timed(per_line):8.2f} ms")
+    print(f"compiled: {plan.ioctls:5d} ioctls {timed(lambda: plan.run(bus)):8.2f} ms")
+    print(f"compile:  {timed(lambda: compile_script(script)):21.2f} ms")
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--bus", help="real adapter, number or path")
+    parser.add_argument("--addr", type=lambda x: int(x, 0), default=0x40)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--byte-us", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.bus is not None:
+        with SMBus(int(args.bus) if args.bus.isdigit() else args.bus) as bus:
+            run(bus, args.addr, args.reads)
+        return
+    adapter = SimulatedAdapter([RegisterDevice(args.addr)], byte_ns=int(args.byte_us * 1000))
+    with simulate({1: adapter}), SMBus(1) as bus:
+        run(bus, args.addr, args.reads)
+
+
+if __name__ == "__main__":
+    main()
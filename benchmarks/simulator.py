@@ -0,0 +1,75 @@
+"""
+benchmarks/simulator.py
+-----------------------
+
+Measure the cost of :py:mod:`smbus3.simulator` per transfer, against an
+ioctl which does nothing, so that load tests can tell the library's own
+overhead from the simulation's. Every transfer addresses another of
+``--devices`` register devices on one simulated adapter::
+
+    python benchmarks/simulator.py --devices 100 --transfers 100000
+"""
+
+import argparse
+import tempfile
+import time
+from unittest import mock
+
+from smbus3 import SMBus, i2c_msg
+from smbus3.simulator import RegisterDevice, SimulatedAdapter, simulate
+
+FIRST = 0x08
+LENGTH = 4
+
+
+def noop_ioctl(fd, request, arg=0):
+    """Stand-in for ioctl, doing nothing."""
+    return 0
+
+
+def run(bus, addresses, transfers):
+    """Time byte, block and combined reads, returning ns per transfer for each."""
+    results = {}
+    count = len(addresses)
+    start = time.perf_counter_ns()
+    for idx in range(transfers):
+        bus.read_byte_data(addresses[idx % count], 0x10)
+    results["read_byte_data"] = (time.perf_counter_ns() - start) / transfers
+    start = time.perf_counter_ns()
+    for idx in range(transfers):
+        bus.read_i2c_block_data(addresses[idx % count], 0x10, LENGTH)
+    results["read_i2c_block_data"] = (time.perf_counter_ns() - start) / transfers
+    start = time.perf_counter_ns()
+    for idx in range(transfers):
+        bus.i2c_rdwr(
+            i2c_msg.write(addresses[idx % count], [0x10]),
+            i2c_msg.read(addresses[idx % count], LENGTH),
+        )
+    results["i2c_rdwr"] = (time.perf_counter_ns() - start) / transfers
+    return results
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--transfers", type=int, default=100000)
+    args = parser.parse_args()
+
+    addresses = [FIRST + idx for idx in range(args.devices)]
+    with (
+        tempfile.NamedTemporaryFile() as node,
+        mock.patch("smbus3.smbus3.ioctl", noop_ioctl),
+        SMBus(node.name) as bus,
+    ):
+        baseline = run(bus, addresses, args.transfers)
+    adapter = SimulatedAdapter(RegisterDevice(address) for address in addresses)
+    with simulate({1: adapter}), SMBus(1) as bus:
+        simulated = run(bus, addresses, args.transfers)
+    print(f"{'transfer':<20} {'no-op ioctl':>12} {'simulated':>12} {'overhead':>12}  (ns)")
+    for name, value in simulated.items():
+        print(f"{name:<20} {baseline[name]:12.0f} {value:12.0f} {value - baseline[name]:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
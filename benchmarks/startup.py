@@ -0,0 +1,66 @@
+"""
+benchmarks/startup.py
+---------------------
+
+Measure the cold-start cost of a one-shot tool: a fresh interpreter that
+imports smbus3, opens the adapter, reads one byte and exits, with and
+without a persisted :py:class:`smbus3.capabilities.CapabilityCache`.
+
+Requires a real adapter and a device answering at the given address::
+
+    python benchmarks/startup.py --bus 1 --addr 0x50
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ONE_SHOT = """
+import sys
+from smbus3 import SMBus
+from smbus3.capabilities import CapabilityCache
+cache = CapabilityCache(sys.argv[3]) if sys.argv[3] else None
+with SMBus(int(sys.argv[1]), cache=cache) as bus:
+    bus.read_byte(int(sys.argv[2], 0))
+    bus.funcs
+if cache is not None:
+    cache.save()
+"""
+
+
+def run(argv, repeat):
+    """Median wall time in milliseconds of running ``argv`` ``repeat`` times."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, check=True)
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples)
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--bus", type=int, default=1)
+    parser.add_argument("--addr", default="0x50")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    python = [sys.executable, "-S"]
+    baseline = run([*python, "-c", "pass"], args.repeat)
+    imported = run([*python, "-c", "import smbus3"], args.repeat)
+    print(f"interpreter        {baseline:8.2f} ms")
+    print(f"import smbus3      {imported - baseline:8.2f} ms")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "funcs.json")
+        for name, cache in (("open+read", ""), ("open+read cached", path)):
+            elapsed = run([*python, "-c", ONE_SHOT, str(args.bus), args.addr, cache], args.repeat)
+            print(f"{name:<18} {elapsed - baseline:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
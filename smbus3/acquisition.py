@@ -0,0 +1,456 @@
+"""
+smbus3.acquisition - Sampling several adapters from worker processes.
+
+An :py:class:`AcquisitionPool` spreads sampling tasks, one adapter and its
+registers each, over worker processes. Every worker opens its own
+:py:class:`~smbus3.SMBus` instances and writes the sampled frames into one
+:py:class:`SampleRing` per task: a single-producer, single-consumer ring
+buffer in shared memory. The parent process consumes the samples in batches
+of views into the segment, without copying the frames.
+
+Buses are always opened by the workers, whether they are started with
+``fork`` or ``spawn``. Instances inherited through ``fork`` are reset in the
+child and reopened on first use, see :py:class:`~smbus3.SMBus`.
+
+Ring layout (all little-endian):
+
+- header: ``magic:4s frame_size:u32 slots:u32 pad:u32 head:u64 tail:u64
+  dropped:u64 skipped:u64 errors:u64``
+- ``slots`` slots: ``seq:u64 timestamp_ns:i64`` followed by the frame,
+  padded to a multiple of 8 bytes.
+
+``head`` and ``tail`` count the samples written and consumed since the ring
+was created. The producer only writes ``head`` and the counters, the consumer
+only writes ``tail``. A sample arriving while the ring is full is dropped and
+counted.
+"""
+
+import contextlib
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from struct import Struct
+
+from .realtime import RealtimeOptions
+from .sampling import Sample, Sampler
+from .smbus3 import SMBus
+from .snapshot import _attach, _published
+
+RING_MAGIC = b"SMBR"
+
+_HEADER = Struct("<4sII4x")
+_COUNTER = Struct("<Q")
+_HEAD_OFFSET = 16
+_TAIL_OFFSET = 24
+_DROPPED_OFFSET = 32
+_SKIPPED_OFFSET = 40
+_ERRORS_OFFSET = 48
+_SLOTS_OFFSET = 56
+_SLOT = Struct("<Qq")
+
+
+class SampleRing:
+    """
+    Ring buffer of samples in a shared memory segment, written by one
+    process and consumed by another.
+    """
+
+    def __init__(self, frame_size=0, slots=1024, name=None, track=False):
+        """
+        Create a ring, or attach to an existing one.
+
+        :param frame_size: size of the frames, in bytes.
+        :type frame_size: int
+        :param slots: number of samples the ring holds.
+        :type slots: int
+        :param name: name of an existing ring to attach to. Its frame size
+            and number of slots are read from the segment.
+        :type name: str
+        :param track: when attaching, keep the segment registered with the
+            resource tracker, as worker processes sharing the tracker of
+            the creator do.
+        :type track: bool
+        :raise ValueError: if slots is not positive, or the segment is not a ring.
+        """
+        if name is None:
+            if slots < 1:
+                raise ValueError(f"Unexpected slots={slots}")
+            slot_size = (_SLOT.size + frame_size + 7) & ~7
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=_SLOTS_OFFSET + slots * slot_size
+            )
+            self.shm.buf[:_SLOTS_OFFSET] = bytes(_SLOTS_OFFSET)
+            _HEADER.pack_into(self.shm.buf, 0, RING_MAGIC, frame_size, slots)
+            _published.add(self.shm.name)
+            self._owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name) if track else _attach(name)
+            magic, frame_size, slots = _HEADER.unpack_from(self.shm.buf, 0)
+            if magic != RING_MAGIC:
+                self.shm.close()
+                raise ValueError(f"Segment {name} is not a sample ring")
+            self._owner = False
+        self.frame_size = frame_size
+        self.slots = slots
+        self._slot_size = (_SLOT.size + frame_size + 7) & ~7
+
+    def __enter__(self):
+        """Enter handler."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.close()
+
+    def __len__(self):
+        return self._counter(_HEAD_OFFSET) - self._counter(_TAIL_OFFSET)
+
+    @property
+    def name(self):
+        """
+        Name of the segment, to attach to the ring from another process.
+
+        :rtype: str
+        """
+        return self.shm.name
+
+    @property
+    def dropped(self):
+        """
+        Number of samples dropped because the ring was full.
+
+        :rtype: int
+        """
+        return self._counter(_DROPPED_OFFSET)
+
+    @property
+    def skipped(self):
+        """
+        Number of sampling cycles which exceeded their deadline.
+
+        :rtype: int
+        """
+        return self._counter(_SKIPPED_OFFSET)
+
+    @property
+    def errors(self):
+        """
+        Number of sampling cycles which failed with an ``OSError``.
+
+        :rtype: int
+        """
+        return self._counter(_ERRORS_OFFSET)
+
+    def _counter(self, offset):
+        """
+        Read a header counter.
+        Private.
+        """
+        return _COUNTER.unpack_from(self.shm.buf, offset)[0]
+
+    def count(self, counter):
+        """
+        Increment the ``"skipped"`` or ``"errors"`` counter. Producer side.
+
+        :param counter: name of the counter.
+        :type counter: str
+        :raise ValueError: on an unknown counter.
+        :rtype: None
+        """
+        offsets = {"skipped": _SKIPPED_OFFSET, "errors": _ERRORS_OFFSET}
+        if counter not in offsets:
+            raise ValueError(f"Unexpected counter={counter!r}")
+        offset = offsets[counter]
+        _COUNTER.pack_into(self.shm.buf, offset, self._counter(offset) + 1)
+
+    def push(self, seq, timestamp_ns, frame):
+        """
+        Append a sample. Producer side.
+
+        :param seq: sequence number of the sample.
+        :type seq: int
+        :param timestamp_ns: timestamp of the sample.
+        :type timestamp_ns: int
+        :param frame: register contents, :py:attr:`frame_size` bytes.
+        :type frame: bytes
+        :return: False if the ring was full and the sample was dropped
+        :rtype: bool
+        """
+        buf = self.shm.buf
+        head = self._counter(_HEAD_OFFSET)
+        if head - self._counter(_TAIL_OFFSET) >= self.slots:
+            _COUNTER.pack_into(buf, _DROPPED_OFFSET, self._counter(_DROPPED_OFFSET) + 1)
+            return False
+        offset = _SLOTS_OFFSET + (head % self.slots) * self._slot_size
+        _SLOT.pack_into(buf, offset, seq, timestamp_ns)
+        start = offset + _SLOT.size
+        buf[start : start + self.frame_size] = frame
+        # Publish the slot only once it is complete
+        _COUNTER.pack_into(buf, _HEAD_OFFSET, head + 1)
+        return True
+
+    @contextlib.contextmanager
+    def batch(self, max_samples=None):
+        """
+        Consume the samples available. Consumer side.
+
+        The frames of the samples are views into the segment: they are
+        only valid inside the ``with`` block, after which their slots are
+        handed back to the producer. Copy what needs to outlive the batch.
+
+        :param max_samples: optional limit on the number of samples.
+        :type max_samples: int
+        :return: Context manager yielding a list of
+            :py:class:`~smbus3.sampling.Sample`, oldest first
+        """
+        buf = self.shm.buf
+        tail = self._counter(_TAIL_OFFSET)
+        available = self._counter(_HEAD_OFFSET) - tail
+        if max_samples is not None:
+            available = min(available, max_samples)
+        samples = []
+        for idx in range(tail, tail + available):
+            offset = _SLOTS_OFFSET + (idx % self.slots) * self._slot_size
+            seq, timestamp_ns = _SLOT.unpack_from(buf, offset)
+            start = offset + _SLOT.size
+            samples.append(Sample(seq, timestamp_ns, buf[start : start + self.frame_size]))
+        try:
+            yield samples
+        finally:
+            for sample in samples:
+                sample.frame.release()
+            _COUNTER.pack_into(buf, _TAIL_OFFSET, tail + available)
+
+    def close(self):
+        """
+        Detach from the ring. The process which created it also destroys it.
+
+        :rtype: None
+        """
+        self.shm.close()
+        if self._owner:
+            self._owner = False
+            _published.discard(self.shm.name)
+            self.shm.unlink()
+
+
+def _acquire(assignments, interval, deadline_us, stop, realtime, reports):  # noqa: PLR0913
+    """
+    Worker process: open the buses and sample them into their rings until
+    ``stop`` is set, after applying the real-time options and reporting
+    them as ``(worker name, RealtimeReport)``.
+    Private.
+    """
+    tasks = []
+    try:
+        for bus, registers, name in assignments:
+            ring = SampleRing(name=name, track=True)
+            tasks.append((Sampler(SMBus(bus), registers, interval, deadline_us), ring))
+        if realtime is not None:
+            reports.put((multiprocessing.current_process().name, realtime.apply()))
+            # Allocate the lazily created buffers of the buses before the loop
+            for sampler, _ in tasks:
+                try:
+                    sampler.read_frame()
+                except OSError:
+                    pass
+        deadline = time.monotonic()
+        while not stop.is_set():
+            for sampler, ring in tasks:
+                try:
+                    sample = sampler.sample()
+                except TimeoutError:
+                    ring.count("skipped")
+                except OSError:
+                    ring.count("errors")
+                else:
+                    ring.push(*sample)
+            deadline += interval
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                stop.wait(delay)
+    finally:
+        for sampler, ring in tasks:
+            sampler.bus.close()
+            ring.close()
+
+
+class AcquisitionPool:
+    """
+    Samples several adapters in parallel, from worker processes.
+
+    :ivar rings: one :py:class:`SampleRing` per task, in task order.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        tasks,
+        interval,
+        slots=1024,
+        deadline_us=None,
+        processes=None,
+        start_method=None,
+        realtime=None,
+    ):
+        """
+        Configure the pool and create its rings.
+
+        :param tasks: ``(bus, registers)`` pairs, each sampled by one worker.
+            ``bus`` is an i2c bus number or device path, ``registers`` the
+            ``(i2c_addr, register, length)`` triples to sample, as for
+            :py:class:`~smbus3.sampling.Sampler`.
+        :type tasks: list
+        :param interval: sampling period in seconds.
+        :type interval: float
+        :param slots: number of samples each ring holds.
+        :type slots: int
+        :param deadline_us: optional time budget for sampling a task once,
+            in microseconds. Late cycles are counted in
+            :py:attr:`SampleRing.skipped`.
+        :type deadline_us: float
+        :param processes: number of worker processes, tasks being spread
+            over them. Defaults to one per task.
+        :type processes: int
+        :param start_method: ``"fork"``, ``"spawn"`` or ``"forkserver"``.
+            Defaults to the platform default.
+        :type start_method: str
+        :param realtime: real-time options applied by every worker, or a
+            list of options, one per worker (e.g. to pin each to its own CPU).
+        :type realtime: RealtimeOptions or list
+        :raise TypeError: if a task is given an open :py:class:`~smbus3.SMBus`.
+        :raise ValueError: if the list of real-time options does not match
+            the number of workers.
+        """
+        for bus, _ in tasks:
+            if isinstance(bus, SMBus):
+                raise TypeError("Buses are opened by the workers, pass a bus number or path")
+        self.tasks = [(bus, [tuple(entry) for entry in registers]) for bus, registers in tasks]
+        self.interval = interval
+        self.deadline_us = deadline_us
+        count = len(self.tasks) if processes is None else max(1, min(processes, len(self.tasks)))
+        if realtime is None or isinstance(realtime, RealtimeOptions):
+            realtime = [realtime] * count
+        self._realtime = list(realtime)
+        if len(self._realtime) != count:
+            raise ValueError(f"Expected real-time options for {count} workers")
+        self.rings = []
+        for _, registers in self.tasks:
+            frame_size = sum(length for _, _, length in registers)
+            self.rings.append(SampleRing(frame_size, slots))
+        self._context = multiprocessing.get_context(start_method)
+        self._stop = self._context.Event()
+        self._reports = self._context.SimpleQueue()
+        self._realtime_reports = {}
+        self._processes = []
+        # Exit codes of the failed workers of the last run, kept by stop()
+        self._exitcodes = {}
+        self._assignments = [[] for _ in range(count)]
+        for idx, ((bus, registers), ring) in enumerate(zip(self.tasks, self.rings)):  # noqa: B905
+            self._assignments[idx % count].append((bus, registers, ring.name))
+
+    def __enter__(self):
+        """Enter handler, starting the workers."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.close()
+
+    def start(self):
+        """
+        Start the worker processes.
+
+        :raise RuntimeError: if the workers are already running.
+        :rtype: None
+        """
+        if self._processes:
+            raise RuntimeError("Acquisition is already running")
+        self._stop.clear()
+        self._exitcodes = {}
+        for idx, assignments in enumerate(self._assignments):
+            process = self._context.Process(
+                target=_acquire,
+                args=(
+                    assignments,
+                    self.interval,
+                    self.deadline_us,
+                    self._stop,
+                    self._realtime[idx],
+                    self._reports,
+                ),
+                name=f"smbus3-acquisition-{idx}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    def stop(self, timeout=None):
+        """
+        Stop the worker processes. Samples already in the rings can still
+        be consumed.
+
+        :param timeout: time in seconds to wait for each worker before
+            terminating it.
+        :type timeout: float
+        :rtype: None
+        """
+        self._stop.set()
+        for idx, process in enumerate(self._processes):
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            elif process.exitcode != 0:
+                self._exitcodes[idx] = process.exitcode
+        self._processes = []
+
+    def failed(self):
+        """
+        Workers which exited on an error, e.g. because a bus could not be
+        opened, since the last :py:meth:`start`. Workers terminated by
+        :py:meth:`stop` are not included.
+
+        :return: exit codes by worker index
+        :rtype: dict
+        """
+        failed = dict(self._exitcodes)
+        for idx, process in enumerate(self._processes):
+            if process.exitcode not in (None, 0):
+                failed[idx] = process.exitcode
+        return failed
+
+    def realtime_reports(self):
+        """
+        Real-time options applied by the workers which started so far.
+
+        :return: ``{worker name: RealtimeReport}``
+        :rtype: dict
+        """
+        while not self._reports.empty():
+            name, report = self._reports.get()
+            self._realtime_reports[name] = report
+        return dict(self._realtime_reports)
+
+    def batch(self, task, max_samples=None):
+        """
+        Consume the samples of one task, see :py:meth:`SampleRing.batch`.
+
+        :param task: index of the task.
+        :type task: int
+        :param max_samples: optional limit on the number of samples.
+        :type max_samples: int
+        :return: Context manager yielding a list of
+            :py:class:`~smbus3.sampling.Sample`
+        """
+        return self.rings[task].batch(max_samples)
+
+    def close(self):
+        """
+        Stop the workers and destroy the rings.
+
+        :rtype: None
+        """
+        self.stop()
+        for ring in self.rings:
+            ring.close()
@@ -0,0 +1,68 @@
+from collections.abc import Sequence
+from contextlib import AbstractContextManager
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+
+from .realtime import RealtimeOptions, RealtimeReport
+from .sampling import Sample
+
+RING_MAGIC: bytes
+
+class SampleRing:
+    shm: SharedMemory
+    frame_size: int
+    slots: int
+    def __init__(
+        self, frame_size: int = 0, slots: int = 1024, name: str | None = None, track: bool = False
+    ) -> None: ...
+    def __enter__(self) -> SampleRing: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def name(self) -> str: ...
+    @property
+    def dropped(self) -> int: ...
+    @property
+    def skipped(self) -> int: ...
+    @property
+    def errors(self) -> int: ...
+    def count(self, counter: str) -> None: ...
+    def push(self, seq: int, timestamp_ns: int, frame: bytes | bytearray | memoryview) -> bool: ...
+    def batch(self, max_samples: int | None = None) -> AbstractContextManager[list[Sample]]: ...
+    def close(self) -> None: ...
+
+class AcquisitionPool:
+    tasks: list[tuple[int | str, list[tuple[int, int, int]]]]
+    interval: float
+    deadline_us: float | None
+    rings: list[SampleRing]
+    def __init__(  # noqa: PLR0913
+        self,
+        tasks: Sequence[tuple[int | str, Sequence[Sequence[int]]]],
+        interval: float,
+        slots: int = 1024,
+        deadline_us: float | None = None,
+        processes: int | None = None,
+        start_method: str | None = None,
+        realtime: RealtimeOptions | Sequence[RealtimeOptions | None] | None = None,
+    ) -> None: ...
+    def __enter__(self) -> AcquisitionPool: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    def start(self) -> None: ...
+    def stop(self, timeout: float | None = None) -> None: ...
+    def failed(self) -> dict[int, int]: ...
+    def realtime_reports(self) -> dict[str, RealtimeReport]: ...
+    def batch(
+        self, task: int, max_samples: int | None = None
+    ) -> AbstractContextManager[list[Sample]]: ...
+    def close(self) -> None: ...
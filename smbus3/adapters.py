@@ -0,0 +1,245 @@
+"""
+smbus3.adapters - Discover i2c adapters and their topology from sysfs.
+
+:py:class:`AdapterRegistry` enumerates ``/sys/bus/i2c/devices`` once and
+indexes every adapter by number and name, together with its parent mux
+(for adapters created by kernel i2c-mux drivers) and the client addresses
+bound to kernel drivers. Finding an adapter is then a dictionary lookup
+instead of opening every ``/dev/i2c-*`` node in turn.
+"""
+
+import os
+from collections import namedtuple
+
+from .smbus3 import SMBus
+
+I2C_ADDR_OFFSET_TEN_BIT = 0xA000
+"""
+Marker of ten bit client addresses in sysfs names (``3-a050``), kept in
+the keys of :py:attr:`Adapter.clients` to tell them from seven bit ones.
+"""
+
+Adapter = namedtuple(
+    "Adapter", ["number", "name", "path", "parent", "mux_address", "channel", "clients"]
+)
+"""
+An i2c adapter.
+
+:ivar number: adapter number (``N`` in ``/dev/i2c-N``).
+:ivar name: adapter name as reported by the kernel.
+:ivar path: character device path, or None without i2c-dev.
+:ivar parent: number of the parent adapter for mux channels, else None.
+:ivar mux_address: address of the mux on the parent adapter, else None.
+:ivar channel: channel of the mux this adapter represents, else None.
+:ivar clients: ``{address: name}`` of clients instantiated by the kernel,
+    ten bit addresses being or'ed with :py:data:`I2C_ADDR_OFFSET_TEN_BIT`.
+"""
+
+
+def _read_name(path):
+    """
+    Contents of the ``name`` attribute in a sysfs directory.
+    Private.
+    """
+    try:
+        with open(os.path.join(path, "name")) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _parse_client(entry):
+    """
+    Split a client directory name such as ``3-0070`` into
+    ``(3, 0x70, False)``, or return None for other entries. Ten bit
+    addresses (``3-a050``) carry the ``0xa000`` marker, which is turned into
+    the last item: ``(3, 0x50, True)``.
+    Private.
+    """
+    bus, sep, addr = entry.partition("-")
+    if not sep or not bus.isdigit():
+        return None
+    try:
+        addr = int(addr, 16)
+    except ValueError:
+        return None
+    tenbit = addr & I2C_ADDR_OFFSET_TEN_BIT == I2C_ADDR_OFFSET_TEN_BIT
+    return int(bus), addr & 0x3FF, tenbit
+
+
+class AdapterRegistry:
+    """
+    Index of the i2c adapters present on the system.
+    """
+
+    def __init__(self, sysfs="/sys", devfs="/dev"):
+        """
+        Scan the adapters.
+
+        :param sysfs: sysfs mount point, for testing against a fake tree.
+        :type sysfs: str
+        :param devfs: directory holding the ``i2c-N`` device nodes.
+        :type devfs: str
+        """
+        self.sysfs = sysfs
+        self.devfs = devfs
+        self.adapters = {}
+        self._by_name = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-read sysfs, e.g. after adapters were added or removed.
+
+        :rtype: None
+        """
+        devices = os.path.join(self.sysfs, "bus", "i2c", "devices")
+        i2c_dev = os.path.join(self.sysfs, "class", "i2c-dev")
+        try:
+            entries = sorted(os.listdir(devices))
+        except FileNotFoundError:
+            entries = []
+
+        clients = {}
+        for entry in entries:
+            parsed = _parse_client(entry)
+            if parsed is not None:
+                number, addr, tenbit = parsed
+                if tenbit:
+                    addr |= I2C_ADDR_OFFSET_TEN_BIT
+                clients.setdefault(number, {})[addr] = _read_name(os.path.join(devices, entry))
+
+        adapters = {}
+        for entry in entries:
+            if not entry.startswith("i2c-") or not entry[4:].isdigit():
+                continue
+            number = int(entry[4:])
+            directory = os.path.join(devices, entry)
+            parent = mux_address = channel = None
+            mux_device = os.path.join(directory, "mux_device")
+            if os.path.islink(mux_device):
+                mux = os.path.realpath(mux_device)
+                parsed = _parse_client(os.path.basename(mux))
+                if parsed is not None:
+                    parent, mux_address, _ = parsed
+                channel = self._mux_channel(mux, number)
+            path = None
+            if os.path.exists(os.path.join(i2c_dev, entry)):
+                path = os.path.join(self.devfs, entry)
+            adapters[number] = Adapter(
+                number,
+                _read_name(directory),
+                path,
+                parent,
+                mux_address,
+                channel,
+                clients.get(number, {}),
+            )
+
+        by_name = {}
+        for adapter in sorted(adapters.values()):
+            by_name.setdefault(adapter.name, []).append(adapter)
+        self.adapters = adapters
+        self._by_name = by_name
+
+    @staticmethod
+    def _mux_channel(mux, number):
+        """
+        Find the ``channel-K`` link of a mux device pointing at adapter
+        ``number``.
+        Private.
+        """
+        target = f"i2c-{number}"
+        try:
+            entries = os.listdir(mux)
+        except OSError:
+            return None
+        for entry in entries:
+            if entry.startswith("channel-") and entry[8:].isdigit():
+                if os.path.basename(os.path.realpath(os.path.join(mux, entry))) == target:
+                    return int(entry[8:])
+        return None
+
+    def __iter__(self):
+        return iter(sorted(self.adapters.values()))
+
+    def __len__(self):
+        return len(self.adapters)
+
+    def get(self, number):
+        """
+        Look up an adapter by number.
+
+        :param number: adapter number.
+        :type number: int
+        :raise KeyError: if there is no such adapter.
+        :rtype: Adapter
+        """
+        return self.adapters[number]
+
+    def find(self, name):
+        """
+        All adapters with the given name, ordered by number.
+
+        :param name: adapter name, e.g. ``"Synopsys DesignWare I2C adapter"``.
+        :type name: str
+        :rtype: list
+        """
+        return list(self._by_name.get(name, ()))
+
+    def lookup(self, name):
+        """
+        The adapter with the given name.
+
+        :param name: adapter name.
+        :type name: str
+        :raise KeyError: if no adapter has that name.
+        :raise ValueError: if several adapters share that name.
+        :rtype: Adapter
+        """
+        matches = self._by_name.get(name)
+        if not matches:
+            raise KeyError(name)
+        if len(matches) > 1:
+            numbers = ", ".join(str(adapter.number) for adapter in matches)
+            raise ValueError(f"Adapter name {name!r} is ambiguous: {numbers}")
+        return matches[0]
+
+    def children(self, number):
+        """
+        Adapters created by muxes sitting on adapter ``number``.
+
+        :param number: parent adapter number.
+        :type number: int
+        :rtype: list
+        """
+        return [adapter for adapter in self if adapter.parent == number]
+
+    def root(self, number):
+        """
+        The physical adapter at the top of the mux tree containing ``number``.
+
+        :param number: adapter number.
+        :type number: int
+        :rtype: Adapter
+        """
+        adapter = self.adapters[number]
+        while adapter.parent is not None and adapter.parent in self.adapters:
+            adapter = self.adapters[adapter.parent]
+        return adapter
+
+    def open(self, name, force=False):
+        """
+        Open the adapter with the given name (or number).
+
+        :param name: adapter name or number.
+        :type name: str or int
+        :param force: passed on to :py:class:`~smbus3.SMBus`.
+        :type force: bool
+        :raise OSError: if the adapter has no i2c-dev device node.
+        :rtype: SMBus
+        """
+        adapter = self.get(name) if isinstance(name, int) else self.lookup(name)
+        if adapter.path is None:
+            raise OSError(f"Adapter {adapter.number} has no i2c-dev device node")
+        return SMBus(adapter.path, force=force)
@@ -0,0 +1,35 @@
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from .smbus3 import SMBus
+
+I2C_ADDR_OFFSET_TEN_BIT: int
+
+class Adapter(NamedTuple):
+    number: int
+    name: str | None
+    path: str | None
+    parent: int | None
+    mux_address: int | None
+    channel: int | None
+    clients: dict[int, str | None]
+
+def _read_name(path: str) -> str | None: ...
+def _parse_client(entry: str) -> tuple[int, int, bool] | None: ...
+
+class AdapterRegistry:
+    sysfs: str
+    devfs: str
+    adapters: dict[int, Adapter]
+    def __init__(self, sysfs: str = "/sys", devfs: str = "/dev") -> None: ...
+    def refresh(self) -> None: ...
+    @staticmethod
+    def _mux_channel(mux: str, number: int) -> int | None: ...
+    def __iter__(self) -> Iterator[Adapter]: ...
+    def __len__(self) -> int: ...
+    def get(self, number: int) -> Adapter: ...
+    def find(self, name: str) -> list[Adapter]: ...
+    def lookup(self, name: str) -> Adapter: ...
+    def children(self, number: int) -> list[Adapter]: ...
+    def root(self, number: int) -> Adapter: ...
+    def open(self, name: str | int, force: bool = False) -> SMBus: ...
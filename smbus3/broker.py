@@ -0,0 +1,782 @@
+"""
+smbus3.broker - Share a single i2c adapter between processes.
+
+A :py:class:`BusBroker` owns the adapter's :py:class:`~smbus3.SMBus` and
+serves clients over a Unix domain socket, so that every transaction on the
+bus is serialized in one place. :py:class:`SMBusClient` is the client side
+proxy and mirrors the transfer methods of :py:class:`~smbus3.SMBus`.
+
+Wire protocol (all little-endian):
+
+- request: ``op:u8 flags:u8 register:u8 pad:u8 addr:u16 count:u16 size:u16``
+  followed by ``size`` payload bytes.
+- response: ``status:i32 size:u32`` followed by ``size`` payload bytes,
+  where ``status`` is 0 on success or an ``errno`` value.
+
+An ``OP_I2C_RDWR`` payload is a table of ``addr:u16 flags:u16 len:u16``
+message headers, each write header followed by its ``len`` data bytes.
+"""
+
+import errno
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+from ctypes import memmove
+
+from .smbus3 import (
+    I2C_M_RD,
+    I2C_M_TEN,
+    I2C_M_WR,
+    I2C_RDWR_IOCTL_MAX_MSGS,
+    I2C_SMBUS_BLOCK_MAX,
+    I2cFunc,
+    SMBus,
+    i2c_msg,
+)
+
+_REQUEST = struct.Struct("<BBBxHHH")
+_RESPONSE = struct.Struct("<iI")
+_MSG = struct.Struct("<HHH")
+
+# Request flags
+_FORCE_SET = 0x01
+_FORCE_VALUE = 0x02
+
+# Operation codes
+OP_FUNCS = 0
+OP_WRITE_QUICK = 1
+OP_READ_BYTE = 2
+OP_WRITE_BYTE = 3
+OP_READ_BYTE_DATA = 4
+OP_WRITE_BYTE_DATA = 5
+OP_READ_WORD_DATA = 6
+OP_WRITE_WORD_DATA = 7
+OP_PROCESS_CALL = 8
+OP_READ_BLOCK_DATA = 9
+OP_WRITE_BLOCK_DATA = 10
+OP_BLOCK_PROCESS_CALL = 11
+OP_READ_I2C_BLOCK_DATA = 12
+OP_WRITE_I2C_BLOCK_DATA = 13
+OP_I2C_RDWR = 14
+
+# Register reads which may share a combined I2C_RDWR transfer with others,
+# with their data length (None: given by the request count).
+_COMBINED_READS = {OP_READ_BYTE_DATA: 1, OP_READ_WORD_DATA: 2, OP_READ_I2C_BLOCK_DATA: None}
+# Register writes which may close a combined transfer, with their payload
+# length (None: up to I2C_SMBUS_BLOCK_MAX). Writes are never followed by
+# another message, so devices that commit on STOP still see one.
+_COMBINED_WRITES = {OP_WRITE_BYTE_DATA: 1, OP_WRITE_WORD_DATA: 2, OP_WRITE_I2C_BLOCK_DATA: None}
+
+
+def _word(value):
+    return bytes((value & 0xFF, (value >> 8) & 0xFF))
+
+
+def _recv_exact(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Broker connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def _encode_msgs(msgs):
+    payload = bytearray()
+    for msg in msgs:
+        payload += _MSG.pack(msg.addr, msg.flags, msg.len)
+        if not msg.flags & I2C_M_RD:
+            payload += bytes(msg)
+    return bytes(payload)
+
+
+def _decode_msgs(payload):
+    """
+    Decode and validate an ``OP_I2C_RDWR`` message table.
+    Private.
+
+    :raise ValueError: on a truncated table or write, or a message count
+        outside 1 to ``I2C_RDWR_IOCTL_MAX_MSGS``.
+    :rtype: list
+    """
+    msgs = []
+    offset = 0
+    while offset < len(payload):
+        if len(msgs) == I2C_RDWR_IOCTL_MAX_MSGS:
+            raise ValueError(f"More than {I2C_RDWR_IOCTL_MAX_MSGS} messages")
+        if offset + _MSG.size > len(payload):
+            raise ValueError("Truncated message header")
+        addr, flags, length = _MSG.unpack_from(payload, offset)
+        offset += _MSG.size
+        if flags & I2C_M_RD:
+            msgs.append(i2c_msg.read(addr, length, flags=flags))
+        else:
+            if offset + length > len(payload):
+                raise ValueError("Truncated write message")
+            msgs.append(i2c_msg.write(addr, payload[offset : offset + length], flags=flags))
+            offset += length
+    if not msgs:
+        raise ValueError("No messages")
+    return msgs
+
+
+def _op_rdwr(bus, r):
+    msgs = _decode_msgs(r.payload)
+    bus.i2c_rdwr(*msgs)
+    return b"".join(bytes(msg) for msg in msgs if msg.flags & I2C_M_RD)
+
+
+_HANDLERS = {
+    OP_FUNCS: lambda bus, r: int(bus.funcs).to_bytes(4, "little"),
+    OP_WRITE_QUICK: lambda bus, r: bus.write_quick(r.addr, force=r.force),
+    OP_READ_BYTE: lambda bus, r: bytes((bus.read_byte(r.addr, force=r.force),)),
+    OP_WRITE_BYTE: lambda bus, r: bus.write_byte(r.addr, r.register, force=r.force),
+    OP_READ_BYTE_DATA: lambda bus, r: bytes(
+        (bus.read_byte_data(r.addr, r.register, force=r.force),)
+    ),
+    OP_WRITE_BYTE_DATA: lambda bus, r: bus.write_byte_data(
+        r.addr, r.register, r.payload[0], force=r.force
+    ),
+    OP_READ_WORD_DATA: lambda bus, r: _word(bus.read_word_data(r.addr, r.register, force=r.force)),
+    OP_WRITE_WORD_DATA: lambda bus, r: bus.write_word_data(
+        r.addr, r.register, int.from_bytes(r.payload[:2], "little"), force=r.force
+    ),
+    OP_PROCESS_CALL: lambda bus, r: _word(
+        bus.process_call(r.addr, r.register, int.from_bytes(r.payload[:2], "little"), force=r.force)
+    ),
+    OP_READ_BLOCK_DATA: lambda bus, r: bytes(bus.read_block_data(r.addr, r.register, force=r.force)),
+    OP_WRITE_BLOCK_DATA: lambda bus, r: bus.write_block_data(
+        r.addr, r.register, list(r.payload), force=r.force
+    ),
+    OP_BLOCK_PROCESS_CALL: lambda bus, r: bytes(
+        bus.block_process_call(r.addr, r.register, list(r.payload), force=r.force)
+    ),
+    OP_READ_I2C_BLOCK_DATA: lambda bus, r: bytes(
+        bus.read_i2c_block_data(r.addr, r.register, r.count, force=r.force)
+    ),
+    OP_WRITE_I2C_BLOCK_DATA: lambda bus, r: bus.write_i2c_block_data(
+        r.addr, r.register, list(r.payload), force=r.force
+    ),
+    OP_I2C_RDWR: _op_rdwr,
+}
+"""
+Server side implementation of each operation: ``handler(bus, request)``
+returns the response payload (or None for an empty one).
+"""
+
+
+class _Request:
+    """
+    A decoded client request waiting to be executed.
+    Private.
+    """
+
+    __slots__ = ["addr", "conn", "count", "flags", "op", "payload", "register"]
+
+    def __init__(self, conn, header, payload=b""):
+        self.conn = conn
+        self.op, self.flags, self.register, self.addr, self.count = header[:5]
+        self.payload = payload
+
+    @property
+    def force(self):
+        if self.flags & _FORCE_SET:
+            return bool(self.flags & _FORCE_VALUE)
+        return None
+
+    def combinable(self):
+        """
+        Whether the request can be part of a combined transfer: a register
+        read or write whose lengths are those its own handler would use, so
+        that both paths transfer the same bytes.
+        """
+        if self.op in _COMBINED_READS:
+            length = _COMBINED_READS[self.op]
+            return length is not None or 1 <= self.count <= I2C_SMBUS_BLOCK_MAX
+        if self.op in _COMBINED_WRITES:
+            length = _COMBINED_WRITES[self.op]
+            if length is None:
+                return len(self.payload) <= I2C_SMBUS_BLOCK_MAX
+            return len(self.payload) == length
+        return False
+
+    def msgs(self, flags=I2C_M_WR):
+        """
+        The messages of the request in a combined transfer.
+
+        :param flags: addressing flags of the bus (``I2C_M_TEN``).
+        :type flags: int
+        :rtype: list
+        """
+        if self.op in _COMBINED_READS:
+            count = _COMBINED_READS[self.op] or self.count
+            return [
+                i2c_msg.write(self.addr, (self.register,), flags=flags),
+                i2c_msg.read(self.addr, count, flags=flags | I2C_M_RD),
+            ]
+        return [i2c_msg.write(self.addr, bytes((self.register,)) + self.payload, flags=flags)]
+
+
+class BusBroker:
+    """
+    Owns an i2c adapter and serializes access to it for local clients.
+
+    Requests arriving together are executed back to back while the broker
+    holds the adapter; runs of register reads (optionally closed by one
+    register write) are merged into a single combined ``I2C_RDWR`` transfer
+    of up to 42 messages. If a combined transfer fails, its requests are
+    retried one by one so that an error is only reported to the client
+    whose device caused it.
+
+    Responses are queued per client and sent whenever its socket accepts
+    more data, so a client that does not read its responses never blocks
+    the broker.
+
+    :ivar deadline_us: optional time budget, in microseconds, for executing
+        each set of pending requests (see :py:meth:`smbus3.SMBus.deadline`).
+        Requests left over when it runs out fail with ``ETIMEDOUT``.
+    :vartype deadline_us: float
+    :ivar send_timeout: seconds a client may keep responses waiting
+        (by not reading its socket) before it is disconnected, so that its
+        queued responses do not pile up.
+    :vartype send_timeout: float
+    """
+
+    def __init__(self, bus, path, mode=0o660, combine=True):
+        """
+        Initialize the broker and bind its listening socket.
+
+        :param bus: i2c bus number, device path, or an open
+            :py:class:`~smbus3.SMBus` instance to serve.
+        :type bus: int, str or SMBus
+        :param path: filesystem path of the Unix domain socket.
+        :type path: str
+        :param mode: permission bits applied to the socket file.
+        :type mode: int
+        :param combine: merge compatible requests into combined transfers.
+        :type combine: bool
+        """
+        # Bus numbers and paths are opened (and closed) by the broker, any
+        # other object is used as the bus
+        self._owns_bus = isinstance(bus, (int, str))  # noqa: UP038 (Python 3.8)
+        self.bus = SMBus(bus) if self._owns_bus else bus
+        self.path = path
+        self.combine = combine
+        self.deadline_us = None
+        self.send_timeout = 1.0
+        self.requests = 0
+        self.transfers = 0
+        self._buffers = {}
+        self._output = {}
+        # Clients with queued responses, with the time they last read some
+        self._stalled = {}
+        self._running = False
+        self._thread = None
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        if os.path.exists(path):
+            os.unlink(path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(path)
+        os.chmod(path, mode)
+        self._listener.listen()
+        self._listener.setblocking(False)
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+
+    def __enter__(self):
+        """Enter handler."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.close()
+
+    def start(self):
+        """
+        Serve clients from a background daemon thread.
+
+        :rtype: None
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="smbus3-broker")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def serve_forever(self):
+        """
+        Serve clients in the calling thread until :py:meth:`shutdown` is called.
+
+        :rtype: None
+        """
+        self._running = True
+        while self._running:
+            pending = []
+            timeout = self.send_timeout if self._stalled else None
+            for key, events in self._selector.select(timeout):
+                conn = key.fileobj
+                if conn is self._listener:
+                    self._accept()
+                elif conn is self._wakeup_r:
+                    self._wakeup_r.recv(64)
+                else:
+                    if events & selectors.EVENT_WRITE:
+                        self._flush(conn)
+                    if events & selectors.EVENT_READ and conn in self._buffers:
+                        pending.extend(self._receive(conn))
+            if pending:
+                self._respond(pending, self._execute(pending))
+            self._drop_stalled()
+
+    def shutdown(self):
+        """
+        Stop serving and wait for the serving thread to finish.
+
+        :rtype: None
+        """
+        self._running = False
+        self._wakeup_w.send(b"\0")
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """
+        Shut down, disconnect all clients and remove the socket file.
+
+        :rtype: None
+        """
+        self.shutdown()
+        for conn in list(self._buffers):
+            self._drop(conn)
+        self._selector.close()
+        self._listener.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        if self._owns_bus:
+            self.bus.close()
+
+    def _accept(self):
+        conn, _ = self._listener.accept()
+        conn.setblocking(False)
+        self._buffers[conn] = bytearray()
+        self._output[conn] = bytearray()
+        self._selector.register(conn, selectors.EVENT_READ)
+
+    def _drop(self, conn):
+        self._selector.unregister(conn)
+        del self._buffers[conn]
+        del self._output[conn]
+        self._stalled.pop(conn, None)
+        conn.close()
+
+    def _receive(self, conn):
+        """
+        Read whatever a client has sent and split it into requests.
+        Private.
+
+        :rtype: list
+        """
+        try:
+            data = conn.recv(65536)
+        except BlockingIOError:
+            return []
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(conn)
+            return []
+        buf = self._buffers[conn]
+        buf += data
+        requests = []
+        while len(buf) >= _REQUEST.size:
+            header = _REQUEST.unpack_from(buf)
+            end = _REQUEST.size + header[5]
+            if len(buf) < end:
+                break
+            payload = bytes(buf[_REQUEST.size : end])
+            del buf[:end]
+            requests.append(_Request(conn, header, payload))
+        return requests
+
+    def _run_one(self, request):
+        """
+        Execute a single request, returning ``(status, payload)``.
+        Private.
+        """
+        self.transfers += 1
+        handler = _HANDLERS.get(request.op)
+        if handler is None:
+            return errno.EINVAL, b""
+        try:
+            result = handler(self.bus, request)
+        except OSError as e:
+            return e.errno or errno.EIO, b""
+        except (ValueError, IndexError, struct.error):
+            return errno.EINVAL, b""
+        except Exception:
+            # A bad request must not take the adapter away from other clients
+            return errno.EIO, b""
+        return 0, result or b""
+
+    def _batch_end(self, pending, start):
+        """
+        Find the end of the combinable run beginning at ``start``.
+        Private.
+
+        :rtype: int
+        """
+        nmsgs = 0
+        end = start
+        while end < len(pending) and pending[end].combinable():
+            size = 2 if pending[end].op in _COMBINED_READS else 1
+            if nmsgs + size > I2C_RDWR_IOCTL_MAX_MSGS:
+                break
+            nmsgs += size
+            end += 1
+            if pending[end - 1].op in _COMBINED_WRITES:
+                break
+        return end
+
+    def _execute(self, pending):
+        """
+        Execute pending requests in order, within :py:attr:`deadline_us`.
+        Private.
+
+        :rtype: list
+        """
+        if self.deadline_us is None:
+            return self._execute_all(pending)
+        with self.bus.deadline(self.deadline_us):
+            return self._execute_all(pending)
+
+    def _execute_all(self, pending):
+        """
+        Execute pending requests in order, combining where possible.
+        Private.
+
+        :rtype: list
+        """
+        combine = self.combine and self.bus.funcs & I2cFunc.I2C and not self.bus.pec
+        flags = I2C_M_TEN if self.bus.tenbit else I2C_M_WR
+        results = []
+        idx = 0
+        while idx < len(pending):
+            end = self._batch_end(pending, idx) if combine else idx
+            if end - idx < 2:  # noqa: PLR2004
+                results.append(self._run_one(pending[idx]))
+                idx += 1
+                continue
+            batch = pending[idx:end]
+            msgs = [request.msgs(flags) for request in batch]
+            self.transfers += 1
+            try:
+                # I2C_RDWR skips the check for addresses in use by a driver
+                for request in batch:
+                    self.bus._set_address(request.addr, request.force)
+                self.bus.i2c_rdwr(*(msg for pair in msgs for msg in pair))
+            except OSError:
+                results.extend(self._run_one(request) for request in batch)
+            else:
+                for pair in msgs:
+                    results.append((0, bytes(pair[1]) if len(pair) > 1 else b""))
+            idx = end
+        self.requests += len(pending)
+        return results
+
+    def _respond(self, pending, results):
+        """
+        Queue the responses to their clients and send what their sockets
+        accept right away.
+        Private.
+        """
+        conns = {}
+        for request, (status, payload) in zip(pending, results):  # noqa: B905
+            output = self._output.get(request.conn)
+            if output is None:
+                continue
+            output += _RESPONSE.pack(status, len(payload))
+            output += payload
+            conns[request.conn] = None
+        for conn in conns:
+            self._flush(conn)
+
+    def _flush(self, conn):
+        """
+        Send as much of the queued responses of a client as its socket
+        accepts, and watch the socket for writability while some remain.
+        Private.
+        """
+        output = self._output[conn]
+        try:
+            sent = conn.send(output)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(conn)
+            return
+        del output[:sent]
+        if not output:
+            if self._stalled.pop(conn, None) is not None:
+                self._selector.modify(conn, selectors.EVENT_READ)
+            return
+        if conn not in self._stalled:
+            self._selector.modify(conn, selectors.EVENT_READ | selectors.EVENT_WRITE)
+        if sent or conn not in self._stalled:
+            self._stalled[conn] = time.monotonic()
+
+    def _drop_stalled(self):
+        """
+        Disconnect the clients which have not read any of their queued
+        responses for :py:attr:`send_timeout`.
+        Private.
+        """
+        now = time.monotonic()
+        for conn, since in list(self._stalled.items()):
+            if now - since > self.send_timeout:
+                self._drop(conn)
+
+
+class SMBusClient:
+    """
+    Client side proxy of a :py:class:`BusBroker`.
+
+    Offers the same transfer methods as :py:class:`~smbus3.SMBus`, so it can
+    be used in its place. Adapter settings (PEC, timeout, retries, ...)
+    belong to the broker and are not available through the proxy.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize and (optionally) connect to a broker.
+
+        :param path: path of the broker's Unix domain socket.
+            If not given, a subsequent call to ``open()`` is required.
+        :type path: str
+        """
+        self.sock = None
+        self.funcs = I2cFunc(0)
+        if path is not None:
+            self.open(path)
+
+    def __enter__(self):
+        """Enter handler."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.close()
+
+    def open(self, path):
+        """
+        Connect to a broker.
+
+        :param path: path of the broker's Unix domain socket.
+        :type path: str
+        :rtype: None
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.funcs = I2cFunc(int.from_bytes(self._call(OP_FUNCS), "little"))
+
+    def close(self):
+        """
+        Disconnect from the broker.
+
+        :rtype: None
+        """
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+    def _call(self, op, i2c_addr=0, register=0, count=0, payload=b"", force=None):  # noqa: PLR0913
+        """
+        Send one request and wait for its response.
+        Private.
+
+        :raise OSError: with the errno reported by the broker.
+        :rtype: bytes
+        """
+        flags = 0 if force is None else _FORCE_SET | (_FORCE_VALUE if force else 0)
+        payload = bytes(payload)
+        self.sock.sendall(
+            _REQUEST.pack(op, flags, register, i2c_addr, count, len(payload)) + payload
+        )
+        status, size = _RESPONSE.unpack(_recv_exact(self.sock, _RESPONSE.size))
+        data = _recv_exact(self.sock, size) if size else b""
+        if status:
+            raise OSError(status, os.strerror(status))
+        return data
+
+    def write_quick(self, i2c_addr, force=None):
+        """
+        Perform quick transaction. See :py:meth:`smbus3.SMBus.write_quick`.
+
+        :rtype: None
+        """
+        self._call(OP_WRITE_QUICK, i2c_addr, force=force)
+
+    def read_byte(self, i2c_addr, force=None):
+        """
+        Read a single byte from a device. See :py:meth:`smbus3.SMBus.read_byte`.
+
+        :rtype: int
+        """
+        return self._call(OP_READ_BYTE, i2c_addr, force=force)[0]
+
+    def write_byte(self, i2c_addr, value, force=None):
+        """
+        Write a single byte to a device. See :py:meth:`smbus3.SMBus.write_byte`.
+
+        :rtype: None
+        """
+        self._call(OP_WRITE_BYTE, i2c_addr, value, force=force)
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        """
+        Read a single byte from a designated register.
+        See :py:meth:`smbus3.SMBus.read_byte_data`.
+
+        :rtype: int
+        """
+        return self._call(OP_READ_BYTE_DATA, i2c_addr, register, force=force)[0]
+
+    def write_byte_data(self, i2c_addr, register, value, force=None):
+        """
+        Write a byte to a given register. See :py:meth:`smbus3.SMBus.write_byte_data`.
+
+        :rtype: None
+        """
+        self._call(OP_WRITE_BYTE_DATA, i2c_addr, register, payload=(value,), force=force)
+
+    def read_word_data(self, i2c_addr, register, force=None):
+        """
+        Read a single word (2 bytes) from a given register.
+        See :py:meth:`smbus3.SMBus.read_word_data`.
+
+        :rtype: int
+        """
+        data = self._call(OP_READ_WORD_DATA, i2c_addr, register, force=force)
+        return int.from_bytes(data, "little")
+
+    def write_word_data(self, i2c_addr, register, value, force=None):
+        """
+        Write a single word (2 bytes) to a given register.
+        See :py:meth:`smbus3.SMBus.write_word_data`.
+
+        :rtype: None
+        """
+        self._call(OP_WRITE_WORD_DATA, i2c_addr, register, payload=_word(value), force=force)
+
+    def process_call(self, i2c_addr, register, value, force=None):
+        """
+        Executes a SMBus Process Call. See :py:meth:`smbus3.SMBus.process_call`.
+
+        :rtype: int
+        """
+        data = self._call(OP_PROCESS_CALL, i2c_addr, register, payload=_word(value), force=force)
+        return int.from_bytes(data, "little")
+
+    def read_block_data(self, i2c_addr, register, force=None):
+        """
+        Read a block of up to 32-bytes from a given register.
+        See :py:meth:`smbus3.SMBus.read_block_data`.
+
+        :rtype: list
+        """
+        return list(self._call(OP_READ_BLOCK_DATA, i2c_addr, register, force=force))
+
+    def write_block_data(self, i2c_addr, register, data, force=None):
+        """
+        Write a block of byte data to a given register.
+        See :py:meth:`smbus3.SMBus.write_block_data`.
+
+        :raise ValueError: if length of data in bytes is > I2C_SMBUS_BLOCK_MAX
+        :rtype: None
+        """
+        if len(data) > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        self._call(OP_WRITE_BLOCK_DATA, i2c_addr, register, payload=data, force=force)
+
+    def block_process_call(self, i2c_addr, register, data, force=None):
+        """
+        Executes a SMBus Block Process Call.
+        See :py:meth:`smbus3.SMBus.block_process_call`.
+
+        :raise ValueError: if length of data in bytes is > I2C_SMBUS_BLOCK_MAX
+        :rtype: list
+        """
+        if len(data) > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        return list(self._call(OP_BLOCK_PROCESS_CALL, i2c_addr, register, payload=data, force=force))
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        """
+        Read a block of byte data from a given register.
+        See :py:meth:`smbus3.SMBus.read_i2c_block_data`.
+
+        :raise ValueError: if length (in bytes) is > I2C_SMBUS_BLOCK_MAX
+        :rtype: list
+        """
+        if length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        return list(
+            self._call(OP_READ_I2C_BLOCK_DATA, i2c_addr, register, count=length, force=force)
+        )
+
+    def write_i2c_block_data(self, i2c_addr, register, data, force=None):
+        """
+        Write a block of byte data to a given register.
+        See :py:meth:`smbus3.SMBus.write_i2c_block_data`.
+
+        :raise ValueError: if length of data in bytes is > I2C_SMBUS_BLOCK_MAX
+        :rtype: None
+        """
+        if len(data) > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        self._call(OP_WRITE_I2C_BLOCK_DATA, i2c_addr, register, payload=data, force=force)
+
+    def i2c_rdwr(self, *i2c_msgs):
+        """
+        Combine a series of i2c read and write operations in a single
+        transaction. See :py:meth:`smbus3.SMBus.i2c_rdwr`.
+
+        The buffers of read messages are filled in with the data returned
+        by the broker.
+
+        :param i2c_msgs: One or more i2c_msg class instances.
+        :type i2c_msgs: i2c_msg
+        :rtype: None
+        """
+        data = self._call(OP_I2C_RDWR, payload=_encode_msgs(i2c_msgs))
+        offset = 0
+        for msg in i2c_msgs:
+            if msg.flags & I2C_M_RD:
+                memmove(msg.buf, data[offset : offset + msg.len], msg.len)
+                offset += msg.len
+
+    def i2c_rd(self, i2c_addr, length, flags=I2C_M_RD):
+        """
+        Perform a single i2c read operation. See :py:meth:`smbus3.SMBus.i2c_rd`.
+
+        :rtype: i2c_msg
+        """
+        msg = i2c_msg.read(i2c_addr, length, flags=flags)
+        self.i2c_rdwr(msg)
+        return msg
+
+    def i2c_wr(self, i2c_addr, buf, flags=I2C_M_WR):
+        """
+        Perform a single i2c write operation. See :py:meth:`smbus3.SMBus.i2c_wr`.
+
+        :rtype: i2c_msg
+        """
+        msg = i2c_msg.write(i2c_addr, buf, flags=flags)
+        self.i2c_rdwr(msg)
+        return msg
@@ -0,0 +1,122 @@
+from collections.abc import Sequence
+from socket import socket
+from struct import Struct
+from types import TracebackType
+
+from .smbus3 import I2cFunc, SMBus, i2c_msg
+
+OP_FUNCS: int
+OP_WRITE_QUICK: int
+OP_READ_BYTE: int
+OP_WRITE_BYTE: int
+OP_READ_BYTE_DATA: int
+OP_WRITE_BYTE_DATA: int
+OP_READ_WORD_DATA: int
+OP_WRITE_WORD_DATA: int
+OP_PROCESS_CALL: int
+OP_READ_BLOCK_DATA: int
+OP_WRITE_BLOCK_DATA: int
+OP_BLOCK_PROCESS_CALL: int
+OP_READ_I2C_BLOCK_DATA: int
+OP_WRITE_I2C_BLOCK_DATA: int
+OP_I2C_RDWR: int
+
+_REQUEST: Struct
+_RESPONSE: Struct
+_MSG: Struct
+
+class _Request:
+    conn: socket | None
+    op: int
+    flags: int
+    register: int
+    addr: int
+    count: int
+    payload: bytes
+    def __init__(self, conn: socket | None, header: Sequence[int], payload: bytes = b"") -> None: ...
+    @property
+    def force(self) -> bool | None: ...
+    def combinable(self) -> bool: ...
+    def msgs(self, flags: int = ...) -> list[i2c_msg]: ...
+
+class BusBroker:
+    bus: SMBus
+    path: str
+    combine: bool
+    deadline_us: float | None
+    send_timeout: float
+    requests: int
+    transfers: int
+    def __init__(
+        self, bus: int | str | SMBus, path: str, mode: int = 0o660, combine: bool = True
+    ) -> None: ...
+    def __enter__(self) -> BusBroker: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    def start(self) -> None: ...
+    def serve_forever(self) -> None: ...
+    def shutdown(self) -> None: ...
+    def close(self) -> None: ...
+    def _execute(self, pending: list[_Request]) -> list[tuple[int, bytes]]: ...
+
+class SMBusClient:
+    sock: socket | None
+    funcs: I2cFunc
+    def __init__(self, path: str | None = None) -> None: ...
+    def __enter__(self) -> SMBusClient: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    def open(self, path: str) -> None: ...
+    def close(self) -> None: ...
+    def write_quick(self, i2c_addr: int, force: bool | None = None) -> None: ...
+    def read_byte(self, i2c_addr: int, force: bool | None = None) -> int: ...
+    def write_byte(self, i2c_addr: int, value: int, force: bool | None = None) -> None: ...
+    def read_byte_data(self, i2c_addr: int, register: int, force: bool | None = None) -> int: ...
+    def write_byte_data(
+        self, i2c_addr: int, register: int, value: int, force: bool | None = None
+    ) -> None: ...
+    def read_word_data(self, i2c_addr: int, register: int, force: bool | None = None) -> int: ...
+    def write_word_data(
+        self, i2c_addr: int, register: int, value: int, force: bool | None = None
+    ) -> None: ...
+    def process_call(
+        self, i2c_addr: int, register: int, value: int, force: bool | None = None
+    ) -> int: ...
+    def read_block_data(
+        self, i2c_addr: int, register: int, force: bool | None = None
+    ) -> list[int]: ...
+    def write_block_data(
+        self,
+        i2c_addr: int,
+        register: int,
+        data: Sequence[int],
+        force: bool | None = None,
+    ) -> None: ...
+    def block_process_call(
+        self,
+        i2c_addr: int,
+        register: int,
+        data: Sequence[int],
+        force: bool | None = None,
+    ) -> list[int]: ...
+    def read_i2c_block_data(
+        self, i2c_addr: int, register: int, length: int, force: bool | None = None
+    ) -> list[int]: ...
+    def write_i2c_block_data(
+        self,
+        i2c_addr: int,
+        register: int,
+        data: Sequence[int],
+        force: bool | None = None,
+    ) -> None: ...
+    def i2c_rdwr(self, *i2c_msgs: i2c_msg) -> None: ...
+    def i2c_rd(self, i2c_addr: int, length: int, flags: int = ...) -> i2c_msg: ...
+    def i2c_wr(self, i2c_addr: int, buf: Sequence[int], flags: int = ...) -> i2c_msg: ...
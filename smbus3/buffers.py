@@ -0,0 +1,215 @@
+"""
+smbus3.buffers - Pooled ctypes buffers for i2c messages.
+
+``i2c_msg.read()`` and ``i2c_msg.write()`` allocate a ctypes buffer and an
+:py:class:`~smbus3.i2c_msg` structure per message. Given a
+:py:class:`BufferPool`, they lease both instead, the buffer rounded up to a
+size class, and they return to the pool when released, either explicitly
+or at the end of a :py:meth:`BufferPool.scope`::
+
+    pool = BufferPool()
+    bus.pool = pool
+    while True:
+        with pool.scope():
+            data = bytes(bus.i2c_rd(0x40, 6))
+
+Each size class keeps at most ``max_free`` idle buffers, which bounds the
+memory held by the pool. The :py:attr:`BufferPool.stats` counters show
+whether a loop has reached its steady state, in which every buffer is
+reused and none is allocated.
+
+Leasing takes more CPU time than allocating with ctypes. What the pool
+buys, once the loop is warm, is ctypes memory which stops changing: no
+buffer or message structure is created, so no new pages are faulted in
+under :py:class:`~smbus3.realtime.RealtimeOptions` memory locking. Small
+Python objects, such as the bytes written or read, still come and go.
+"""
+
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from ctypes import addressof, c_char
+
+from .smbus3 import i2c_msg
+
+# Register reads, I2C blocks, pages and the i2c-dev message maximum
+SIZE_CLASSES = (8, 32, 256, 8192)
+
+
+class _Scopes(threading.local):
+    """
+    The scopes open in the calling thread, innermost last.
+    Private.
+    """
+
+    def __init__(self):
+        self.stack = []
+
+
+class BufferPool:
+    """
+    A pool of ctypes ``c_char`` arrays, by size class, each paired with an
+    :py:class:`~smbus3.i2c_msg` pointing to it.
+
+    Buffers are leased with undefined contents. A buffer larger than the
+    largest size class is allocated to size and dropped when released.
+
+    :ivar sizes: size classes, in bytes.
+    :ivar max_free: idle buffers kept per size class.
+    :ivar stats: counters of ``allocations`` (buffers created), ``reuses``
+        (leases served by an idle buffer), ``releases`` and ``discards``
+        (released buffers dropped as oversized or beyond ``max_free``).
+    """
+
+    def __init__(self, sizes=SIZE_CLASSES, max_free=16):
+        """
+        Create an empty pool.
+
+        :param sizes: size classes, in bytes.
+        :type sizes: Iterable[int]
+        :param max_free: idle buffers kept per size class.
+        :type max_free: int
+        :raise ValueError: without size classes.
+        """
+        self.sizes = tuple(sorted(set(sizes)))
+        if not self.sizes:
+            raise ValueError("A buffer pool needs at least one size class")
+        self.max_free = max_free
+        self.stats = {"allocations": 0, "reuses": 0, "releases": 0, "discards": 0}
+        self._free = {size: [] for size in self.sizes}
+        # {address: (buffer, message, lease number)}
+        self._leased = {}
+        self._leases = 0
+        self._lock = threading.Lock()
+        self._scopes = _Scopes()
+
+    @property
+    def leased(self):
+        """
+        Number of buffers currently leased.
+
+        :rtype: int
+        """
+        return len(self._leased)
+
+    @property
+    def free_bytes(self):
+        """
+        Bytes held by idle buffers, at most ``max_free`` times the sum of
+        the size classes.
+
+        :rtype: int
+        """
+        return sum(size * len(free) for size, free in self._free.items())
+
+    def acquire(self, length):
+        """
+        Lease a buffer of at least length bytes. Within a :py:meth:`scope`,
+        the buffer is released when the scope ends.
+
+        :param length: bytes needed.
+        :type length: int
+        :rtype: ctypes.Array
+        """
+        return self._lease(length)[0]
+
+    def message(self, address, length, flags):
+        """
+        Lease the message structure of a buffer of at least length bytes,
+        set up for a message of length bytes. It is released like the
+        buffer, and must not be used afterwards either.
+
+        :param address: i2c address
+        :type address: int
+        :param length: message length.
+        :type length: int
+        :param flags: message flags.
+        :type flags: int
+        :rtype: i2c_msg
+        """
+        msg = self._lease(length)[1]
+        msg.addr = address
+        msg.flags = flags
+        msg.len = length
+        return msg
+
+    def _lease(self, length):
+        """
+        Lease a buffer of at least length bytes with its message structure.
+        Private.
+        """
+        index = bisect_left(self.sizes, length)
+        size = self.sizes[index] if index < len(self.sizes) else length
+        with self._lock:
+            free = self._free.get(size)
+            if free:
+                buffer, msg = free.pop()
+                self.stats["reuses"] += 1
+            else:
+                buffer = (c_char * size)()
+                msg = i2c_msg(buf=buffer)
+                self.stats["allocations"] += 1
+            self._leases += 1
+            lease = self._leases
+            address = addressof(buffer)
+            self._leased[address] = (buffer, msg, lease)
+        scopes = self._scopes.stack
+        if scopes:
+            scopes[-1].append((address, lease))
+        return buffer, msg
+
+    def release(self, buffer):
+        """
+        Return a buffer to the pool. Messages still pointing to it must not
+        be used afterwards.
+
+        :param buffer: buffer from :py:meth:`acquire`, or an i2c_msg whose
+            buffer it is.
+        :type buffer: ctypes.Array or i2c_msg
+        :raise ValueError: if the buffer is not leased from this pool.
+        :rtype: None
+        """
+        if isinstance(buffer, i2c_msg):
+            address = addressof(buffer.buf.contents)
+        else:
+            address = addressof(buffer)
+        if not self._return(address):
+            raise ValueError("Buffer not leased from this pool")
+
+    def _return(self, address, lease=None):
+        """
+        Return the buffer leased at address to its free list, provided it is
+        still the given lease, if any. Return whether it was returned.
+        Private.
+        """
+        with self._lock:
+            leased = self._leased.get(address)
+            if leased is None or (lease is not None and leased[2] != lease):
+                return False
+            del self._leased[address]
+            buffer, msg, _ = leased
+            self.stats["releases"] += 1
+            free = self._free.get(len(buffer))
+            if free is not None and len(free) < self.max_free:
+                free.append((buffer, msg))
+            else:
+                self.stats["discards"] += 1
+        return True
+
+    @contextmanager
+    def scope(self):
+        """
+        Release the buffers leased by the calling thread within a ``with``
+        block, unless already released, when the block ends. Scopes nest.
+
+        :return: Context manager
+        """
+        stack = self._scopes.stack
+        leases = []
+        stack.append(leases)
+        try:
+            yield
+        finally:
+            stack.pop()
+            for address, lease in leases:
+                self._return(address, lease)
@@ -0,0 +1,26 @@
+from collections.abc import Iterable
+from contextlib import AbstractContextManager
+from ctypes import Array, c_char
+
+from .smbus3 import i2c_msg
+
+SIZE_CLASSES: tuple[int, ...]
+
+class BufferPool:
+    sizes: tuple[int, ...]
+    max_free: int
+    stats: dict[str, int]
+    _free: dict[int, list[tuple[Array[c_char], i2c_msg]]]
+    _leased: dict[int, tuple[Array[c_char], i2c_msg, int]]
+    _leases: int
+    def __init__(self, sizes: Iterable[int] = ..., max_free: int = 16) -> None: ...
+    @property
+    def leased(self) -> int: ...
+    @property
+    def free_bytes(self) -> int: ...
+    def acquire(self, length: int) -> Array[c_char]: ...
+    def message(self, address: int, length: int, flags: int) -> i2c_msg: ...
+    def _lease(self, length: int) -> tuple[Array[c_char], i2c_msg]: ...
+    def release(self, buffer: Array[c_char] | i2c_msg) -> None: ...
+    def _return(self, address: int, lease: int | None = None) -> bool: ...
+    def scope(self) -> AbstractContextManager[None]: ...
@@ -0,0 +1,135 @@
+"""
+smbus3.capabilities - Persisted cache of adapter capabilities.
+
+Opening an adapter used to always cost an ``I2C_FUNCS`` ioctl. Short-lived
+tools can instead share a :py:class:`CapabilityCache` file: the functionality
+word is stored per adapter identity, that is the adapter number together with
+its sysfs name, so a renumbered or replaced adapter is probed again.
+"""
+
+import json
+import os
+
+
+class CapabilityCache:
+    """
+    Maps adapter identities to their ``I2C_FUNCS`` functionality word.
+    """
+
+    def __init__(self, path=None, sysfs="/sys"):
+        """
+        Create the cache, loading ``path`` if it exists.
+
+        :param path: JSON file the cache is persisted to, or None to keep it
+            in memory only.
+        :type path: str
+        :param sysfs: sysfs mount point the adapter names are read from.
+        :type sysfs: str
+        """
+        self.path = path
+        self.sysfs = sysfs
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if path is not None:
+            self.load()
+
+    def __enter__(self):
+        """Enter handler."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.save()
+
+    def key(self, filepath):
+        """
+        Identity of the adapter behind a device node, e.g. ``"1:bcm2835 (i2c@7e804000)"``.
+
+        :param filepath: device node path, e.g. ``/dev/i2c-1``.
+        :type filepath: str
+        :return: The key, or None if the adapter cannot be identified
+        :rtype: str
+        """
+        node = os.path.basename(os.path.realpath(filepath))
+        if not node.startswith("i2c-") or not node[4:].isdigit():
+            return None
+        try:
+            with open(os.path.join(self.sysfs, "class", "i2c-dev", node, "name")) as f:
+                name = f.read().strip()
+        except OSError:
+            return None
+        return f"{node[4:]}:{name}"
+
+    def get(self, filepath):
+        """
+        Cached functionality of the adapter behind ``filepath``.
+
+        :param filepath: device node path.
+        :type filepath: str
+        :return: The functionality word, or None on a cache miss
+        :rtype: int
+        """
+        funcs = self.entries.get(self.key(filepath))
+        if funcs is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return funcs
+
+    def set(self, filepath, funcs):
+        """
+        Record the functionality of the adapter behind ``filepath``.
+
+        :param filepath: device node path.
+        :type filepath: str
+        :param funcs: functionality word returned by ``I2C_FUNCS``.
+        :type funcs: int
+        :rtype: None
+        """
+        key = self.key(filepath)
+        if key is not None and self.entries.get(key) != funcs:
+            self.entries[key] = int(funcs)
+            self._dirty = True
+
+    def clear(self):
+        """
+        Forget all entries.
+
+        :rtype: None
+        """
+        self.entries = {}
+        self._dirty = True
+
+    def load(self):
+        """
+        (Re)load the cache file. A missing or unreadable file is treated as
+        an empty cache.
+
+        :rtype: None
+        """
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        if not isinstance(entries, dict):
+            entries = {}
+        self.entries = {key: value for key, value in entries.items() if isinstance(value, int)}
+        self._dirty = False
+
+    def save(self):
+        """
+        Write the cache file if entries changed. The file is replaced
+        atomically so concurrent processes never read a partial cache.
+
+        :rtype: None
+        """
+        if self.path is None or not self._dirty:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._dirty = False
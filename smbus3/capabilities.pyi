@@ -0,0 +1,22 @@
+from types import TracebackType
+
+class CapabilityCache:
+    path: str | None
+    sysfs: str
+    entries: dict[str, int]
+    hits: int
+    misses: int
+    def __init__(self, path: str | None = None, sysfs: str = "/sys") -> None: ...
+    def __enter__(self) -> CapabilityCache: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    def key(self, filepath: str) -> str | None: ...
+    def get(self, filepath: str) -> int | None: ...
+    def set(self, filepath: str, funcs: int) -> None: ...
+    def clear(self) -> None: ...
+    def load(self) -> None: ...
+    def save(self) -> None: ...
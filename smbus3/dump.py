@@ -0,0 +1,276 @@
+"""
+smbus3.dump - Dump device registers, like i2cdump, with as few transfers
+as the adapter allows.
+
+The transfer used is picked from the adapter functionality: one combined
+``I2C_RDWR`` transaction for the whole range, else 32 byte I2C block reads,
+else word reads, else byte reads. Devices on different adapters are dumped
+concurrently by :py:func:`dump_many`, and ``smbus3-dump`` exposes both on
+the command line.
+
+Binary output (:py:func:`format_binary`) holds one record per device, in
+the order given: ``address:u16 start:u8 length:u16`` (little-endian)
+followed by ``length`` register values. Devices that could not be read
+have a record of length 0.
+"""
+
+import argparse
+import json
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .smbus3 import I2C_M_RD, I2C_M_TEN, I2C_M_WR, I2C_SMBUS_BLOCK_MAX, I2cFunc, SMBus, i2c_msg
+
+DUMP_MODES = ("auto", "rdwr", "i2c_block", "word", "byte")
+
+# Registers addressed by an 8 bit command code
+_REGISTER_MAX = 0xFF
+# Bytes shown as ASCII text in hex dumps
+_PRINTABLE = range(0x20, 0x7F)
+# Header of each device in binary output
+_RECORD = struct.Struct("<HBH")
+
+
+def select_mode(funcs):
+    """
+    The widest transfer supported by an adapter.
+
+    :param funcs: adapter functionality, see :py:class:`~smbus3.I2cFunc`.
+    :type funcs: int
+    :return: One of ``"rdwr"``, ``"i2c_block"``, ``"word"`` or ``"byte"``
+    :rtype: str
+    """
+    if funcs & I2cFunc.I2C:
+        return "rdwr"
+    if funcs & I2cFunc.SMBUS_READ_I2C_BLOCK:
+        return "i2c_block"
+    if funcs & I2cFunc.SMBUS_READ_WORD_DATA:
+        return "word"
+    return "byte"
+
+
+def dump(bus, i2c_addr, start=0x00, end=0xFF, mode="auto", force=None):  # noqa: PLR0913
+    """
+    Read registers ``start`` to ``end`` (inclusive) of a device.
+
+    The ``"rdwr"`` transfer honours the bus's 10-bit addressing and PEC
+    settings like the SMBus transfers do, and sets the slave address first
+    so that addresses in use by a driver are only read with ``force``.
+
+    :param bus: open bus.
+    :type bus: SMBus
+    :param i2c_addr: i2c address
+    :type i2c_addr: int
+    :param start: first register.
+    :type start: int
+    :param end: last register.
+    :type end: int
+    :param mode: transfer to use, ``"auto"`` picking the widest supported.
+    :type mode: str
+    :param force: force using the slave address even when driver is already using it.
+    :type force: bool
+    :raise ValueError: on an empty range or an unknown mode.
+    :return: Register values
+    :rtype: bytes
+    """
+    if not 0 <= start <= end <= _REGISTER_MAX:
+        raise ValueError(f"Invalid register range 0x{start:02X}-0x{end:02X}")
+    if mode not in DUMP_MODES:
+        raise ValueError(f"Unexpected mode={mode!r}")
+    if mode == "auto":
+        mode = select_mode(bus.funcs)
+    length = end - start + 1
+    if mode == "rdwr":
+        flags = I2C_M_TEN if bus.tenbit else I2C_M_WR
+        read = i2c_msg.read(i2c_addr, length, flags=flags | I2C_M_RD)
+        # I2C_RDWR skips the check for addresses in use by a driver
+        bus._set_address(i2c_addr, force)
+        bus.i2c_rdwr(i2c_msg.write(i2c_addr, (start,), flags=flags), read, pec=bool(bus.pec))
+        return bytes(read)
+    data = bytearray()
+    register = start
+    while register <= end:
+        remaining = end - register + 1
+        if mode == "i2c_block":
+            size = min(remaining, I2C_SMBUS_BLOCK_MAX)
+            data += bytes(bus.read_i2c_block_data(i2c_addr, register, size, force=force))
+        elif mode == "word" and remaining > 1:
+            size = 2
+            data += bus.read_word_data(i2c_addr, register, force=force).to_bytes(2, "little")
+        else:
+            size = 1
+            data.append(bus.read_byte_data(i2c_addr, register, force=force))
+        register += size
+    return bytes(data)
+
+
+def format_hex(data, start=0x00):
+    """
+    Format register values as an i2cdump style table.
+
+    :param data: register values.
+    :type data: bytes
+    :param start: register of the first value.
+    :type start: int
+    :rtype: str
+    """
+    lines = ["    " + " ".join(f"{col:2x}" for col in range(16)) + "    0123456789abcdef"]
+    end = start + len(data)
+    for row in range(start & ~0xF, end, 16):
+        cells = []
+        text = []
+        for register in range(row, row + 16):
+            if start <= register < end:
+                value = data[register - start]
+                cells.append(f"{value:02x}")
+                text.append(chr(value) if value in _PRINTABLE else ".")
+            else:
+                cells.append("  ")
+                text.append(" ")
+        lines.append(f"{row:02x}: " + " ".join(cells) + "    " + "".join(text))
+    return "\n".join(lines)
+
+
+def format_json(dumps, start=0x00):
+    """
+    Format the results of :py:func:`dump_many` as JSON.
+
+    :param dumps: ``{(bus, address): bytes or exception}``.
+    :type dumps: dict
+    :param start: register of the first value.
+    :type start: int
+    :rtype: str
+    """
+    devices = []
+    for (bus, i2c_addr), result in dumps.items():
+        device = {"bus": bus, "address": i2c_addr, "start": start}
+        if isinstance(result, Exception):
+            device["error"] = str(result)
+        else:
+            device["data"] = list(result)
+        devices.append(device)
+    return json.dumps(devices, indent=1)
+
+
+def format_binary(dumps, start=0x00):
+    """
+    Format the results of :py:func:`dump_many` as binary records, see the
+    module description.
+
+    :param dumps: ``{(bus, address): bytes or exception}``.
+    :type dumps: dict
+    :param start: register of the first value.
+    :type start: int
+    :rtype: bytes
+    """
+    records = bytearray()
+    for (_, i2c_addr), result in dumps.items():
+        data = b"" if isinstance(result, Exception) else result
+        records += _RECORD.pack(i2c_addr, start, len(data))
+        records += data
+    return bytes(records)
+
+
+def dump_many(targets, start=0x00, end=0xFF, mode="auto", force=None):
+    """
+    Dump many devices, one thread per adapter: devices sharing an adapter
+    are read one after the other, adapters are read concurrently.
+
+    :param targets: ``(bus, address)`` pairs, ``bus`` being an adapter
+        number or device path.
+    :type targets: list
+    :param start: first register.
+    :type start: int
+    :param end: last register.
+    :type end: int
+    :param mode: transfer to use, see :py:func:`dump`.
+    :type mode: str
+    :param force: force using the slave address even when driver is already using it.
+    :type force: bool
+    :return: ``{(bus, address): bytes}``, with the raised exception in place
+        of the bytes for devices that could not be read.
+    :rtype: dict
+    """
+    adapters = {}
+    for bus, i2c_addr in targets:
+        adapters.setdefault(bus, []).append(i2c_addr)
+
+    def dump_adapter(bus):
+        results = {}
+        try:
+            with SMBus(bus) as smbus:
+                for i2c_addr in adapters[bus]:
+                    try:
+                        results[bus, i2c_addr] = dump(smbus, i2c_addr, start, end, mode, force)
+                    except OSError as e:
+                        results[bus, i2c_addr] = e
+        except OSError as e:
+            results = {(bus, i2c_addr): e for i2c_addr in adapters[bus]}
+        return results
+
+    dumps = {}
+    if adapters:
+        with ThreadPoolExecutor(max_workers=len(adapters)) as executor:
+            for results in executor.map(dump_adapter, adapters):
+                dumps.update(results)
+    return {target: dumps[target] for target in targets}
+
+
+def _parse_target(text):
+    """
+    Parse a ``BUS:ADDRESS`` command line argument.
+    Private.
+    """
+    bus, sep, i2c_addr = text.rpartition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected BUS:ADDRESS, got {text!r}")
+    try:
+        return (int(bus) if bus.isdigit() else bus), int(i2c_addr, 0)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+
+def main(argv=None):
+    """
+    Entry point of the ``smbus3-dump`` command.
+
+    :param argv: command line arguments, ``sys.argv[1:]`` by default.
+    :type argv: list
+    :return: Exit status
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(prog="smbus3-dump", description="Dump i2c device registers.")
+    parser.add_argument(
+        "targets", nargs="+", type=_parse_target, metavar="BUS:ADDRESS", help="e.g. 1:0x50"
+    )
+    parser.add_argument("--start", type=lambda x: int(x, 0), default=0x00)
+    parser.add_argument("--end", type=lambda x: int(x, 0), default=0xFF)
+    parser.add_argument("--mode", choices=DUMP_MODES, default="auto")
+    parser.add_argument(
+        "--format",
+        choices=("hex", "binary", "json"),
+        default="hex",
+        help="binary: one address:u16 start:u8 length:u16 header and data per device",
+    )
+    parser.add_argument("--force", action="store_true", default=None)
+    args = parser.parse_args(argv)
+
+    dumps = dump_many(args.targets, args.start, args.end, args.mode, args.force)
+    if args.format == "json":
+        print(format_json(dumps, args.start))
+    elif args.format == "binary":
+        sys.stdout.buffer.write(format_binary(dumps, args.start))
+    status = 0
+    for (bus, i2c_addr), result in dumps.items():
+        if isinstance(result, Exception):
+            print(f"Error: bus {bus} address 0x{i2c_addr:02x}: {result}", file=sys.stderr)
+            status = 1
+        elif args.format == "hex":
+            print(f"Bus {bus}, address 0x{i2c_addr:02x}:")
+            print(format_hex(result, args.start))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+from collections.abc import Sequence
+from typing import Literal
+
+from .smbus3 import SMBus
+
+DUMP_MODES: tuple[str, ...]
+
+def select_mode(funcs: int) -> Literal["rdwr", "i2c_block", "word", "byte"]: ...
+def dump(  # noqa: PLR0913
+    bus: SMBus,
+    i2c_addr: int,
+    start: int = 0x00,
+    end: int = 0xFF,
+    mode: str = "auto",
+    force: bool | None = None,
+) -> bytes: ...
+def format_hex(data: bytes, start: int = 0x00) -> str: ...
+def format_json(dumps: dict[tuple[int | str, int], bytes | Exception], start: int = 0x00) -> str: ...
+def format_binary(
+    dumps: dict[tuple[int | str, int], bytes | Exception], start: int = 0x00
+) -> bytes: ...
+def dump_many(
+    targets: Sequence[tuple[int | str, int]],
+    start: int = 0x00,
+    end: int = 0xFF,
+    mode: str = "auto",
+    force: bool | None = None,
+) -> dict[tuple[int | str, int], bytes | Exception]: ...
+def _parse_target(text: str) -> tuple[int | str, int]: ...
+def main(argv: Sequence[str] | None = None) -> int: ...
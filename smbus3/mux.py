@@ -0,0 +1,271 @@
+"""
+smbus3.mux - Access devices behind userspace-controlled i2c multiplexers.
+
+Supports PCA9548/TCA9548A-style switches whose single control register
+holds one enable bit per downstream channel. Muxes may be cascaded: each
+:py:class:`I2cMux` is attached either to the root segment of the adapter
+or to a channel of another mux.
+
+:py:class:`MuxedSMBus` remembers which channel each mux has selected, only
+writes the control register when the selection actually changes, and can
+group queued operations per channel to minimize switching.
+"""
+
+from .smbus3 import SMBus
+
+
+class I2cMux:
+    """
+    A multiplexer in the topology of a :py:class:`MuxedSMBus`.
+
+    :ivar address: i2c address of the mux control register.
+    :ivar channels: number of downstream channels.
+    :ivar parent: ``(mux, channel)`` the mux sits behind, or None for the
+        root segment.
+    :ivar selected: cached channel currently enabled, None when no channel
+        is enabled, or ``UNKNOWN`` when the state must be re-read/re-written.
+    """
+
+    UNKNOWN = -1
+
+    def __init__(self, address, channels=8, parent=None):
+        """
+        Describe a multiplexer.
+
+        :param address: i2c address of the mux.
+        :type address: int
+        :param channels: number of downstream channels (8 for PCA9548).
+        :type channels: int
+        :param parent: ``(mux, channel)`` this mux is connected to, if it is
+            not on the root segment.
+        :type parent: tuple
+        """
+        self.address = address
+        self.channels = channels
+        self.parent = parent
+        self.selected = I2cMux.UNKNOWN
+
+    def __repr__(self):
+        return f"I2cMux(0x{self.address:02X}, channels={self.channels}, parent={self.parent!r})"
+
+    def path(self):
+        """
+        The chain of ``(mux, channel)`` selections leading to this mux.
+
+        :rtype: list
+        """
+        path = []
+        parent = self.parent
+        while parent is not None:
+            path.append(parent)
+            parent = parent[0].parent
+        path.reverse()
+        return path
+
+
+class _Channel:
+    """
+    SMBus-like view of one mux channel, see :py:meth:`MuxedSMBus.channel`.
+    Private.
+    """
+
+    def __init__(self, muxed, mux, channel):
+        self._muxed = muxed
+        self._mux = mux
+        self._channel = channel
+
+    def __getattr__(self, name):
+        method = getattr(self._muxed.bus, name)
+        muxed, mux, channel = self._muxed, self._mux, self._channel
+
+        def call(*args, **kwargs):
+            muxed.select(mux, channel)
+            return method(*args, **kwargs)
+
+        return call
+
+
+class MuxedSMBus:
+    """
+    Wraps a :py:class:`~smbus3.SMBus` with a model of its multiplexer tree.
+    """
+
+    def __init__(self, bus):
+        """
+        Initialize the wrapper.
+
+        :param bus: i2c bus number, device path, or an open
+            :py:class:`~smbus3.SMBus` (or SMBus compatible) instance.
+        :type bus: int, str or SMBus
+        """
+        # Bus numbers and paths are opened (and closed) by the wrapper, any
+        # other object is used as the bus
+        self._owns_bus = isinstance(bus, (int, str))  # noqa: UP038 (Python 3.8)
+        self.bus = SMBus(bus) if self._owns_bus else bus
+        self.muxes = []
+        self.selects = 0
+        self._queue = []
+
+    def __enter__(self):
+        """Enter handler."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.close()
+
+    def close(self):
+        """
+        Close the underlying bus if it was opened by this wrapper.
+
+        :rtype: None
+        """
+        if self._owns_bus:
+            self.bus.close()
+
+    def add_mux(self, address, channels=8, parent=None):
+        """
+        Add a multiplexer to the topology.
+
+        :param address: i2c address of the mux.
+        :type address: int
+        :param channels: number of downstream channels.
+        :type channels: int
+        :param parent: ``(mux, channel)`` the new mux is connected to.
+        :type parent: tuple
+        :return: The new mux
+        :rtype: I2cMux
+        """
+        mux = I2cMux(address, channels, parent)
+        self.muxes.append(mux)
+        return mux
+
+    def _segment(self, parent):
+        """
+        Muxes sitting directly on the segment reached through ``parent``.
+        Private.
+        """
+        return [mux for mux in self.muxes if mux.parent == parent]
+
+    def _write(self, mux, channel):
+        """
+        Program a mux control register and update the cache.
+        Private.
+        """
+        mux.selected = I2cMux.UNKNOWN
+        self.bus.write_byte(mux.address, 0 if channel is None else 1 << channel)
+        self.selects += 1
+        mux.selected = channel
+
+    def _route(self, mux, channel):
+        """
+        Select ``channel`` on ``mux``, disabling other muxes on the same
+        segment so that only one downstream path is connected.
+        Private.
+        """
+        if mux.selected == channel:
+            return
+        for sibling in self._segment(mux.parent):
+            if sibling is not mux and sibling.selected is not None:
+                self._write(sibling, None)
+        self._write(mux, channel)
+
+    def select(self, mux, channel):
+        """
+        Connect the root segment to ``channel`` of ``mux``.
+
+        Control registers are only written for muxes along the path whose
+        cached selection differs. If a write fails, the affected mux is
+        marked as being in an unknown state and reprogrammed on next use.
+
+        :param mux: target mux.
+        :type mux: I2cMux
+        :param channel: channel to enable, or None to disable all channels.
+        :type channel: int
+        :raise ValueError: if the channel does not exist on the mux.
+        :rtype: None
+        """
+        if channel is not None and not 0 <= channel < mux.channels:
+            raise ValueError(f"Mux 0x{mux.address:02X} has no channel {channel}")
+        for parent, parent_channel in mux.path():
+            self._route(parent, parent_channel)
+        self._route(mux, channel)
+
+    def deselect_all(self):
+        """
+        Disable every channel of every mux.
+
+        :rtype: None
+        """
+        for mux in self.muxes:
+            if mux.selected is not None:
+                for parent, parent_channel in mux.path():
+                    self._route(parent, parent_channel)
+                self._write(mux, None)
+
+    def invalidate(self):
+        """
+        Forget all cached selections, e.g. after a mux was reset externally.
+
+        :rtype: None
+        """
+        for mux in self.muxes:
+            mux.selected = I2cMux.UNKNOWN
+
+    def channel(self, mux, channel):
+        """
+        SMBus-like object whose methods select ``channel`` of ``mux`` first.
+
+        :param mux: target mux.
+        :type mux: I2cMux
+        :param channel: channel to enable.
+        :type channel: int
+        :return: object offering the methods of :py:class:`~smbus3.SMBus`
+        """
+        return _Channel(self, mux, channel)
+
+    def submit(self, mux, channel, method, *args, **kwargs):
+        """
+        Queue an operation to run behind ``channel`` of ``mux`` on the next
+        :py:meth:`flush`.
+
+        :param mux: target mux, or None for a device on the root segment.
+        :type mux: I2cMux
+        :param channel: channel to enable.
+        :type channel: int
+        :param method: name of the :py:class:`~smbus3.SMBus` method to call.
+        :type method: str
+        :rtype: None
+        """
+        self._queue.append((mux, channel, method, args, kwargs))
+
+    def flush(self):
+        """
+        Run all queued operations, grouped by channel.
+
+        Operations are executed channel after channel, in submission order
+        within each channel, starting with the channel that is already
+        selected, so that every channel is selected at most once.
+
+        :return: Results (or raised exceptions) in submission order
+        :rtype: list
+        """
+        queue, self._queue = self._queue, []
+        groups = {}
+        for idx, (mux, channel, method, args, kwargs) in enumerate(queue):
+            key = (id(mux), channel)
+            groups.setdefault(key, []).append((idx, mux, channel, method, args, kwargs))
+        order = sorted(
+            groups.values(),
+            key=lambda group: group[0][1] is not None and group[0][1].selected != group[0][2],
+        )
+        results = [None] * len(queue)
+        for group in order:
+            for idx, mux, channel, method, args, kwargs in group:
+                try:
+                    if mux is not None:
+                        self.select(mux, channel)
+                    results[idx] = getattr(self.bus, method)(*args, **kwargs)
+                except OSError as e:
+                    results[idx] = e
+        return results
@@ -0,0 +1,44 @@
+from types import TracebackType
+from typing import Any
+
+from .smbus3 import SMBus
+
+class I2cMux:
+    UNKNOWN: int
+    address: int
+    channels: int
+    parent: tuple[I2cMux, int] | None
+    selected: int | None
+    def __init__(
+        self, address: int, channels: int = 8, parent: tuple[I2cMux, int] | None = None
+    ) -> None: ...
+    def path(self) -> list[tuple[I2cMux, int]]: ...
+
+class _Channel:
+    def __init__(self, muxed: MuxedSMBus, mux: I2cMux, channel: int) -> None: ...
+    def __getattr__(self, name: str) -> Any: ...
+
+class MuxedSMBus:
+    bus: SMBus
+    muxes: list[I2cMux]
+    selects: int
+    def __init__(self, bus: int | str | SMBus) -> None: ...
+    def __enter__(self) -> MuxedSMBus: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    def close(self) -> None: ...
+    def add_mux(
+        self, address: int, channels: int = 8, parent: tuple[I2cMux, int] | None = None
+    ) -> I2cMux: ...
+    def select(self, mux: I2cMux, channel: int | None) -> None: ...
+    def deselect_all(self) -> None: ...
+    def invalidate(self) -> None: ...
+    def channel(self, mux: I2cMux, channel: int) -> _Channel: ...
+    def submit(
+        self, mux: I2cMux | None, channel: int | None, method: str, *args: Any, **kwargs: Any
+    ) -> None: ...
+    def flush(self) -> list[Any]: ...
@@ -0,0 +1,12 @@
+from collections.abc import Iterable, Sequence
+
+from .smbus3 import i2c_msg
+
+SMBUS_PEC_POLY: int
+I2C_M_RD: int
+CRC8_TABLE: bytes
+
+def _crc8_bitwise(data: bytes | bytearray | Sequence[int], crc: int = 0) -> int: ...
+def crc8(data: bytes | bytearray | Sequence[int], crc: int = 0) -> int: ...
+def address_byte(i2c_addr: int, read: bool | int) -> int: ...
+def messages_pec(msgs: Iterable[i2c_msg], crc: int = 0) -> int: ...
@@ -0,0 +1,143 @@
+"""
+smbus3.realtime - Real-time scheduling options for acquisition threads.
+
+:py:class:`RealtimeOptions` gathers the usual measures against latency
+spikes in periodic acquisition loops: pinning the thread to a set of CPUs so
+that it is not migrated, the ``SCHED_FIFO`` policy so that it preempts
+regular processes, and locking the process memory (after pre-faulting heap
+space) so that the loop never waits for a page fault.
+
+The options are applied by the thread which runs the loop, each one
+independently: an option which is not permitted (e.g. ``SCHED_FIFO``
+without ``CAP_SYS_NICE``) or not supported is skipped, and reported in the
+:py:class:`RealtimeReport`. CPU affinity and scheduling policy apply to the
+calling thread only, memory locking to the whole process.
+"""
+
+import ctypes
+import os
+from collections import namedtuple
+
+# From uapi/asm-generic/mman-common.h (also used by x86 and arm)
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+# mallopt() parameters from glibc's malloc.h
+_M_TRIM_THRESHOLD = -1
+_M_MMAP_MAX = -4
+
+_PAGE_SIZE = 4096
+
+RealtimeReport = namedtuple(
+    "RealtimeReport", ["affinity", "priority", "memory_locked", "prefaulted", "errors"]
+)
+"""
+Options applied by :py:meth:`RealtimeOptions.apply`.
+
+:ivar affinity: set of CPUs the thread is pinned to, or None
+:ivar priority: ``SCHED_FIFO`` priority of the thread, or None
+:ivar memory_locked: whether the process memory is locked
+:ivar prefaulted: bytes of heap pre-faulted and kept by the allocator
+:ivar errors: dict mapping the options which could not be applied
+    (``"affinity"``, ``"priority"``, ``"lock_memory"``, ``"prefault"``) to
+    the reason
+"""
+
+
+def _libc():
+    """
+    The C library, for the calls the os module does not offer.
+    Private.
+    """
+    return ctypes.CDLL(None, use_errno=True)
+
+
+class RealtimeOptions:
+    """
+    Real-time options for a sampling or worker thread.
+    """
+
+    def __init__(self, cpus=None, priority=None, lock_memory=False, prefault=0):
+        """
+        Configure the options. All are disabled by default.
+
+        :param cpus: CPUs to pin the thread to.
+        :type cpus: Iterable[int]
+        :param priority: ``SCHED_FIFO`` priority, between 1 and 99 (capped
+            to the maximum of the system).
+        :type priority: int
+        :param lock_memory: lock the current and future memory of the
+            process with ``mlockall()``.
+        :type lock_memory: bool
+        :param prefault: bytes of heap to fault in and keep allocated to the
+            process, so that later allocations of the loop do not fault.
+            With glibc, heap trimming and ``mmap`` allocations are disabled
+            to keep that memory.
+        :type prefault: int
+        """
+        self.cpus = None if cpus is None else frozenset(cpus)
+        self.priority = priority
+        self.lock_memory = lock_memory
+        self.prefault = prefault
+
+    def apply(self):
+        """
+        Apply the options to the calling thread, skipping those which fail.
+
+        :return: The options applied, and why the others were not
+        :rtype: RealtimeReport
+        """
+        errors = {}
+        affinity = priority = None
+        memory_locked = False
+        prefaulted = 0
+        if self.cpus is not None:
+            try:
+                os.sched_setaffinity(0, self.cpus)
+                affinity = os.sched_getaffinity(0)
+            except (OSError, AttributeError) as e:
+                errors["affinity"] = str(e)
+        if self.priority is not None:
+            try:
+                priority = min(self.priority, os.sched_get_priority_max(os.SCHED_FIFO))
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            except (OSError, AttributeError) as e:
+                priority = None
+                errors["priority"] = str(e)
+        if self.prefault:
+            try:
+                prefaulted = self._prefault()
+            except (OSError, AttributeError) as e:
+                errors["prefault"] = str(e)
+        if self.lock_memory:
+            try:
+                self._lock_memory()
+                memory_locked = True
+            except (OSError, AttributeError) as e:
+                errors["lock_memory"] = str(e)
+        return RealtimeReport(affinity, priority, memory_locked, prefaulted, errors)
+
+    def _prefault(self):
+        """
+        Fault in :py:attr:`prefault` bytes of heap and release them to the
+        allocator, which keeps them once trimming is disabled.
+        Private.
+        """
+        libc = _libc()
+        if not (libc.mallopt(_M_TRIM_THRESHOLD, -1) and libc.mallopt(_M_MMAP_MAX, 0)):
+            raise OSError("mallopt() is not supported by the C library")
+        buffer = bytearray(self.prefault)
+        # Write one byte per page, so that every page is mapped
+        buffer[::_PAGE_SIZE] = b"\x01" * len(range(0, self.prefault, _PAGE_SIZE))
+        del buffer
+        return self.prefault
+
+    def _lock_memory(self):
+        """
+        Lock the current and future pages of the process.
+        Private.
+        """
+        libc = _libc()
+        if libc.mlockall(MCL_CURRENT | MCL_FUTURE) != 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
@@ -0,0 +1,26 @@
+from collections.abc import Iterable
+from typing import NamedTuple
+
+MCL_CURRENT: int
+MCL_FUTURE: int
+
+class RealtimeReport(NamedTuple):
+    affinity: set[int] | None
+    priority: int | None
+    memory_locked: bool
+    prefaulted: int
+    errors: dict[str, str]
+
+class RealtimeOptions:
+    cpus: frozenset[int] | None
+    priority: int | None
+    lock_memory: bool
+    prefault: int
+    def __init__(
+        self,
+        cpus: Iterable[int] | None = None,
+        priority: int | None = None,
+        lock_memory: bool = False,
+        prefault: int = 0,
+    ) -> None: ...
+    def apply(self) -> RealtimeReport: ...
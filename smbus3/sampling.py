@@ -0,0 +1,289 @@
+"""
+smbus3.sampling - Periodic register sampling.
+
+A :py:class:`Sampler` reads a fixed set of registers every ``interval``
+seconds and yields each result as a :py:class:`Sample` holding one *frame*:
+the register contents concatenated in configuration order. Frames are plain
+``bytes`` with a fixed layout, which the stages of :py:mod:`smbus3.stream`
+consume without decoding every register.
+
+A :py:class:`Jitter` records when each sample was taken relative to its
+schedule, for the timing statistics of periodic acquisitions.
+"""
+
+import math
+import time
+from array import array
+from collections import namedtuple
+
+from .snapshot import read_register
+
+Sample = namedtuple("Sample", ["seq", "timestamp_ns", "frame"])
+"""
+One sampling cycle.
+
+:ivar seq: cycle number, starting at 1 (cycles skipped on deadline
+    overruns are counted too, so gaps are visible)
+:ivar timestamp_ns: ``time.monotonic_ns()`` at which sampling completed,
+    or the midpoint of the cycle's transfers when the sampler has a ``clock``
+:ivar frame: register contents, concatenated in configuration order
+"""
+
+JitterStatistics = namedtuple(
+    "JitterStatistics",
+    ["samples", "interval_mean_ns", "interval_stddev_ns", "deviation_ns"],
+)
+"""
+Timing statistics of a periodic acquisition.
+
+:ivar samples: number of samples recorded
+:ivar interval_mean_ns: mean time between consecutive samples
+:ivar interval_stddev_ns: standard deviation of the time between
+    consecutive samples
+:ivar deviation_ns: dict mapping percentiles (50, 90, 99 and 100) to the
+    deviation of the sample timestamps from their schedule, over the most
+    recent samples
+"""
+
+# Percentiles reported in JitterStatistics.deviation_ns
+_PERCENTILES = (50, 90, 99, 100)
+
+
+def frame_layout(registers):
+    """
+    Location of each register in a frame.
+
+    :param registers: ``(i2c_addr, register, length)`` triples.
+    :type registers: list
+    :return: ``((i2c_addr, register), start, end)`` for every register
+    :rtype: list
+    """
+    layout = []
+    offset = 0
+    for i2c_addr, register, length in registers:
+        layout.append(((i2c_addr, register), offset, offset + length))
+        offset += length
+    return layout
+
+
+class Jitter:
+    """
+    Accumulates the timing of a periodic acquisition: the interval between
+    consecutive samples, and how far each sample deviates from its schedule.
+
+    Interval statistics cover every recorded sample, deviation percentiles
+    the last ``window`` samples.
+    """
+
+    def __init__(self, window=10000):
+        """
+        Create an empty record.
+
+        :param window: number of recent deviations kept for percentiles.
+        :type window: int
+        """
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all recorded samples.
+
+        :rtype: None
+        """
+        self.samples = 0
+        self._last_ns = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        # Preallocated, so that recording never allocates
+        self._deviations = array("q", bytes(8 * self.window))
+
+    def record(self, scheduled_ns, timestamp_ns):
+        """
+        Record one sample.
+
+        :param scheduled_ns: time at which the sample was scheduled.
+        :type scheduled_ns: int
+        :param timestamp_ns: time at which the sample was taken, in the
+            same clock.
+        :type timestamp_ns: int
+        :rtype: None
+        """
+        if self._last_ns is not None:
+            # Welford's online mean and variance of the intervals
+            interval = timestamp_ns - self._last_ns
+            count = self.samples
+            delta = interval - self._mean
+            self._mean += delta / count
+            self._m2 += delta * (interval - self._mean)
+        self._last_ns = timestamp_ns
+        self._deviations[self.samples % self.window] = timestamp_ns - scheduled_ns
+        self.samples += 1
+
+    def statistics(self):
+        """
+        Statistics of the samples recorded so far.
+
+        :rtype: JitterStatistics
+        """
+        intervals = self.samples - 1
+        stddev = math.sqrt(self._m2 / intervals) if intervals > 0 else 0.0
+        deviations = sorted(self._deviations[: min(self.samples, self.window)])
+        percentiles = {}
+        if deviations:
+            for percentile in _PERCENTILES:
+                rank = math.ceil(percentile / 100 * len(deviations)) - 1
+                percentiles[percentile] = deviations[max(rank, 0)]
+        return JitterStatistics(self.samples, self._mean, stddev, percentiles)
+
+
+class Sampler:
+    """
+    Samples registers over an i2c bus at a fixed rate.
+
+    :ivar jitter: timing of the samples yielded by iteration, see
+        :py:class:`Jitter`.
+    :ivar transfer_times: with a ``clock``, the midpoint of the transfer
+        of each register in the last frame, in configuration order.
+    :ivar realtime_report: with ``realtime`` options, the
+        :py:class:`~smbus3.realtime.RealtimeReport` of the iterating thread.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self, bus, registers, interval, deadline_us=None, clock=None, realtime=None
+    ):
+        """
+        Configure the sampler.
+
+        :param bus: open bus used for sampling.
+        :type bus: SMBus
+        :param registers: ``(i2c_addr, register, length)`` triples to sample.
+        :type registers: list
+        :param interval: sampling period in seconds.
+        :type interval: float
+        :param deadline_us: optional time budget for sampling all registers
+            once, in microseconds (see :py:meth:`smbus3.SMBus.deadline`).
+        :type deadline_us: float
+        :param clock: ``time.CLOCK_MONOTONIC`` or ``time.CLOCK_MONOTONIC_RAW``
+            to timestamp every transfer with, see
+            :py:meth:`smbus3.SMBus.timestamps`. Sample timestamps are then
+            the midpoint of their first and last transfer, and the schedule
+            follows the same clock.
+        :type clock: int
+        :param realtime: real-time options applied by the thread iterating
+            over the sampler, before the first cycle.
+        :type realtime: RealtimeOptions
+        """
+        self.bus = bus
+        self.registers = [tuple(entry) for entry in registers]
+        self.interval = interval
+        self.deadline_us = deadline_us
+        self.clock = clock
+        self.realtime = realtime
+        self.realtime_report = None
+        self.layout = frame_layout(self.registers)
+        self.frame_size = sum(length for _, _, length in self.registers)
+        self.seq = 0
+        self.skipped = 0
+        self.jitter = Jitter()
+        self.transfer_times = array("q", bytes(8 * len(self.layout)))
+        self._staging = bytearray(self.frame_size)
+        self._span = None
+
+    def read_frame(self):
+        """
+        Read all configured registers once.
+
+        :raise TimeoutError: if sampling exceeded :py:attr:`deadline_us`.
+        :return: Frame
+        :rtype: bytes
+        """
+        staging = self._staging
+        bus = self.bus
+        if self.clock is not None:
+            with bus.timestamps(self.clock) as stamps:
+                if self.deadline_us is None:
+                    self._read_timestamped(stamps)
+                else:
+                    with bus.deadline(self.deadline_us):
+                        self._read_timestamped(stamps)
+        elif self.deadline_us is None:
+            for (i2c_addr, register), start, end in self.layout:
+                staging[start:end] = read_register(bus, i2c_addr, register, end - start)
+        else:
+            with bus.deadline(self.deadline_us):
+                for (i2c_addr, register), start, end in self.layout:
+                    staging[start:end] = read_register(bus, i2c_addr, register, end - start)
+        return bytes(staging)
+
+    def _read_timestamped(self, stamps):
+        """
+        Read all registers into the staging buffer, recording the midpoint
+        of each register's transfers and the span of the whole cycle.
+        Private.
+        """
+        staging = self._staging
+        bus = self.bus
+        times = self.transfer_times
+        for idx, ((i2c_addr, register), start, end) in enumerate(self.layout):
+            first = len(stamps)
+            staging[start:end] = read_register(bus, i2c_addr, register, end - start)
+            times[idx] = (stamps[first][0] + stamps[-1][1]) // 2
+        self._span = (stamps[0][0], stamps[-1][1])
+
+    def sample(self):
+        """
+        Perform one sampling cycle.
+
+        :raise TimeoutError: if sampling exceeded :py:attr:`deadline_us`.
+        :rtype: Sample
+        """
+        self.seq += 1
+        frame = self.read_frame()
+        if self.clock is None:
+            return Sample(self.seq, time.monotonic_ns(), frame)
+        start, end = self._span
+        return Sample(self.seq, (start + end) // 2, frame)
+
+    def _now_ns(self):
+        """
+        Current time in the clock of the schedule.
+        Private.
+        """
+        if self.clock is None:
+            return time.monotonic_ns()
+        return time.clock_gettime_ns(self.clock)
+
+    def __iter__(self):
+        """
+        Sample every :py:attr:`interval` seconds, forever. Cycles which
+        exceed :py:attr:`deadline_us` are counted in :py:attr:`skipped` and
+        not yielded. The timing of yielded samples is recorded in
+        :py:attr:`jitter`.
+
+        With :py:attr:`realtime` options, they are applied first, then one
+        frame is read and discarded so that the buffers the bus allocates
+        lazily for the thread exist before the schedule starts.
+
+        :rtype: Iterator[Sample]
+        """
+        if self.realtime is not None:
+            self.realtime_report = self.realtime.apply()
+            try:
+                self.read_frame()
+            except OSError:
+                pass
+        interval_ns = int(self.interval * 1e9)
+        scheduled = self._now_ns()
+        while True:
+            try:
+                sample = self.sample()
+            except TimeoutError:
+                self.skipped += 1
+            else:
+                self.jitter.record(scheduled, sample.timestamp_ns)
+                yield sample
+            scheduled += interval_ns
+            delay = scheduled - self._now_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
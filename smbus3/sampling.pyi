@@ -0,0 +1,56 @@
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+
+from .realtime import RealtimeOptions, RealtimeReport
+from .smbus3 import SMBus
+
+class Sample(NamedTuple):
+    seq: int
+    timestamp_ns: int
+    frame: bytes
+
+class JitterStatistics(NamedTuple):
+    samples: int
+    interval_mean_ns: float
+    interval_stddev_ns: float
+    deviation_ns: dict[int, int]
+
+def frame_layout(
+    registers: Iterable[tuple[int, int, int]],
+) -> list[tuple[tuple[int, int], int, int]]: ...
+
+class Jitter:
+    window: int
+    samples: int
+    def __init__(self, window: int = 10000) -> None: ...
+    def reset(self) -> None: ...
+    def record(self, scheduled_ns: int, timestamp_ns: int) -> None: ...
+    def statistics(self) -> JitterStatistics: ...
+
+class Sampler:
+    bus: SMBus
+    registers: list[tuple[int, int, int]]
+    interval: float
+    deadline_us: float | None
+    clock: int | None
+    realtime: RealtimeOptions | None
+    realtime_report: RealtimeReport | None
+    layout: list[tuple[tuple[int, int], int, int]]
+    frame_size: int
+    seq: int
+    skipped: int
+    jitter: Jitter
+    transfer_times: array[int]
+    def __init__(  # noqa: PLR0913
+        self,
+        bus: SMBus,
+        registers: Iterable[tuple[int, int, int]],
+        interval: float,
+        deadline_us: float | None = None,
+        clock: int | None = None,
+        realtime: RealtimeOptions | None = None,
+    ) -> None: ...
+    def read_frame(self) -> bytes: ...
+    def sample(self) -> Sample: ...
+    def __iter__(self) -> Iterator[Sample]: ...
@@ -0,0 +1,322 @@
+"""
+smbus3.scheduler - Priority scheduling of transfers on one adapter.
+
+A :py:class:`TransferScheduler` owns a worker thread which performs every
+transfer on its :py:class:`~smbus3.SMBus`, picking the next one by priority
+class. Bulk operations (long EEPROM reads, firmware uploads) are split into
+chunks of at most one I2C block each, so queued high priority transfers
+never wait for more than one chunk. Lower classes are protected from
+starvation by aging: an operation which waited for ``max_wait`` seconds runs
+next, whatever its class.
+
+Use one scheduler per adapter, and route every transfer on that adapter
+through it.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from .smbus3 import I2C_SMBUS_BLOCK_MAX, SMBus
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+# Last register reachable with the 8-bit command of I2C block transfers
+_REGISTER_MAX = 0xFF
+
+
+def _check_registers(register, length):
+    """
+    Raise ValueError unless length registers from register on can be
+    addressed with an 8-bit command.
+    Private.
+    """
+    if not 0 <= register <= _REGISTER_MAX or register + length - 1 > _REGISTER_MAX:
+        raise ValueError(f"Registers 0x{register:X} to 0x{register + length - 1:X} out of range")
+
+
+class _Job:
+    """
+    A queued operation: an iterator of steps, each one transfer.
+    Private.
+    """
+
+    __slots__ = (
+        "combine",
+        "future",
+        "priority",
+        "results",
+        "started",
+        "step",
+        "steps",
+        "waiting_since",
+    )
+
+    def __init__(self, priority, steps, combine):
+        self.priority = priority
+        self.steps = iter(steps)
+        self.step = next(self.steps, None)
+        self.combine = combine
+        self.future = Future()
+        self.results = []
+        self.started = False
+        self.waiting_since = time.monotonic()
+
+    def finish(self):
+        """
+        Resolve the future once all steps ran.
+        """
+        results = self.results
+        try:
+            self.future.set_result(results if self.combine is None else self.combine(results))
+        except Exception as e:
+            self.future.set_exception(e)
+
+
+class _PriorityView:
+    """
+    SMBus-like view of a scheduler, see :py:meth:`TransferScheduler.view`.
+    Private.
+    """
+
+    def __init__(self, scheduler, priority):
+        self._scheduler = scheduler
+        self._priority = priority
+
+    def __getattr__(self, name):
+        scheduler, priority = self._scheduler, self._priority
+
+        def call(*args, **kwargs):
+            return scheduler.submit(name, *args, priority=priority, **kwargs).result()
+
+        return call
+
+
+class TransferScheduler:
+    """
+    Serializes the transfers on one adapter by priority class.
+
+    :ivar max_latency: longest time, in seconds, an operation of each class
+        waited before its first transfer started.
+    :ivar realtime_report: with ``realtime`` options, the
+        :py:class:`~smbus3.realtime.RealtimeReport` of the worker thread.
+    """
+
+    def __init__(self, bus, classes=3, max_wait=0.1, realtime=None):
+        """
+        Start the scheduler.
+
+        :param bus: i2c bus number, device path, or an open
+            :py:class:`~smbus3.SMBus` (or SMBus compatible) instance.
+        :type bus: int, str or SMBus
+        :param classes: number of priority classes, 0 being the highest.
+        :type classes: int
+        :param max_wait: time in seconds after which a waiting operation runs
+            regardless of its priority class.
+        :type max_wait: float
+        :param realtime: real-time options applied by the worker thread
+            before it serves the first operation.
+        :type realtime: RealtimeOptions
+        """
+        # Bus numbers and paths are opened (and closed) by the scheduler, any
+        # other object is used as the bus
+        self._owns_bus = isinstance(bus, (int, str))  # noqa: UP038 (Python 3.8)
+        self.bus = SMBus(bus) if self._owns_bus else bus
+        self.max_wait = max_wait
+        self.max_latency = [0.0] * classes
+        self._queues = [deque() for _ in range(classes)]
+        self._cond = threading.Condition()
+        self._closed = False
+        self.realtime = realtime
+        self.realtime_report = None
+        self._ready = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="smbus3-scheduler", daemon=True)
+        self._worker.start()
+        self._ready.wait()
+
+    def __enter__(self):
+        """Enter handler."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.close()
+
+    def close(self):
+        """
+        Run the operations already queued, stop the worker and close the
+        bus if it was opened by the scheduler.
+
+        :rtype: None
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+        if self._owns_bus:
+            self.bus.close()
+
+    def submit_steps(self, steps, priority=PRIORITY_BULK, combine=None):
+        """
+        Queue an operation made of several transfers. Operations of higher
+        priority may run between two steps.
+
+        :param steps: callables taking the bus, each performing one transfer.
+        :type steps: Iterable[Callable]
+        :param priority: priority class, 0 being the highest.
+        :type priority: int
+        :param combine: callable turning the list of step results into the
+            result of the operation. Defaults to the list itself.
+        :type combine: Callable
+        :raise ValueError: on an unknown priority class.
+        :raise RuntimeError: if the scheduler is closed.
+        :return: Future resolving to the result, or raising the exception of
+            the failed step (later steps are skipped)
+        :rtype: concurrent.futures.Future
+        """
+        if not 0 <= priority < len(self._queues):
+            raise ValueError(f"Unexpected priority={priority}")
+        job = _Job(priority, steps, combine)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is closed")
+            self._queues[priority].append(job)
+            self._cond.notify()
+        return job.future
+
+    def submit(self, method, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """
+        Queue one call of a :py:class:`~smbus3.SMBus` method.
+
+        :param method: name of the method, e.g. ``"read_byte_data"``.
+        :type method: str
+        :param priority: priority class, 0 being the highest.
+        :type priority: int
+        :rtype: concurrent.futures.Future
+        """
+        return self.submit_steps(
+            (lambda bus: getattr(bus, method)(*args, **kwargs),),
+            priority,
+            lambda results: results[0],
+        )
+
+    def read_chunked(self, i2c_addr, register, length, priority=PRIORITY_BULK):
+        """
+        Queue a long read of consecutive registers, split into I2C block reads.
+
+        :param i2c_addr: i2c address
+        :type i2c_addr: int
+        :param register: first register.
+        :type register: int
+        :param length: number of bytes.
+        :type length: int
+        :param priority: priority class, 0 being the highest.
+        :type priority: int
+        :raise ValueError: if the registers extend beyond 0xFF.
+        :return: Future resolving to the bytes read
+        :rtype: concurrent.futures.Future
+        """
+        _check_registers(register, length)
+        steps = [
+            lambda bus, offset=offset: bus.read_i2c_block_data(
+                i2c_addr, register + offset, min(I2C_SMBUS_BLOCK_MAX, length - offset)
+            )
+            for offset in range(0, length, I2C_SMBUS_BLOCK_MAX)
+        ]
+        return self.submit_steps(steps, priority, lambda results: b"".join(map(bytes, results)))
+
+    def write_chunked(self, i2c_addr, register, data, priority=PRIORITY_BULK):
+        """
+        Queue a long write of consecutive registers, split into I2C block writes.
+
+        :param i2c_addr: i2c address
+        :type i2c_addr: int
+        :param register: first register.
+        :type register: int
+        :param data: bytes to write.
+        :type data: bytes or list
+        :param priority: priority class, 0 being the highest.
+        :type priority: int
+        :raise ValueError: if the registers extend beyond 0xFF.
+        :rtype: concurrent.futures.Future
+        """
+        data = bytes(data)
+        _check_registers(register, len(data))
+        steps = [
+            lambda bus, offset=offset: bus.write_i2c_block_data(
+                i2c_addr, register + offset, list(data[offset : offset + I2C_SMBUS_BLOCK_MAX])
+            )
+            for offset in range(0, len(data), I2C_SMBUS_BLOCK_MAX)
+        ]
+        return self.submit_steps(steps, priority, lambda results: None)
+
+    def view(self, priority):
+        """
+        SMBus-like object whose methods are submitted with ``priority`` and
+        block until they completed.
+
+        :param priority: priority class, 0 being the highest.
+        :type priority: int
+        :return: object offering the methods of :py:class:`~smbus3.SMBus`
+        """
+        return _PriorityView(self, priority)
+
+    def _next_job(self):
+        """
+        Dequeue the job to run next: the oldest job waiting for longer than
+        :py:attr:`max_wait`, else the first job of the highest class.
+        Private.
+        """
+        now = time.monotonic()
+        starved = None
+        for queue in self._queues:
+            if queue and now - queue[0].waiting_since >= self.max_wait:
+                if starved is None or queue[0].waiting_since < starved[0].waiting_since:
+                    starved = queue
+        if starved is not None:
+            return starved.popleft()
+        for queue in self._queues:
+            if queue:
+                return queue.popleft()
+        return None
+
+    def _run(self):
+        """
+        Worker thread: run one step at a time, re-queueing unfinished jobs
+        at the back of their class.
+        Private.
+        """
+        if self.realtime is not None:
+            self.realtime_report = self.realtime.apply()
+        self._ready.set()
+        cond = self._cond
+        while True:
+            with cond:
+                job = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    cond.wait()
+                    job = self._next_job()
+            if not job.started:
+                job.started = True
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                waited = time.monotonic() - job.waiting_since
+                self.max_latency[job.priority] = max(self.max_latency[job.priority], waited)
+            if job.step is not None:
+                try:
+                    job.results.append(job.step(self.bus))
+                    job.step = next(job.steps, None)
+                except Exception as e:
+                    job.future.set_exception(e)
+                    continue
+            if job.step is None:
+                job.finish()
+                continue
+            with cond:
+                job.waiting_since = time.monotonic()
+                self._queues[job.priority].append(job)
@@ -0,0 +1,67 @@
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Future
+from types import TracebackType
+from typing import Any
+
+from .realtime import RealtimeOptions, RealtimeReport
+from .smbus3 import SMBus
+
+PRIORITY_HIGH: int
+PRIORITY_NORMAL: int
+PRIORITY_BULK: int
+
+class _Job:
+    priority: int
+    step: Callable[[SMBus], Any] | None
+    combine: Callable[[list[Any]], Any] | None
+    future: Future[Any]
+    results: list[Any]
+    started: bool
+    waiting_since: float
+    def __init__(
+        self,
+        priority: int,
+        steps: Iterable[Callable[[SMBus], Any]],
+        combine: Callable[[list[Any]], Any] | None,
+    ) -> None: ...
+    def finish(self) -> None: ...
+
+class _PriorityView:
+    def __init__(self, scheduler: TransferScheduler, priority: int) -> None: ...
+    def __getattr__(self, name: str) -> Any: ...
+
+class TransferScheduler:
+    bus: SMBus
+    max_wait: float
+    max_latency: list[float]
+    realtime: RealtimeOptions | None
+    realtime_report: RealtimeReport | None
+    def __init__(
+        self,
+        bus: int | str | SMBus,
+        classes: int = 3,
+        max_wait: float = 0.1,
+        realtime: RealtimeOptions | None = None,
+    ) -> None: ...
+    def __enter__(self) -> TransferScheduler: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    def close(self) -> None: ...
+    def submit_steps(
+        self,
+        steps: Iterable[Callable[[SMBus], Any]],
+        priority: int = ...,
+        combine: Callable[[list[Any]], Any] | None = None,
+    ) -> Future[Any]: ...
+    def submit(self, method: str, *args: Any, priority: int = ..., **kwargs: Any) -> Future[Any]: ...
+    def read_chunked(
+        self, i2c_addr: int, register: int, length: int, priority: int = ...
+    ) -> Future[bytes]: ...
+    def write_chunked(
+        self, i2c_addr: int, register: int, data: Sequence[int] | bytes, priority: int = ...
+    ) -> Future[None]: ...
+    def view(self, priority: int) -> _PriorityView: ...
@@ -0,0 +1,362 @@
+"""
+smbus3.script - i2ctransfer style transaction scripts.
+
+A script lists transactions in the message syntax of i2c-tools'
+``i2ctransfer``, one transaction per line (or separated by ``;``)::
+
+    # Reset, then read the identification registers
+    w2@0x40 0xfe 0x01
+    delay 10ms
+    w1@0x40 0x00 r2 > ident
+    w3@0x50 0x00 0x00 0xff=     # fill the rest of the message with 0xff
+    stop
+
+- ``{r|w}LENGTH[@ADDRESS]`` starts a read or write message. The address
+  defaults to the one of the previous message.
+- Write messages are followed by their ``LENGTH`` data bytes. A byte
+  suffixed with ``=`` fills the rest of the message with its value, with
+  ``+`` or ``-`` with values incremented or decremented from it.
+- ``> NAME`` after a read message captures its data under a name.
+- ``delay DURATION`` waits for a duration in ``s``, ``ms`` (the default)
+  or ``us``.
+- ``stop`` ends the current ioctl, so that the next transaction starts
+  after a stop condition.
+
+The script is compiled once into a :py:class:`TransactionPlan`, which
+packs consecutive transactions ending with a read into as few ``I2C_RDWR``
+ioctls of up to ``I2C_RDWR_IOCTL_MAX_MSGS`` messages as possible: a
+sequence of hundreds of register reads runs in a handful of system calls,
+joined by repeated starts instead of stop conditions. A transaction ending
+with a write also ends its ioctl, since devices such as EEPROMs only
+commit written data on the stop condition. A transaction is never split
+between ioctls; delays and ``stop`` end the ioctl being packed.
+
+The ``smbus3-transfer`` command runs scripts from files, standard input or
+its arguments.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import namedtuple
+
+from .smbus3 import I2C_M_RD, I2C_RDWR_IOCTL_MAX_MSGS, SMBus, i2c_msg
+
+# Largest length of an i2c message (16-bit len field)
+_LENGTH_MAX = 0xFFFF
+# 7-bit addresses only, like i2ctransfer
+_ADDRESS_MAX = 0x7F
+_BYTE_MAX = 0xFF
+
+_MESSAGE = re.compile(r"([rw])(\d+)(?:@(\w+))?", re.IGNORECASE)
+_DATA = re.compile(r"(\w+?)([=+\-p]?)", re.IGNORECASE)
+_NAME = re.compile(r"[A-Za-z_]\w*")
+_DURATION = re.compile(r"(\d+(?:\.\d*)?)(s|ms|us)?", re.IGNORECASE)
+_SECONDS = {"s": 1.0, "ms": 1e-3, "us": 1e-6}
+
+ScriptResult = namedtuple("ScriptResult", ["reads", "captures"])
+"""
+Data read by :py:meth:`TransactionPlan.run`.
+
+:ivar reads: bytes of every read message, in script order.
+:ivar captures: ``{name: bytes}`` of the read messages captured by name.
+"""
+
+
+class TransactionPlan:
+    """
+    A compiled transaction script: the ``I2C_RDWR`` ioctls to issue, with
+    their prepared messages, and the delays in between.
+
+    The read buffers belong to the plan, so one plan must not run on
+    several threads at once.
+
+    :ivar steps: list of ``(messages, reads)`` ioctls, ``reads`` being
+        ``(index, name)`` for every read message, and delays in seconds.
+    """
+
+    def __init__(self, steps):
+        """
+        Create the plan. See :py:func:`compile_script`.
+
+        :param steps: ioctls and delays.
+        :type steps: list
+        """
+        self.steps = steps
+
+    @property
+    def ioctls(self):
+        """
+        Number of ``I2C_RDWR`` ioctls issued by a run.
+
+        :rtype: int
+        """
+        return sum(1 for step in self.steps if not isinstance(step, float))
+
+    @property
+    def messages(self):
+        """
+        Number of i2c messages of a run.
+
+        :rtype: int
+        """
+        return sum(len(step[0]) for step in self.steps if not isinstance(step, float))
+
+    def run(self, bus):
+        """
+        Execute the plan.
+
+        :param bus: open bus, on an adapter supporting plain I2C.
+        :type bus: SMBus
+        :raise OSError: if a transfer fails, after the ioctls before it ran.
+        :return: The data read
+        :rtype: ScriptResult
+        """
+        reads = []
+        captures = {}
+        for step in self.steps:
+            if isinstance(step, float):
+                time.sleep(step)
+                continue
+            msgs, names = step
+            bus.i2c_rdwr(*msgs)
+            for index, name in names:
+                data = bytes(msgs[index])
+                reads.append(data)
+                if name is not None:
+                    captures[name] = data
+        return ScriptResult(reads, captures)
+
+
+def _int(text, maximum, what):
+    """
+    Parse a C style integer between 0 and maximum.
+    Private.
+    """
+    try:
+        value = int(text, 0)
+    except ValueError:
+        raise ValueError(f"Invalid {what} {text!r}") from None
+    if not 0 <= value <= maximum:
+        raise ValueError(f"{what.capitalize()} {text} out of range")
+    return value
+
+
+def _parse_transaction(tokens, i2c_addr, names):
+    """
+    Parse the messages of one transaction, returning them with the read
+    captures ``(index, name)`` and the last address used.
+    Private.
+    """
+    msgs = []
+    reads = []
+    tokens = iter(tokens)
+    token = next(tokens, None)
+    while token is not None:
+        match = _MESSAGE.fullmatch(token)
+        if match is None:
+            raise ValueError(f"Expected a message, got {token!r}")
+        kind, length, address = match.groups()
+        length = _int(length, _LENGTH_MAX, "length")
+        if address is not None:
+            i2c_addr = _int(address, _ADDRESS_MAX, "address")
+        elif i2c_addr is None:
+            raise ValueError(f"No address for message {token!r}")
+        token = next(tokens, None)
+        if kind.lower() == "r":
+            name = None
+            if token == ">":
+                name = next(tokens, "")
+                if _NAME.fullmatch(name) is None:
+                    raise ValueError(f"Invalid capture name {name!r}")
+                if name in names:
+                    raise ValueError(f"Duplicate capture name {name!r}")
+                names.add(name)
+                token = next(tokens, None)
+            reads.append((len(msgs), name))
+            msgs.append(i2c_msg.read(i2c_addr, length))
+            continue
+        data, token = _parse_data(token, tokens, length)
+        msgs.append(i2c_msg.write(i2c_addr, data))
+    if len(msgs) > I2C_RDWR_IOCTL_MAX_MSGS:
+        raise ValueError(f"More than {I2C_RDWR_IOCTL_MAX_MSGS} messages in one transaction")
+    return msgs, reads, i2c_addr
+
+
+def _parse_data(token, tokens, length):
+    """
+    Parse the data bytes of a write message, from token on, returning them
+    with the token which follows.
+    Private.
+    """
+    data = bytearray()
+    while len(data) < length:
+        match = None if token is None else _DATA.fullmatch(token)
+        if match is None or _MESSAGE.fullmatch(token):
+            raise ValueError(f"Expected {length} data bytes, got {len(data)}")
+        value, suffix = match.groups()
+        value = _int(value, _BYTE_MAX, "data byte")
+        token = next(tokens, None)
+        if not suffix:
+            data.append(value)
+        elif suffix == "=":
+            data += bytes((value,)) * (length - len(data))
+        elif suffix in "+-":
+            step = 1 if suffix == "+" else -1
+            data += bytes((value + step * idx) & _BYTE_MAX for idx in range(length - len(data)))
+        else:
+            raise ValueError(f"Unsupported data suffix {suffix!r}")
+    return data, token
+
+
+def _parse_duration(tokens):
+    """
+    Parse the argument of a delay, in seconds.
+    Private.
+    """
+    match = _DURATION.fullmatch(tokens[0]) if len(tokens) == 1 else None
+    if match is None:
+        raise ValueError(f"Expected delay DURATION, got {' '.join(tokens)!r}")
+    value, unit = match.groups()
+    return float(value) * _SECONDS[(unit or "ms").lower()]
+
+
+def compile_script(text):
+    """
+    Compile a transaction script, see :py:mod:`smbus3.script` for its
+    syntax.
+
+    :param text: script.
+    :type text: str
+    :raise ValueError: on a syntax error, with its line number.
+    :return: The plan, to run on any number of buses
+    :rtype: TransactionPlan
+    """
+    steps = []
+    msgs = []
+    reads = []
+    names = set()
+    i2c_addr = None
+
+    def flush():
+        if msgs:
+            steps.append((tuple(msgs), tuple(reads)))
+            msgs.clear()
+            reads.clear()
+
+    for number, line in enumerate(text.splitlines(), 1):
+        for statement in line.partition("#")[0].split(";"):
+            tokens = statement.replace(">", " > ").split()
+            if not tokens:
+                continue
+            keyword = tokens[0].lower()
+            try:
+                if keyword == "delay":
+                    flush()
+                    seconds = _parse_duration(tokens[1:])
+                    if steps and isinstance(steps[-1], float):
+                        seconds += steps.pop()
+                    steps.append(seconds)
+                    continue
+                if keyword == "stop":
+                    if len(tokens) > 1:
+                        raise ValueError("stop takes no arguments")
+                    flush()
+                    continue
+                transaction, captures, i2c_addr = _parse_transaction(tokens, i2c_addr, names)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {e}") from None
+            if len(msgs) + len(transaction) > I2C_RDWR_IOCTL_MAX_MSGS:
+                flush()
+            reads.extend((len(msgs) + index, name) for index, name in captures)
+            msgs.extend(transaction)
+            if not transaction[-1].flags & I2C_M_RD:
+                flush()
+    flush()
+    return TransactionPlan(steps)
+
+
+def run_script(bus, text):
+    """
+    Compile and run a transaction script.
+
+    :param bus: open bus.
+    :type bus: SMBus
+    :param text: script.
+    :type text: str
+    :raise ValueError: on a syntax error.
+    :raise OSError: if a transfer fails.
+    :rtype: ScriptResult
+    """
+    return compile_script(text).run(bus)
+
+
+def main(argv=None):
+    """
+    Entry point of the ``smbus3-transfer`` command.
+
+    :param argv: command line arguments, ``sys.argv[1:]`` by default.
+    :type argv: list
+    :return: Exit status
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog="smbus3-transfer",
+        description="Run i2ctransfer style transaction scripts in combined transfers.",
+    )
+    parser.add_argument("bus", help="adapter number or device path")
+    parser.add_argument(
+        "transaction", nargs="*", help="script given inline, e.g. w1@0x50 0x00 r8 (';' separated)"
+    )
+    parser.add_argument("-f", "--file", type=argparse.FileType("r"), help="script file, - for stdin")
+    parser.add_argument("--format", choices=("hex", "json"), default="hex")
+    parser.add_argument(
+        "-n", "--dry-run", action="store_true", help="compile the script and show its ioctls"
+    )
+    args = parser.parse_intermixed_args(argv)
+    if (args.file is None) == (not args.transaction):
+        parser.error("give either a transaction or a script file")
+
+    text = " ".join(args.transaction) if args.file is None else args.file.read()
+    try:
+        plan = compile_script(text)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if args.dry_run:
+        for step in plan.steps:
+            if isinstance(step, float):
+                print(f"delay {step * 1e3:g}ms")
+            else:
+                print(f"I2C_RDWR {' '.join(map(repr, step[0]))}")
+        print(f"{plan.messages} messages in {plan.ioctls} ioctls")
+        return 0
+    bus = int(args.bus) if args.bus.isdigit() else args.bus
+    try:
+        with SMBus(bus) as smbus:
+            result = plan.run(smbus)
+    except OSError as e:
+        print(f"Error: bus {bus}: {e}", file=sys.stderr)
+        return 1
+    if args.format == "json":
+        print(
+            json.dumps(
+                {
+                    "reads": [list(data) for data in result.reads],
+                    "captures": {name: list(data) for name, data in result.captures.items()},
+                },
+                indent=1,
+            )
+        )
+        return 0
+    names = [name for step in plan.steps if not isinstance(step, float) for _, name in step[1]]
+    for name, data in zip(names, result.reads):  # noqa: B905
+        line = " ".join(f"0x{value:02x}" for value in data)
+        print(line if name is None else f"{name}: {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
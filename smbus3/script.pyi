@@ -0,0 +1,31 @@
+from collections.abc import Iterator, Sequence
+from typing import NamedTuple
+
+from .smbus3 import SMBus, i2c_msg
+
+_Step = tuple[tuple[i2c_msg, ...], tuple[tuple[int, str | None], ...]] | float
+
+class ScriptResult(NamedTuple):
+    reads: list[bytes]
+    captures: dict[str, bytes]
+
+class TransactionPlan:
+    steps: list[_Step]
+    def __init__(self, steps: list[_Step]) -> None: ...
+    @property
+    def ioctls(self) -> int: ...
+    @property
+    def messages(self) -> int: ...
+    def run(self, bus: SMBus) -> ScriptResult: ...
+
+def _int(text: str, maximum: int, what: str) -> int: ...
+def _parse_transaction(
+    tokens: Sequence[str], i2c_addr: int | None, names: set[str]
+) -> tuple[list[i2c_msg], list[tuple[int, str | None]], int | None]: ...
+def _parse_data(
+    token: str | None, tokens: Iterator[str], length: int
+) -> tuple[bytearray, str | None]: ...
+def _parse_duration(tokens: Sequence[str]) -> float: ...
+def compile_script(text: str) -> TransactionPlan: ...
+def run_script(bus: SMBus, text: str) -> ScriptResult: ...
+def main(argv: Sequence[str] | None = None) -> int: ...
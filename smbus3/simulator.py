@@ -0,0 +1,635 @@
+"""
+smbus3.simulator - In-memory i2c adapters and device models.
+
+A :py:class:`SimulatedAdapter` stands in for an i2c adapter driver: it
+executes the ``I2C_SMBUS`` and ``I2C_RDWR`` ioctls issued by
+:py:class:`~smbus3.SMBus` against the device models attached to it,
+byte by byte as they would appear on the wire. While :py:func:`simulate`
+is active, opening the bus number or path of a simulated adapter opens it
+instead of a device node, so unmodified code can be load tested against
+hundreds of devices::
+
+    adapter = SimulatedAdapter([RegisterDevice(0x40 + idx) for idx in range(100)])
+    with simulate({1: adapter}), SMBus(1) as bus:
+        bus.read_i2c_block_data(0x40, 0x00, 16)
+
+Device models:
+
+- :py:class:`RegisterDevice`: a register file with auto-increment, 8 or
+  16-bit register addresses, read-only and volatile registers.
+- :py:class:`EEPROM`: page writes which wrap within the page, followed by
+  a write cycle during which the device does not acknowledge its address.
+
+Every device can be given a rate at which it fails to acknowledge its
+address, and the adapter a transfer time per byte. PEC bytes are neither
+generated nor checked.
+"""
+
+import errno
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from ctypes import addressof, memmove, string_at
+
+from . import smbus3 as _smbus3
+from .smbus3 import (
+    I2C_FUNCS,
+    I2C_M_RD,
+    I2C_M_RECV_LEN,
+    I2C_PEC,
+    I2C_RDWR,
+    I2C_RDWR_IOCTL_MAX_MSGS,
+    I2C_RETRIES,
+    I2C_SLAVE,
+    I2C_SLAVE_FORCE,
+    I2C_SMBUS,
+    I2C_SMBUS_BLOCK_DATA,
+    I2C_SMBUS_BLOCK_MAX,
+    I2C_SMBUS_BLOCK_PROC_CALL,
+    I2C_SMBUS_BYTE,
+    I2C_SMBUS_BYTE_DATA,
+    I2C_SMBUS_I2C_BLOCK_DATA,
+    I2C_SMBUS_PROC_CALL,
+    I2C_SMBUS_QUICK,
+    I2C_SMBUS_READ,
+    I2C_SMBUS_WORD_DATA,
+    I2C_TENBIT,
+    I2C_TIMEOUT,
+    I2cFunc,
+)
+
+# Everything but host notify and slave mode
+DEFAULT_FUNCS = (
+    I2cFunc.I2C
+    | I2cFunc.ADDR_10BIT
+    | I2cFunc.SMBUS_PEC
+    | I2cFunc.SMBUS_QUICK
+    | I2cFunc.SMBUS_BYTE
+    | I2cFunc.SMBUS_BYTE_DATA
+    | I2cFunc.SMBUS_WORD_DATA
+    | I2cFunc.SMBUS_PROC_CALL
+    | I2cFunc.SMBUS_BLOCK_DATA
+    | I2cFunc.SMBUS_I2C_BLOCK
+    | I2cFunc.SMBUS_BLOCK_PROC_CALL
+)
+
+
+def _nack(address):
+    """
+    Error reported by adapter drivers when an address is not acknowledged.
+    Private.
+    """
+    return OSError(errno.ENXIO, f"No acknowledge from address 0x{address:02x}")
+
+
+class Device:
+    """
+    Base device model: acknowledges its address and reads as ``0xff``.
+
+    Subclasses override :py:meth:`write` and :py:meth:`read`, which receive
+    the data bytes of each message, and :py:meth:`stop`, called once the
+    transfer the device took part in is over.
+    """
+
+    def __init__(self, address, nack_rate=0.0, seed=None):
+        """
+        Create the device.
+
+        :param address: i2c address
+        :type address: int
+        :param nack_rate: probability that the device does not acknowledge
+            its address, each time a transfer or message addresses it.
+        :type nack_rate: float
+        :param seed: seed of the random NACKs, for reproducible runs.
+        :type seed: int
+        """
+        self.address = address
+        self.nack_rate = nack_rate
+        self._random = random.Random(seed)
+
+    def acks(self):
+        """
+        Whether the device acknowledges its address, at the start of a
+        transfer or of an ``I2C_RDWR`` message.
+
+        :rtype: bool
+        """
+        return not self.nack_rate or self._random.random() >= self.nack_rate
+
+    def write(self, data):
+        """
+        Receive the data bytes of a write message.
+
+        :param data: bytes written.
+        :type data: bytes
+        :rtype: None
+        """
+
+    def read(self, length):
+        """
+        Send the data bytes of a read message.
+
+        :param length: number of bytes read.
+        :type length: int
+        :rtype: bytes
+        """
+        return b"\xff" * length
+
+    def stop(self):
+        """
+        End of the transfer (stop condition).
+
+        :rtype: None
+        """
+
+
+class RegisterDevice(Device):
+    """
+    A register file. Writes start with the register address, which also
+    sets the pointer for subsequent reads, and the pointer auto-increments
+    over every byte read or written, wrapping at the end of the file.
+
+    :ivar registers: contents of the register file.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        address,
+        size=256,
+        address_bytes=1,
+        read_only=(),
+        volatile=None,
+        nack_rate=0.0,
+        seed=None,
+    ):
+        """
+        Create the device.
+
+        :param address: i2c address
+        :type address: int
+        :param size: number of registers.
+        :type size: int
+        :param address_bytes: length of register addresses, 1 or 2 (sent
+            most significant byte first).
+        :type address_bytes: int
+        :param read_only: registers which ignore writes.
+        :type read_only: Iterable[int]
+        :param volatile: ``{register: callable}``: registers whose value is
+            computed on every read, by calling ``callable(device, register)``.
+        :type volatile: dict
+        :param nack_rate: probability that the device does not acknowledge
+            its address, each time a transfer or message addresses it.
+        :type nack_rate: float
+        :param seed: seed of the random NACKs.
+        :type seed: int
+        :raise ValueError: on an unexpected address_bytes.
+        """
+        super().__init__(address, nack_rate, seed)
+        if address_bytes not in (1, 2):
+            raise ValueError(f"Unexpected address_bytes={address_bytes}")
+        self.registers = bytearray(size)
+        self.address_bytes = address_bytes
+        self.read_only = frozenset(read_only)
+        self.volatile = dict(volatile or {})
+        self.pointer = 0
+
+    def write(self, data):
+        """
+        Set the pointer from the first bytes, then write the others.
+
+        :param data: bytes written.
+        :type data: bytes
+        :rtype: None
+        """
+        count = self.address_bytes
+        if len(data) < count:
+            return
+        size = len(self.registers)
+        self.pointer = int.from_bytes(data[:count], "big") % size
+        if len(data) > count:
+            self._store(self.pointer, data[count:])
+
+    def _store(self, start, data):
+        """
+        Write data at start, auto-incrementing and honouring read-only
+        registers.
+        Private.
+        """
+        registers = self.registers
+        size = len(registers)
+        end = start + len(data)
+        if not self.read_only and end <= size:
+            registers[start:end] = data
+        else:
+            read_only = self.read_only
+            for offset, value in enumerate(data):
+                register = (start + offset) % size
+                if register not in read_only:
+                    registers[register] = value
+        self.pointer = end % size
+
+    def read(self, length):
+        """
+        Read from the pointer, auto-incrementing.
+
+        :param length: number of bytes read.
+        :type length: int
+        :rtype: bytes
+        """
+        registers = self.registers
+        size = len(registers)
+        start = self.pointer
+        end = start + length
+        self.pointer = end % size
+        if self.volatile:
+            for offset in range(length):
+                register = (start + offset) % size
+                update = self.volatile.get(register)
+                if update is not None:
+                    registers[register] = update(self, register) & 0xFF
+        if end <= size:
+            return bytes(registers[start:end])
+        return bytes(registers[(start + offset) % size] for offset in range(length))
+
+
+class EEPROM(RegisterDevice):
+    """
+    A serial EEPROM (24Cxx family): sequential reads span the whole memory,
+    writes wrap within their page, and the device does not acknowledge its
+    address during the write cycle which follows a write.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        address,
+        size=256,
+        page_size=16,
+        address_bytes=1,
+        write_cycle_ns=5000000,
+        nack_rate=0.0,
+        seed=None,
+    ):
+        """
+        Create the device, erased (all bytes ``0xff``).
+
+        :param address: i2c address
+        :type address: int
+        :param size: memory size in bytes.
+        :type size: int
+        :param page_size: write page size in bytes.
+        :type page_size: int
+        :param address_bytes: length of memory addresses, 1 or 2.
+        :type address_bytes: int
+        :param write_cycle_ns: duration of the write cycle.
+        :type write_cycle_ns: int
+        :param nack_rate: probability that the device does not acknowledge
+            its address, each time a transfer or message addresses it.
+        :type nack_rate: float
+        :param seed: seed of the random NACKs.
+        :type seed: int
+        """
+        super().__init__(address, size, address_bytes, nack_rate=nack_rate, seed=seed)
+        self.registers[:] = b"\xff" * size
+        self.page_size = page_size
+        self.write_cycle_ns = write_cycle_ns
+        self._written = False
+        self._busy_until = 0
+
+    def acks(self):
+        """
+        Whether the device acknowledges its address: not during a write cycle.
+
+        :rtype: bool
+        """
+        if self._busy_until and time.monotonic_ns() < self._busy_until:
+            return False
+        return super().acks()
+
+    def _store(self, start, data):
+        """
+        Write data within the page of start.
+        Private.
+        """
+        if not data:
+            return
+        page = start - start % self.page_size
+        offset = start - page
+        for value in data:
+            self.registers[page + offset] = value
+            offset = (offset + 1) % self.page_size
+        self.pointer = page + offset
+        self._written = True
+
+    def stop(self):
+        """
+        Start the write cycle if data was written.
+
+        :rtype: None
+        """
+        if self._written:
+            self._written = False
+            self._busy_until = time.monotonic_ns() + self.write_cycle_ns
+
+
+class _Client:
+    """
+    An open file descriptor on a simulated adapter, with its settings.
+    Private.
+    """
+
+    __slots__ = ("adapter", "address", "pec", "tenbit")
+
+    def __init__(self, adapter):
+        self.adapter = adapter
+        self.address = None
+        self.pec = 0
+        self.tenbit = 0
+
+
+class SimulatedAdapter:
+    """
+    An in-memory i2c adapter executing transfers against device models.
+
+    :ivar devices: attached devices, by address.
+    :ivar transfers: number of transfer ioctls executed.
+    """
+
+    def __init__(self, devices=(), funcs=DEFAULT_FUNCS, byte_ns=0):
+        """
+        Create the adapter.
+
+        :param devices: devices to attach.
+        :type devices: Iterable[Device]
+        :param funcs: functionality reported by ``I2C_FUNCS``.
+        :type funcs: int
+        :param byte_ns: transfer time of each byte on the wire (address
+            bytes included), slept in the ioctl while holding the bus.
+        :type byte_ns: int
+        """
+        self.devices = {}
+        self.funcs = funcs
+        self.byte_ns = byte_ns
+        self.transfers = 0
+        self._lock = threading.Lock()
+        for device in devices:
+            self.attach(device)
+
+    def attach(self, device):
+        """
+        Connect a device to the bus.
+
+        :param device: device model.
+        :type device: Device
+        :raise ValueError: if the address is already taken.
+        :rtype: None
+        """
+        if device.address in self.devices:
+            raise ValueError(f"Address 0x{device.address:02x} is already taken")
+        self.devices[device.address] = device
+
+    def detach(self, address):
+        """
+        Disconnect the device at address.
+
+        :param address: i2c address
+        :type address: int
+        :rtype: Device
+        """
+        return self.devices.pop(address)
+
+    def _device(self, address):
+        """
+        Device acknowledging address, else raise.
+        Private.
+        """
+        device = self.devices.get(address)
+        if device is None or not device.acks():
+            raise _nack(address)
+        return device
+
+    def ioctl(self, client, request, arg):
+        """
+        Execute an i2c-dev ioctl issued on one of the adapter's descriptors.
+
+        :param client: descriptor state.
+        :param request: ioctl request.
+        :type request: int
+        :param arg: ioctl argument.
+        :raise OSError: on a NACK or an invalid request.
+        :rtype: int
+        """
+        if request == I2C_SMBUS:
+            self._smbus(client, arg)
+        elif request == I2C_RDWR:
+            self._rdwr(arg)
+        elif request in (I2C_SLAVE, I2C_SLAVE_FORCE):
+            client.address = arg
+        elif request == I2C_FUNCS:
+            arg.value = self.funcs
+        elif request == I2C_PEC:
+            client.pec = arg
+        elif request == I2C_TENBIT:
+            client.tenbit = arg
+        elif request not in (I2C_TIMEOUT, I2C_RETRIES):
+            raise OSError(errno.ENOTTY, os.strerror(errno.ENOTTY))
+        return 0
+
+    def _wire(self, nbytes):
+        """
+        Spend the transfer time of nbytes, with the adapter lock held: one
+        transfer at a time occupies the bus.
+        Private.
+        """
+        if self.byte_ns:
+            time.sleep(nbytes * self.byte_ns / 1e9)
+
+    def _smbus(self, client, arg):
+        """
+        Execute an I2C_SMBUS transfer as the messages it puts on the wire.
+        Private.
+        """
+        size = arg.size
+        address = client.address
+        with self._lock:
+            self.transfers += 1
+            device = self._device(address)
+            try:
+                if size == I2C_SMBUS_QUICK:
+                    nbytes = 1
+                elif size == I2C_SMBUS_BYTE:
+                    if arg.read_write == I2C_SMBUS_READ:
+                        arg.data.contents.byte = device.read(1)[0]
+                    else:
+                        device.write(bytes((arg.command,)))
+                    nbytes = 2
+                else:
+                    nbytes = self._smbus_data(device, arg, size)
+                self._wire(nbytes)
+            finally:
+                device.stop()
+
+    def _smbus_data(self, device, arg, size):  # noqa: PLR0911
+        """
+        Execute an I2C_SMBUS transfer with a command byte, returning the
+        number of bytes on the wire.
+        Private.
+        """
+        data = arg.data.contents
+        command = arg.command
+        if arg.read_write == I2C_SMBUS_READ:
+            if size == I2C_SMBUS_BYTE_DATA:
+                device.write(bytes((command,)))
+                data.byte = device.read(1)[0]
+                return 4
+            if size == I2C_SMBUS_WORD_DATA:
+                device.write(bytes((command,)))
+                data.word = int.from_bytes(device.read(2), "little")
+                return 5
+            if size == I2C_SMBUS_I2C_BLOCK_DATA:
+                length = min(data.block[0], I2C_SMBUS_BLOCK_MAX)
+                device.write(bytes((command,)))
+                memmove(_block(data, 1), device.read(length), length)
+                return 3 + length
+            if size == I2C_SMBUS_BLOCK_DATA:
+                device.write(bytes((command,)))
+                length = min(device.read(1)[0], I2C_SMBUS_BLOCK_MAX)
+                block = bytes((length,)) + device.read(length)
+                memmove(_block(data, 0), block, len(block))
+                return 4 + length
+        elif size == I2C_SMBUS_BYTE_DATA:
+            device.write(bytes((command, data.byte)))
+            return 3
+        elif size == I2C_SMBUS_WORD_DATA:
+            device.write(bytes((command,)) + data.word.to_bytes(2, "little"))
+            return 4
+        elif size == I2C_SMBUS_I2C_BLOCK_DATA:
+            length = min(data.block[0], I2C_SMBUS_BLOCK_MAX)
+            device.write(bytes((command,)) + string_at(_block(data, 1), length))
+            return 2 + length
+        elif size == I2C_SMBUS_BLOCK_DATA:
+            length = min(data.block[0], I2C_SMBUS_BLOCK_MAX)
+            device.write(bytes((command,)) + string_at(_block(data, 0), length + 1))
+            return 3 + length
+        elif size == I2C_SMBUS_PROC_CALL:
+            device.write(bytes((command,)) + data.word.to_bytes(2, "little"))
+            data.word = int.from_bytes(device.read(2), "little")
+            return 7
+        elif size == I2C_SMBUS_BLOCK_PROC_CALL:
+            length = min(data.block[0], I2C_SMBUS_BLOCK_MAX)
+            device.write(bytes((command,)) + string_at(_block(data, 0), length + 1))
+            count = min(device.read(1)[0], I2C_SMBUS_BLOCK_MAX)
+            block = bytes((count,)) + device.read(count)
+            memmove(_block(data, 0), block, len(block))
+            return 5 + length + count
+        raise OSError(errno.EINVAL, f"Unexpected size={size}")
+
+    def _rdwr(self, arg):
+        """
+        Execute an I2C_RDWR transfer, message by message.
+        Private.
+        """
+        nmsgs = arg.nmsgs
+        if not 0 < nmsgs <= I2C_RDWR_IOCTL_MAX_MSGS:
+            raise OSError(errno.EINVAL, os.strerror(errno.EINVAL))
+        nbytes = 0
+        involved = []
+        with self._lock:
+            self.transfers += 1
+            try:
+                for idx in range(nmsgs):
+                    msg = arg.msgs[idx]
+                    device = self._device(msg.addr)
+                    if device not in involved:
+                        involved.append(device)
+                    length = msg.len
+                    if not msg.flags & I2C_M_RD:
+                        device.write(string_at(msg.buf, length))
+                    elif msg.flags & I2C_M_RECV_LEN:
+                        # As i2c-dev: buf[0] holds the bytes read besides the data
+                        extra = string_at(msg.buf, 1)[0]
+                        if not extra or length < extra + I2C_SMBUS_BLOCK_MAX:
+                            raise OSError(errno.EINVAL, os.strerror(errno.EINVAL))
+                        count = device.read(1)[0]
+                        data = bytes((count,)) + device.read(count + extra - 1)
+                        length = min(len(data), length)
+                        memmove(msg.buf, data, length)
+                        msg.len = length
+                    else:
+                        memmove(msg.buf, device.read(length), length)
+                    nbytes += 1 + length
+                self._wire(nbytes)
+            finally:
+                for device in involved:
+                    device.stop()
+
+
+def _block(data, offset):
+    """
+    Address of the block of an SMBus data union, at offset.
+    Private.
+    """
+    return addressof(data) + offset
+
+
+class _OsShim:
+    """
+    The os module as seen by smbus3.smbus3 during a simulation: opening a
+    simulated adapter opens /dev/null as a placeholder descriptor, tracked
+    until it is closed.
+    Private.
+    """
+
+    def __init__(self, adapters, clients):
+        self._adapters = adapters
+        self._clients = clients
+
+    def __getattr__(self, name):
+        return getattr(os, name)
+
+    def open(self, path, flags, *args, **kwargs):
+        adapter = self._adapters.get(path)
+        if adapter is None:
+            return os.open(path, flags, *args, **kwargs)
+        fd = os.open(os.devnull, flags)
+        self._clients[fd] = _Client(adapter)
+        return fd
+
+    def close(self, fd):
+        self._clients.pop(fd, None)
+        os.close(fd)
+
+
+@contextmanager
+def simulate(adapters):
+    """
+    Substitute simulated adapters for device nodes within a ``with`` block.
+
+    :py:class:`~smbus3.SMBus` instances opened on a simulated adapter
+    inside the block must be closed before it ends. Other buses are not
+    affected.
+
+    :param adapters: ``{bus: SimulatedAdapter}``, ``bus`` being a bus number
+        or a device path.
+    :type adapters: dict
+    :return: Context manager
+    """
+    paths = {}
+    for bus, adapter in adapters.items():
+        paths[f"/dev/i2c-{bus}" if isinstance(bus, int) else bus] = adapter
+    clients = {}
+    real_ioctl = _smbus3.ioctl
+
+    def ioctl(fd, request, arg=0):
+        client = clients.get(fd)
+        if client is None:
+            return real_ioctl(fd, request, arg)
+        return client.adapter.ioctl(client, request, arg)
+
+    saved = _smbus3.os, _smbus3.ioctl
+    _smbus3.os, _smbus3.ioctl = _OsShim(paths, clients), ioctl
+    try:
+        yield
+    finally:
+        _smbus3.os, _smbus3.ioctl = saved
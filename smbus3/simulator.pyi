@@ -0,0 +1,67 @@
+from collections.abc import Callable, Iterable, Mapping
+from contextlib import AbstractContextManager
+from typing import Any
+
+I2C_M_RECV_LEN: int
+DEFAULT_FUNCS: int
+
+class Device:
+    address: int
+    nack_rate: float
+    def __init__(self, address: int, nack_rate: float = 0.0, seed: int | None = None) -> None: ...
+    def acks(self) -> bool: ...
+    def write(self, data: bytes) -> None: ...
+    def read(self, length: int) -> bytes: ...
+    def stop(self) -> None: ...
+
+class RegisterDevice(Device):
+    registers: bytearray
+    address_bytes: int
+    read_only: frozenset[int]
+    volatile: dict[int, Callable[[RegisterDevice, int], int]]
+    pointer: int
+    def __init__(  # noqa: PLR0913
+        self,
+        address: int,
+        size: int = 256,
+        address_bytes: int = 1,
+        read_only: Iterable[int] = (),
+        volatile: Mapping[int, Callable[[RegisterDevice, int], int]] | None = None,
+        nack_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None: ...
+
+class EEPROM(RegisterDevice):
+    page_size: int
+    write_cycle_ns: int
+    def __init__(  # noqa: PLR0913
+        self,
+        address: int,
+        size: int = 256,
+        page_size: int = 16,
+        address_bytes: int = 1,
+        write_cycle_ns: int = 5000000,
+        nack_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None: ...
+
+class _Client:
+    adapter: SimulatedAdapter
+    address: int | None
+    pec: int
+    tenbit: int
+    def __init__(self, adapter: SimulatedAdapter) -> None: ...
+
+class SimulatedAdapter:
+    devices: dict[int, Device]
+    funcs: int
+    byte_ns: int
+    transfers: int
+    def __init__(
+        self, devices: Iterable[Device] = (), funcs: int = ..., byte_ns: int = 0
+    ) -> None: ...
+    def attach(self, device: Device) -> None: ...
+    def detach(self, address: int) -> Device: ...
+    def ioctl(self, client: _Client, request: int, arg: Any) -> int: ...
+
+def simulate(adapters: Mapping[int | str, SimulatedAdapter]) -> AbstractContextManager[None]: ...
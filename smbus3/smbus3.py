@@ -2,7 +2,15 @@
 smbus3 - A drop-in replacement for smbus2/smbus-cffi/smbus-python
 """
 
+import errno
 import os
+import sys
+import threading
+import time
+import weakref
+from array import array
+from collections import namedtuple
+from contextlib import contextmanager
 from ctypes import (
     POINTER,
     Structure,
@@ -12,10 +20,15 @@ from ctypes import (
     c_uint16,
     c_uint32,
     create_string_buffer,
+    memmove,
     string_at,
 )
 from enum import IntFlag
 from fcntl import ioctl
+from functools import partial, update_wrapper, wraps
+from types import MethodType
+
+from .pec import address_byte, crc8, messages_pec
 
 # Commands from uapi/linux/i2c-dev.h
 I2C_RETRIES = 0x0701  # Number of retries
@@ -47,6 +60,14 @@ I2C_SMBUS_BLOCK_PROC_CALL = 7
 I2C_SMBUS_I2C_BLOCK_DATA = 8
 I2C_SMBUS_BLOCK_MAX = 32
 
+# Maximum number of i2c_msg in a single I2C_RDWR transfer (uapi/linux/i2c-dev.h)
+I2C_RDWR_IOCTL_MAX_MSGS = 42
+# Largest length of an i2c_msg (16-bit len field)
+_MSG_LEN_MAX = 0xFFFF
+
+# Transfer shapes with preallocated messages kept per SMBus instance
+_PREPARED_MAX = 64
+
 # To determine what functionality is present (uapi/linux/i2c.h)
 
 
@@ -90,6 +111,8 @@ class I2cFunc(IntFlag):
 I2C_M_RD = 0x0001
 I2C_M_WR = 0x0000
 I2C_M_TEN = 0x0010
+# The first byte read is the count of the bytes which follow (SMBus block)
+I2C_M_RECV_LEN = 0x0400
 
 
 class I2C_M_Bitflag(IntFlag):
@@ -227,7 +250,7 @@ class i2c_msg(Structure):
         return s
 
     @staticmethod
-    def read(address, length, flags=I2C_M_RD):
+    def read(address, length, flags=I2C_M_RD, pool=None):
         """
         Prepares an i2c read transaction.
 
@@ -237,14 +260,19 @@ class i2c_msg(Structure):
         :type: length: int
         :param flags: bitflags to pass (default: I2C_M_RD)
         :type flags: int
+        :param pool: lease the message and its buffer from this pool instead
+            of allocating them, see :py:mod:`smbus3.buffers`.
+        :type pool: smbus3.buffers.BufferPool
         :return: New :py:class:`i2c_msg` instance for read operation.
         :rtype: :py:class:`i2c_msg`
         """
+        if pool is not None:
+            return pool.message(address, length, flags)
         arr = create_string_buffer(length)
         return i2c_msg(addr=address, flags=flags, len=length, buf=arr)
 
     @staticmethod
-    def write(address, buf, flags=I2C_M_WR):
+    def write(address, buf, flags=I2C_M_WR, pool=None):
         """
         Prepares an i2c write transaction.
 
@@ -254,6 +282,9 @@ class i2c_msg(Structure):
         :type buf: list
         :param flags: bitflags to pass (default: I2C_M_WR)
         :type flags: int
+        :param pool: lease the message and its buffer from this pool instead
+            of allocating them, see :py:mod:`smbus3.buffers`.
+        :type pool: smbus3.buffers.BufferPool
         :return: New :py:class:`i2c_msg` instance for write operation.
         :rtype: :py:class:`i2c_msg`
         """
@@ -261,8 +292,13 @@ class i2c_msg(Structure):
             buf = bytes(map(ord, buf))
         else:
             buf = bytes(buf)
-        arr = create_string_buffer(buf, len(buf))
-        return i2c_msg(addr=address, flags=flags, len=len(arr), buf=arr)
+        length = len(buf)
+        if pool is not None:
+            msg = pool.message(address, length, flags)
+            memmove(msg.buf, buf, length)
+            return msg
+        arr = create_string_buffer(buf, length)
+        return i2c_msg(addr=address, flags=flags, len=length, buf=arr)
 
 
 class i2c_rdwr_ioctl_data(Structure):
@@ -292,12 +328,219 @@ class i2c_rdwr_ioctl_data(Structure):
         return i2c_rdwr_ioctl_data(msgs=msg_array, nmsgs=n_msg)
 
 
+# Reusable I2C_SMBUS ioctl argument of each thread, see _smbus_ioctl_data()
+_local = threading.local()
+
+
+def _smbus_ioctl_data(read_write, command, size):
+    """
+    The calling thread's reusable i2c_smbus_ioctl_data, set up for a
+    transfer. A thread performs one transfer at a time, so reusing it is
+    safe, and it saves the ctypes allocations of
+    :py:meth:`i2c_smbus_ioctl_data.create` on every transfer.
+    Private.
+
+    :rtype: i2c_smbus_ioctl_data
+    """
+    try:
+        msg, data = _local.smbus
+    except AttributeError:
+        data = union_i2c_smbus_data()
+        msg = i2c_smbus_ioctl_data(data=union_pointer_type(data))
+        _local.smbus = msg, data
+    msg.read_write = read_write
+    msg.command = command
+    msg.size = size
+    # Clear the byte and word a previous transfer left; block transfers
+    # always set the count and data they use
+    data.word = 0
+    return msg
+
+
+class _ThreadState(threading.local):
+    """
+    State of an SMBus instance which belongs to the calling thread: its
+    current deadline, the transfer timestamps being captured, its
+    preallocated messages and one message ``I2C_RDWR`` argument.
+    Private.
+    """
+
+    def __init__(self):
+        self.deadline_ns = None
+        self.stamps = None
+        self.clock = time.CLOCK_MONOTONIC
+        self.prepared = {}
+        self.single = None
+
+
+Timestamped = namedtuple("Timestamped", ["value", "timestamp_ns", "start_ns", "end_ns"])
+"""
+Result of :py:meth:`SMBus.timestamped`.
+
+:ivar value: return value of the method
+:ivar timestamp_ns: midpoint of the transfer
+:ivar start_ns: clock reading immediately before the first transfer ioctl
+:ivar end_ns: clock reading immediately after the last transfer ioctl
+"""
+
+
+# Transfer methods with fallbacks for adapters lacking the matching SMBus
+# function, see SMBus._build_dispatch(). Maps each method to the required
+# functionality, its I2C_RDWR emulation and an optional chunked fallback
+# with the functionality that one requires.
+_DISPATCH = {
+    "read_byte_data": (I2cFunc.SMBUS_READ_BYTE_DATA, "_read_byte_data_rdwr", None),
+    "write_byte_data": (I2cFunc.SMBUS_WRITE_BYTE_DATA, "_write_byte_data_rdwr", None),
+    "read_word_data": (I2cFunc.SMBUS_READ_WORD_DATA, "_read_word_data_rdwr", None),
+    "write_word_data": (I2cFunc.SMBUS_WRITE_WORD_DATA, "_write_word_data_rdwr", None),
+    "process_call": (I2cFunc.SMBUS_PROC_CALL, "_process_call_rdwr", None),
+    "read_block_data": (I2cFunc.SMBUS_READ_BLOCK_DATA, "_read_block_data_rdwr", None),
+    "write_block_data": (I2cFunc.SMBUS_WRITE_BLOCK_DATA, "_write_block_data_rdwr", None),
+    "block_process_call": (I2cFunc.SMBUS_BLOCK_PROC_CALL, "_block_process_call_rdwr", None),
+    "read_i2c_block_data": (
+        I2cFunc.SMBUS_READ_I2C_BLOCK,
+        "_read_i2c_block_data_rdwr",
+        (I2cFunc.SMBUS_READ_BYTE_DATA, "_read_i2c_block_data_chunked"),
+    ),
+    "write_i2c_block_data": (
+        I2cFunc.SMBUS_WRITE_I2C_BLOCK,
+        "_write_i2c_block_data_rdwr",
+        (I2cFunc.SMBUS_WRITE_BYTE_DATA, "_write_i2c_block_data_chunked"),
+    ),
+}
+
+
+class _SharedAdapter:
+    """
+    An adapter file descriptor shared by every ``SMBus(..., shared=True)``
+    instance opened on the same device node, with the state that belongs to
+    the descriptor rather than to the instances.
+    Private.
+    """
+
+    def __init__(self, path, fd):
+        self.path = path
+        self.fd = fd
+        self.refs = 0
+        self.lock = threading.RLock()
+        self.address = None
+        self.force = None
+        self.pec = 0
+        self.tenbit = 0
+
+
+# Shared adapters by device node path, see SMBus(shared=True)
+_shared_adapters = {}
+_shared_adapters_lock = threading.Lock()
+
+
+def _acquire_shared(filepath):
+    """
+    Take a reference to the shared adapter for ``filepath``, opening it if
+    this is the first user.
+    Private.
+    """
+    path = os.path.realpath(filepath)
+    with _shared_adapters_lock:
+        shared = _shared_adapters.get(path)
+        if shared is None:
+            shared = _SharedAdapter(path, os.open(filepath, os.O_RDWR))
+            _shared_adapters[path] = shared
+        shared.refs += 1
+        return shared
+
+
+def _release_shared(shared):
+    """
+    Drop a reference to a shared adapter, closing its descriptor when the
+    last user is gone.
+    Private.
+    """
+    with _shared_adapters_lock:
+        shared.refs -= 1
+        if shared.refs == 0:
+            del _shared_adapters[shared.path]
+            os.close(shared.fd)
+
+
+# SMBus instances of this process, reset in forked children
+_instances = weakref.WeakSet()
+
+
+def _after_fork():
+    """
+    Reset the state a forked child inherits: locks which may have been held
+    by threads of the parent, shared adapters, and open SMBus instances,
+    whose descriptors share their slave address and settings with the
+    parent's. Instances are reopened on their next use.
+    Private.
+    """
+    global _shared_adapters_lock  # noqa: PLW0603
+    _shared_adapters_lock = threading.Lock()
+    for shared in _shared_adapters.values():
+        os.close(shared.fd)
+    _shared_adapters.clear()
+    for bus in list(_instances):
+        bus._reset_after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _transfer(method):
+    """
+    Prepare an SMBus instance for a transfer method: hold the instance lock,
+    so that threads sharing the instance cannot interleave slave address
+    changes and transfers, open a lazily opened bus, and hold the lock of
+    its shared adapter so that the same holds for other instances using
+    the same descriptor.
+    Private.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            if self._pending is not None:
+                self.open(self._pending)
+            shared = self._shared
+            if shared is None:
+                return method(self, *args, **kwargs)
+            with shared.lock:
+                return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class _Dispatched:
+    """
+    Descriptor for the transfer methods in _DISPATCH: looks the method up in
+    the per-instance routes built by :py:meth:`SMBus._build_dispatch`, as an
+    unbound function, so that instances hold no bound methods of their own.
+    Until the routes are built, calls go through
+    :py:meth:`SMBus._dispatch_first`.
+    Private.
+    """
+
+    def __init__(self, native):
+        self.native = native
+        self.name = native.__name__
+        update_wrapper(self, native)
+
+    def __get__(self, bus, owner=None):
+        if bus is None:
+            return self.native
+        route = bus._routes.get(self.name)
+        if route is None:
+            return partial(bus._dispatch_first, self.name)
+        return MethodType(route, bus)
+
+
 class SMBus:
     """
     The main SMBus class.
     """
 
-    def __init__(self, bus=None, force=False):
+    def __init__(self, bus=None, force=False, cache=None, shared=False, lazy=False):  # noqa: PLR0913
         """
         Initialize and (optionally) open an i2c bus connection.
 
@@ -308,16 +551,45 @@ class SMBus:
         :param force: force using the slave address even when driver is
             already using it.
         :type force: boolean
+        :param cache: capability cache consulted before probing the adapter
+            with ``I2C_FUNCS``.
+        :type cache: smbus3.capabilities.CapabilityCache
+        :param shared: share one reference-counted file descriptor (and its
+            slave address) with the other shared instances of the same
+            adapter in this process. Transfers are serialized by a lock.
+        :type shared: boolean
+        :param lazy: defer opening ``bus`` until the first transfer (or
+            :py:meth:`warmup`).
+        :type lazy: boolean
         """
         self.fd = None
-        self.funcs = I2cFunc(0)
+        self._lock = threading.RLock()
+        self._thread = _ThreadState()
+        _instances.add(self)
+        self._funcs = I2cFunc(0)
+        self._filepath = None
+        self.cache = cache
+        self.shared = shared
+        self._shared = None
+        self._pending = None
+        # Settings to apply again when reopened in a forked child
+        self._restore = False
+        self._reset_dispatch()
         if bus is not None:
-            self.open(bus)
+            if lazy:
+                self._pending = bus
+            else:
+                self.open(bus)
         self.address = None
         self.force = force
         self._force_last = None
         self._pec = 0
         self._tenbit = 0
+        self._xfer_estimate_ns = 0
+        self.stats = {"deadline_timeouts": 0}
+        self.meter = None
+        # Buffer pool of the messages created by i2c_rd() and i2c_wr()
+        self.pool = None
 
     def __enter__(self):
         """Enter handler."""
@@ -344,8 +616,58 @@ class SMBus:
         else:
             raise TypeError(f"Unexpected type(bus)={type(bus)}")
 
-        self.fd = os.open(filepath, os.O_RDWR)
-        self.funcs = self._get_funcs()
+        self._pending = None
+
+        if self.shared:
+            self._shared = _acquire_shared(filepath)
+            self.fd = self._shared.fd
+        else:
+            self.fd = os.open(filepath, os.O_RDWR)
+        self._filepath = filepath
+        # Probed on first use of funcs, see _get_funcs_cached()
+        self._funcs = None
+        self._reset_dispatch()
+        if self._restore:
+            self._restore = False
+            self._restore_settings()
+
+    def warmup(self):
+        """
+        Open a lazily opened bus and probe its capabilities now, rather than
+        on first use.
+
+        :return: Supported I2C functionality
+        :rtype: int
+        """
+        return self.funcs
+
+    def _get_funcs_cached(self):
+        funcs = self._funcs
+        if funcs is not None and self._pending is None:
+            return funcs
+        with self._lock:
+            if self._pending is not None:
+                self.open(self._pending)
+            if self._funcs is None:
+                funcs = None if self.cache is None else self.cache.get(self._filepath)
+                if funcs is None:
+                    funcs = self._get_funcs()
+                    if self.cache is not None:
+                        self.cache.set(self._filepath, funcs)
+                self._build_dispatch(funcs)
+                self._funcs = funcs
+            return self._funcs
+
+    def _set_funcs(self, funcs):
+        with self._lock:
+            self._funcs = funcs
+            self._build_dispatch(funcs)
+
+    funcs = property(_get_funcs_cached, _set_funcs)
+    """
+    Supported I2C functionality (see :py:class:`I2cFunc`), queried from the
+    adapter (or the capability cache) the first time it is needed.
+    """
 
     def close(self):
         """
@@ -354,17 +676,66 @@ class SMBus:
         :raise OSError: if the file descriptor in self.fd does not exist
         :rtype: None
         """
-        if self.fd:
+        with self._lock:
+            self._pending = None
+            if self._shared is not None:
+                _release_shared(self._shared)
+                self._shared = None
+                self.fd = None
+            elif self.fd or self._restore:
+                # A bus reset after a fork keeps its settings, not its descriptor
+                if self.fd:
+                    os.close(self.fd)
+                self.fd = None
+                self._restore = False
+                self._pec = 0
+                self._tenbit = 0
+                self.address = None
+                self._force_last = None
+
+    def _reset_after_fork(self):
+        """
+        Drop the descriptor inherited from the parent process, so that the
+        bus is reopened lazily on first use in the child, with the same
+        settings (see :py:meth:`_restore_settings`).
+        Private.
+        """
+        self._lock = threading.RLock()
+        self._thread = _ThreadState()
+        if self.fd is None:
+            return
+        if self._shared is None:
             os.close(self.fd)
-            self.fd = None
-            self._pec = 0
-            self._tenbit = 0
-            self.address = None
-            self._force_last = None
+        self._shared = None
+        self.fd = None
+        self._pending = self._filepath
+        self._restore = True
+
+    def _restore_settings(self):
+        """
+        Apply the PEC, 10 bit addressing, slave address, timeout and retries
+        settings of the instance to its reopened descriptor, with the ioctls
+        their setters use. Shared instances apply PEC, 10 bit addressing and
+        the slave address before each transfer.
+        Private.
+        """
+        if self._shared is None:
+            if self._tenbit:
+                ioctl(self.fd, I2C_TENBIT, self._tenbit)
+            if self._pec:
+                ioctl(self.fd, I2C_PEC, self._pec)
+            if self.address is not None:
+                request = I2C_SLAVE_FORCE if self._force_last is True else I2C_SLAVE
+                ioctl(self.fd, request, self.address)
+        if hasattr(self, "_timeout"):
+            ioctl(self.fd, I2C_TIMEOUT, self._timeout)
+        if hasattr(self, "_retries"):
+            ioctl(self.fd, I2C_RETRIES, self._retries)
 
     def _get_pec(self):
         return self._pec
 
+    @_transfer
     def enable_pec(self, enable=True):
         """
         Enable/Disable PEC (Packet Error Checking) - SMBus 1.1 and later
@@ -377,6 +748,9 @@ class SMBus:
         if not (self.funcs & I2cFunc.SMBUS_PEC):
             raise OSError("SMBUS_PEC is not a feature")
         self._pec = int(enable)
+        if self._shared is not None:
+            # Applied to the shared descriptor before each transfer
+            return
         ioctl(self.fd, I2C_PEC, self._pec)
 
     pec = property(_get_pec, enable_pec)  # Drop-in replacement for smbus member "pec"
@@ -385,6 +759,7 @@ class SMBus:
     def _get_tenbit(self):
         return self._tenbit
 
+    @_transfer
     def enable_tenbit(self, enable=True):
         """
         Enable 10 bit addresses if they are supported.
@@ -397,6 +772,9 @@ class SMBus:
         if not (self.funcs & I2cFunc.ADDR_10BIT):
             raise OSError("ADDR_10BIT is not a feature")
         self._tenbit = int(enable)
+        if self._shared is not None:
+            # Applied to the shared descriptor before each transfer
+            return
         ioctl(self.fd, I2C_TENBIT, self._tenbit)
 
     tenbit = property(_get_tenbit, enable_tenbit)
@@ -405,6 +783,7 @@ class SMBus:
     def _get_timeout(self):
         return self._timeout
 
+    @_transfer
     def set_timeout(self, timeout):
         """
         Set the timeout in units of 10ms.
@@ -422,6 +801,7 @@ class SMBus:
     def _get_retries(self):
         return self._retries
 
+    @_transfer
     def set_retries(self, retries):
         """
         Set the retries.
@@ -448,7 +828,9 @@ class SMBus:
         :rtype: None
         """
         force = force if force is not None else self.force
-        if self.address != address or self._force_last != force:
+        if self._shared is not None:
+            self._set_shared_address(address, force)
+        elif self.address != address or self._force_last != force:
             if force is True:
                 ioctl(self.fd, I2C_SLAVE_FORCE, address)
             else:
@@ -456,6 +838,188 @@ class SMBus:
             self.address = address
             self._force_last = force
 
+    def _set_shared_address(self, address, force):
+        """
+        Bring the shared descriptor to this instance's PEC, 10 bit and slave
+        address settings, skipping the ioctls whose value is already set.
+        Private.
+        """
+        shared = self._shared
+        if shared.tenbit != self._tenbit:
+            ioctl(self.fd, I2C_TENBIT, self._tenbit)
+            shared.tenbit = self._tenbit
+            shared.address = None
+        if shared.pec != self._pec:
+            ioctl(self.fd, I2C_PEC, self._pec)
+            shared.pec = self._pec
+        if shared.address != address or shared.force != force:
+            if force is True:
+                ioctl(self.fd, I2C_SLAVE_FORCE, address)
+            else:
+                ioctl(self.fd, I2C_SLAVE, address)
+            shared.address = address
+            shared.force = force
+        self.address = address
+        self._force_last = force
+
+    @contextmanager
+    def deadline(self, timeout_us):
+        """
+        Enforce a deadline on all transfers issued within a ``with`` block.
+
+        Unlike :py:meth:`set_timeout`, this does not change the adapter-wide
+        ``I2C_TIMEOUT`` and only affects this ``SMBus`` instance. Before each
+        transfer, the remaining time is compared with the duration of recent
+        transfers; once the next transfer would not finish in time it is not
+        issued and ``TimeoutError`` is raised, aborting the remaining steps
+        of the block. A transfer which has already started is never
+        interrupted. Nested deadlines can only shorten the enclosing one.
+
+        :param timeout_us: time budget in microseconds.
+        :type timeout_us: float
+        :raise TimeoutError: from the transfer which would exceed the deadline.
+        """
+        state = self._thread
+        previous = state.deadline_ns
+        deadline_ns = time.monotonic_ns() + int(timeout_us * 1000)
+        if previous is not None:
+            deadline_ns = min(deadline_ns, previous)
+        state.deadline_ns = deadline_ns
+        try:
+            yield
+        finally:
+            state.deadline_ns = previous
+
+    @contextmanager
+    def timestamps(self, clock=time.CLOCK_MONOTONIC):
+        """
+        Timestamp every transfer issued by the calling thread within a
+        ``with`` block.
+
+        The clock is read immediately before and after each transfer ioctl,
+        so the timestamps exclude the time spent in Python and in slave
+        address changes.
+
+        :param clock: ``time.CLOCK_MONOTONIC`` or ``time.CLOCK_MONOTONIC_RAW``.
+        :type clock: int
+        :return: Context manager yielding the list which receives a
+            ``(start_ns, end_ns)`` pair per transfer
+        """
+        state = self._thread
+        previous = state.stamps, state.clock
+        stamps = []
+        state.stamps, state.clock = stamps, clock
+        try:
+            yield stamps
+        finally:
+            state.stamps, state.clock = previous
+
+    def timestamped(self, method, *args, clock=time.CLOCK_MONOTONIC, **kwargs):
+        """
+        Call a transfer method and timestamp it, e.g.
+        ``bus.timestamped("read_word_data", 0x48, 0x00)``.
+
+        :param method: name of the method.
+        :type method: str
+        :param clock: ``time.CLOCK_MONOTONIC`` or ``time.CLOCK_MONOTONIC_RAW``.
+        :type clock: int
+        :raise ValueError: if the method issued no transfer.
+        :rtype: Timestamped
+        """
+        with self.timestamps(clock) as stamps:
+            value = getattr(self, method)(*args, **kwargs)
+        if not stamps:
+            raise ValueError(f"{method}() issued no transfer")
+        start, end = stamps[0][0], stamps[-1][1]
+        return Timestamped(value, (start + end) // 2, start, end)
+
+    def _xfer(self, request, arg):
+        """
+        Issue a transfer ioctl, honouring the current :py:meth:`deadline`,
+        capturing :py:meth:`timestamps` and reporting it to the bus meter,
+        if any.
+        Private.
+
+        :param request: ioctl request, ``I2C_SMBUS`` or ``I2C_RDWR``.
+        :type request: int
+        :param arg: ioctl argument structure.
+        :raise TimeoutError: if the transfer would exceed the deadline.
+        :rtype: None
+        """
+        state = self._thread
+        deadline_ns = state.deadline_ns
+        stamps = state.stamps
+        if deadline_ns is None and self.meter is None and stamps is None:
+            ioctl(self.fd, request, arg)
+            return
+        start = time.monotonic_ns()
+        if deadline_ns is not None and start + self._xfer_estimate_ns > deadline_ns:
+            self.stats["deadline_timeouts"] += 1
+            raise TimeoutError(errno.ETIMEDOUT, "Transfer deadline exceeded")
+        if stamps is None:
+            ioctl(self.fd, request, arg)
+        else:
+            clock = state.clock
+            before = time.clock_gettime_ns(clock)
+            ioctl(self.fd, request, arg)
+            stamps.append((before, time.clock_gettime_ns(clock)))
+        elapsed = time.monotonic_ns() - start
+        # Smoothed transfer duration, used to decide whether the next one fits
+        self._xfer_estimate_ns += (elapsed - self._xfer_estimate_ns) // 8
+        if self.meter is not None:
+            self.meter.record(self, request, arg, elapsed)
+
+    def _reset_dispatch(self):
+        """
+        Make the first call of every method in _DISPATCH go through
+        :py:meth:`_dispatch_first`.
+        Private.
+        """
+        self._routes = {}
+
+    def _dispatch_first(self, name, *args, **kwargs):
+        """
+        Try the native SMBus ioctl first, so that buses whose adapter
+        supports it are never probed for their functionality. When it fails,
+        build the dispatch table and retry with the fallback, if the adapter
+        lacks the functionality.
+        Private.
+        """
+        native = getattr(type(self), name)
+        try:
+            return native(self, *args, **kwargs)
+        except TimeoutError:
+            raise
+        except OSError:
+            self._build_dispatch(self.funcs)
+            route = self._routes[name]
+            if route is native:
+                raise
+        return route(self, *args, **kwargs)
+
+    def _build_dispatch(self, funcs):
+        """
+        Route each method in _DISPATCH to the native SMBus ioctl when the
+        adapter supports it, else to its I2C_RDWR emulation, else to its
+        chunked fallback. The choice is made once per open bus, so calls do
+        not check capabilities.
+        Private.
+
+        :param funcs: adapter functionality.
+        :type funcs: int
+        :rtype: None
+        """
+        cls = type(self)
+        routes = {}
+        for name, (required, emulation, fallback) in _DISPATCH.items():
+            if not funcs & required and funcs & I2cFunc.I2C:
+                routes[name] = getattr(cls, emulation)
+            elif not funcs & required and fallback is not None and funcs & fallback[0]:
+                routes[name] = getattr(cls, fallback[1])
+            else:
+                routes[name] = getattr(cls, name)
+        self._routes = routes
+
     def _get_funcs(self):
         """
         Returns a 32-bit value stating supported I2C functions.
@@ -467,6 +1031,7 @@ class SMBus:
         ioctl(self.fd, I2C_FUNCS, f)
         return f.value
 
+    @_transfer
     def write_quick(self, i2c_addr, force=None):
         """
         Perform quick transaction. Throws IOError if unsuccessful.
@@ -479,11 +1044,10 @@ class SMBus:
         :rtype: None
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_WRITE, command=0, size=I2C_SMBUS_QUICK
-        )
-        ioctl(self.fd, I2C_SMBUS, msg)
+        msg = _smbus_ioctl_data(I2C_SMBUS_WRITE, 0, I2C_SMBUS_QUICK)
+        self._xfer(I2C_SMBUS, msg)
 
+    @_transfer
     def read_byte(self, i2c_addr, force=None):
         """
         Read a single byte from a device.
@@ -497,10 +1061,11 @@ class SMBus:
         :rtype: int
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(read_write=I2C_SMBUS_READ, command=0, size=I2C_SMBUS_BYTE)
-        ioctl(self.fd, I2C_SMBUS, msg)
+        msg = _smbus_ioctl_data(I2C_SMBUS_READ, 0, I2C_SMBUS_BYTE)
+        self._xfer(I2C_SMBUS, msg)
         return msg.data.contents.byte
 
+    @_transfer
     def write_byte(self, i2c_addr, value, force=None):
         """
         Write a single byte to a device.
@@ -514,11 +1079,11 @@ class SMBus:
         :rtype: None
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_WRITE, command=value, size=I2C_SMBUS_BYTE
-        )
-        ioctl(self.fd, I2C_SMBUS, msg)
+        msg = _smbus_ioctl_data(I2C_SMBUS_WRITE, value, I2C_SMBUS_BYTE)
+        self._xfer(I2C_SMBUS, msg)
 
+    @_Dispatched
+    @_transfer
     def read_byte_data(self, i2c_addr, register, force=None):
         """
         Read a single byte from a designated register.
@@ -533,12 +1098,12 @@ class SMBus:
         :rtype: int
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_READ, command=register, size=I2C_SMBUS_BYTE_DATA
-        )
-        ioctl(self.fd, I2C_SMBUS, msg)
+        msg = _smbus_ioctl_data(I2C_SMBUS_READ, register, I2C_SMBUS_BYTE_DATA)
+        self._xfer(I2C_SMBUS, msg)
         return msg.data.contents.byte
 
+    @_Dispatched
+    @_transfer
     def write_byte_data(self, i2c_addr, register, value, force=None):
         """
         Write a byte to a given register.
@@ -554,12 +1119,12 @@ class SMBus:
         :rtype: None
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_WRITE, command=register, size=I2C_SMBUS_BYTE_DATA
-        )
+        msg = _smbus_ioctl_data(I2C_SMBUS_WRITE, register, I2C_SMBUS_BYTE_DATA)
         msg.data.contents.byte = value
-        ioctl(self.fd, I2C_SMBUS, msg)
+        self._xfer(I2C_SMBUS, msg)
 
+    @_Dispatched
+    @_transfer
     def read_word_data(self, i2c_addr, register, force=None):
         """
         Read a single word (2 bytes) from a given register.
@@ -574,12 +1139,12 @@ class SMBus:
         :rtype: int
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_READ, command=register, size=I2C_SMBUS_WORD_DATA
-        )
-        ioctl(self.fd, I2C_SMBUS, msg)
+        msg = _smbus_ioctl_data(I2C_SMBUS_READ, register, I2C_SMBUS_WORD_DATA)
+        self._xfer(I2C_SMBUS, msg)
         return msg.data.contents.word
 
+    @_Dispatched
+    @_transfer
     def write_word_data(self, i2c_addr, register, value, force=None):
         """
         Write a single word (2 bytes) to a given register.
@@ -595,12 +1160,12 @@ class SMBus:
         :rtype: None
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_WRITE, command=register, size=I2C_SMBUS_WORD_DATA
-        )
+        msg = _smbus_ioctl_data(I2C_SMBUS_WRITE, register, I2C_SMBUS_WORD_DATA)
         msg.data.contents.word = value
-        ioctl(self.fd, I2C_SMBUS, msg)
+        self._xfer(I2C_SMBUS, msg)
 
+    @_Dispatched
+    @_transfer
     def process_call(self, i2c_addr, register, value, force=None):
         """
         Executes a SMBus Process Call, sending a 16-bit value and receiving a 16-bit response
@@ -616,13 +1181,13 @@ class SMBus:
         :rtype: int
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_WRITE, command=register, size=I2C_SMBUS_PROC_CALL
-        )
+        msg = _smbus_ioctl_data(I2C_SMBUS_WRITE, register, I2C_SMBUS_PROC_CALL)
         msg.data.contents.word = value
-        ioctl(self.fd, I2C_SMBUS, msg)
+        self._xfer(I2C_SMBUS, msg)
         return msg.data.contents.word
 
+    @_Dispatched
+    @_transfer
     def read_block_data(self, i2c_addr, register, force=None):
         """
         Read a block of up to 32-bytes from a given register.
@@ -637,13 +1202,13 @@ class SMBus:
         :rtype: list
         """
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_READ, command=register, size=I2C_SMBUS_BLOCK_DATA
-        )
-        ioctl(self.fd, I2C_SMBUS, msg)
+        msg = _smbus_ioctl_data(I2C_SMBUS_READ, register, I2C_SMBUS_BLOCK_DATA)
+        self._xfer(I2C_SMBUS, msg)
         length = msg.data.contents.block[0]
         return msg.data.contents.block[1 : length + 1]
 
+    @_Dispatched
+    @_transfer
     def write_block_data(self, i2c_addr, register, data, force=None):
         """
         Write a block of byte data to a given register.
@@ -663,13 +1228,13 @@ class SMBus:
         if length > I2C_SMBUS_BLOCK_MAX:
             raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_WRITE, command=register, size=I2C_SMBUS_BLOCK_DATA
-        )
+        msg = _smbus_ioctl_data(I2C_SMBUS_WRITE, register, I2C_SMBUS_BLOCK_DATA)
         msg.data.contents.block[0] = length
         msg.data.contents.block[1 : length + 1] = data
-        ioctl(self.fd, I2C_SMBUS, msg)
+        self._xfer(I2C_SMBUS, msg)
 
+    @_Dispatched
+    @_transfer
     def block_process_call(self, i2c_addr, register, data, force=None):
         """
         Executes a SMBus Block Process Call, sending a variable-size data
@@ -691,15 +1256,15 @@ class SMBus:
         if length > I2C_SMBUS_BLOCK_MAX:
             raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_WRITE, command=register, size=I2C_SMBUS_BLOCK_PROC_CALL
-        )
+        msg = _smbus_ioctl_data(I2C_SMBUS_WRITE, register, I2C_SMBUS_BLOCK_PROC_CALL)
         msg.data.contents.block[0] = length
         msg.data.contents.block[1 : length + 1] = data
-        ioctl(self.fd, I2C_SMBUS, msg)
+        self._xfer(I2C_SMBUS, msg)
         length = msg.data.contents.block[0]
         return msg.data.contents.block[1 : length + 1]
 
+    @_Dispatched
+    @_transfer
     def read_i2c_block_data(self, i2c_addr, register, length, force=None):
         """
         Read a block of byte data from a given register.
@@ -719,13 +1284,13 @@ class SMBus:
         if length > I2C_SMBUS_BLOCK_MAX:
             raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_READ, command=register, size=I2C_SMBUS_I2C_BLOCK_DATA
-        )
+        msg = _smbus_ioctl_data(I2C_SMBUS_READ, register, I2C_SMBUS_I2C_BLOCK_DATA)
         msg.data.contents.byte = length
-        ioctl(self.fd, I2C_SMBUS, msg)
+        self._xfer(I2C_SMBUS, msg)
         return msg.data.contents.block[1 : length + 1]
 
+    @_Dispatched
+    @_transfer
     def write_i2c_block_data(self, i2c_addr, register, data, force=None):
         """
         Write a block of byte data to a given register.
@@ -745,14 +1310,235 @@ class SMBus:
         if length > I2C_SMBUS_BLOCK_MAX:
             raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
         self._set_address(i2c_addr, force=force)
-        msg = i2c_smbus_ioctl_data.create(
-            read_write=I2C_SMBUS_WRITE, command=register, size=I2C_SMBUS_I2C_BLOCK_DATA
-        )
+        msg = _smbus_ioctl_data(I2C_SMBUS_WRITE, register, I2C_SMBUS_I2C_BLOCK_DATA)
         msg.data.contents.block[0] = length
         msg.data.contents.block[1 : length + 1] = data
-        ioctl(self.fd, I2C_SMBUS, msg)
+        self._xfer(I2C_SMBUS, msg)
+
+    @_transfer
+    def read_words(  # noqa: PLR0913
+        self, i2c_addr, register, count, byteorder="little", signed=False, force=None
+    ):
+        """
+        Read ``count`` consecutive 16-bit registers in a single transfer.
+
+        Unlike :py:meth:`read_word_data`, which always returns the kernel's
+        little-endian interpretation of one register, the whole range is
+        fetched with one block read (an ``I2C_RDWR`` write/read pair when
+        it exceeds I2C_SMBUS_BLOCK_MAX bytes) and decoded in one go.
+
+        :param i2c_addr: i2c address
+        :type i2c_addr: int
+        :param register: Start register
+        :type register: int
+        :param count: Number of words to read
+        :type count: int
+        :param byteorder: byte order of the words on the device,
+            ``"little"`` (SMBus convention) or ``"big"``.
+        :type byteorder: str
+        :param signed: decode words as two's complement.
+        :type signed: bool
+        :param force: force using the slave address even when driver is already using it.
+        :type force: bool
+        :raise ValueError: if byteorder is neither "little" nor "big", or if
+            count is below 1 or the words do not fit in one message
+        :return: Decoded words
+        :rtype: array.array of typecode ``'h'`` (signed) or ``'H'``
+        """
+        if byteorder not in ("little", "big"):
+            raise ValueError(f"Unexpected byteorder={byteorder!r}")
+        if not 1 <= 2 * count <= _MSG_LEN_MAX:
+            raise ValueError(f"Count must be between 1 and {_MSG_LEN_MAX // 2:d} words")
+        length = 2 * count
+        if length <= I2C_SMBUS_BLOCK_MAX:
+            data = bytes(self.read_i2c_block_data(i2c_addr, register, length, force=force))
+        else:
+            # Same addressing, PEC and force handling as the SMBus emulation
+            data = self._emulate(i2c_addr, (register,), length, force=force)
+        words = array("h" if signed else "H", data)
+        if byteorder != sys.byteorder:
+            words.byteswap()
+        return words
+
+    @_transfer
+    def read_many(self, i2c_addrs, register, length):
+        """
+        Read the same registers from many devices, e.g. identical sensors
+        at consecutive addresses.
+
+        The register pointer write and the read of each device are packed
+        into combined ``I2C_RDWR`` transactions of up to
+        ``I2C_RDWR_IOCTL_MAX_MSGS`` messages, so a whole rack is read with a
+        few ioctls and no ``I2C_SLAVE`` calls. A device which does not answer
+        aborts the transaction it is part of: that transaction is then split
+        in halves and retried, until the failing devices are isolated.
+        Adapters without plain I2C support fall back to one I2C block read
+        per device.
+
+        With :py:attr:`pec` enabled, each device's read is extended by its
+        PEC byte, which is checked against the device's own write and read
+        (each device sees its own transaction). A mismatch is reported as
+        an ``OSError`` with ``EBADMSG`` for that device only.
+
+        :param i2c_addrs: i2c addresses
+        :type i2c_addrs: list
+        :param register: Start register
+        :type register: int
+        :param length: Number of bytes to read from each device
+        :type length: int
+        :raise TimeoutError: if the current :py:meth:`deadline` expires.
+        :return: ``{address: bytes}``, with the raised exception in place of
+            the bytes for devices that could not be read.
+        :rtype: dict
+        """
+        results = {}
+        if not self.funcs & I2cFunc.I2C:
+            for i2c_addr in i2c_addrs:
+                try:
+                    results[i2c_addr] = bytes(self.read_i2c_block_data(i2c_addr, register, length))
+                except TimeoutError:
+                    raise
+                except OSError as e:
+                    results[i2c_addr] = e
+            return results
+        flags = I2C_M_TEN if self._tenbit else I2C_M_WR
+        pairs = [
+            (
+                i2c_addr,
+                i2c_msg.write(i2c_addr, (register,), flags=flags),
+                i2c_msg.read(i2c_addr, length + self._pec, flags=flags | I2C_M_RD),
+            )
+            for i2c_addr in i2c_addrs
+        ]
+        batch = I2C_RDWR_IOCTL_MAX_MSGS // 2
+        for start in range(0, len(pairs), batch):
+            self._read_pairs(pairs[start : start + batch], results)
+        return results
+
+    def _read_pairs(self, pairs, results):
+        """
+        Perform write/read pairs in one transaction, bisecting on failure.
+        Private.
+
+        :rtype: None
+        """
+        msgs = [msg for _, write, read in pairs for msg in (write, read)]
+        try:
+            self._xfer(I2C_RDWR, i2c_rdwr_ioctl_data.create(*msgs))
+        except TimeoutError:
+            raise
+        except OSError as e:
+            if len(pairs) == 1:
+                results[pairs[0][0]] = e
+                return
+            half = len(pairs) // 2
+            self._read_pairs(pairs[:half], results)
+            self._read_pairs(pairs[half:], results)
+            return
+        for i2c_addr, write, read in pairs:
+            data = bytes(read)
+            if self._pec:
+                data, pec = data[:-1], data[-1]
+                crc = crc8((address_byte(i2c_addr, True),), messages_pec((write,)))
+                crc = crc8(data, crc)
+                if crc != pec:
+                    results[i2c_addr] = OSError(
+                        errno.EBADMSG, f"PEC mismatch: expected 0x{crc:02X}, got 0x{pec:02X}"
+                    )
+                    continue
+            results[i2c_addr] = data
+
+    def _prepared16(self, i2c_addr, size, length):
+        """
+        Preallocated messages of a 16-bit register transfer: a write of
+        ``size`` bytes (register address and data), followed by a read of
+        ``length`` bytes unless ``length`` is 0. Kept per thread and transfer
+        shape, so repeated accesses only copy the register address into place.
+        Private.
+
+        :return: write message, read message or None, ioctl argument
+        :rtype: tuple
+        """
+        flags = I2C_M_TEN if self._tenbit else I2C_M_WR
+        key = (i2c_addr, size, length, flags)
+        cache = self._thread.prepared
+        prepared = cache.get(key)
+        if prepared is None:
+            if len(cache) >= _PREPARED_MAX:
+                cache.clear()
+            write = i2c_msg.write(i2c_addr, bytes(size), flags=flags)
+            read = i2c_msg.read(i2c_addr, length, flags=flags | I2C_M_RD) if length else None
+            msgs = (write, read) if length else (write,)
+            prepared = cache[key] = (write, read, i2c_rdwr_ioctl_data.create(*msgs))
+        return prepared
+
+    @_transfer
+    def read_i2c_block_data16(self, i2c_addr, register, length, byteorder="big"):
+        """
+        Read a block of data from a device with 16-bit register addresses,
+        such as EEPROMs larger than 2 kbit, in one combined transfer of any
+        length.
+
+        :param i2c_addr: i2c address
+        :type i2c_addr: int
+        :param register: Start register
+        :type register: int
+        :param length: Desired block length
+        :type length: int
+        :param byteorder: byte order of the register address on the wire,
+            ``"big"`` (most devices) or ``"little"``.
+        :type byteorder: str
+        :raise ValueError: if byteorder is neither "little" nor "big", or
+            if length does not fit in one message (PEC byte included)
+        :return: Bytes read
+        :rtype: bytes
+        """
+        if byteorder not in ("little", "big"):
+            raise ValueError(f"Unexpected byteorder={byteorder!r}")
+        if not 1 <= length <= _MSG_LEN_MAX - self._pec:
+            raise ValueError(f"Length must be between 1 and {_MSG_LEN_MAX - self._pec:d} bytes")
+        write, read, ioctl_data = self._prepared16(i2c_addr, 2, length)
+        memmove(write.buf, register.to_bytes(2, byteorder), 2)
+        if self._pec:
+            self.i2c_rdwr(write, read, pec=True)
+        else:
+            self._xfer(I2C_RDWR, ioctl_data)
+        return string_at(read.buf, length)
 
-    def i2c_rdwr(self, *i2c_msgs):
+    @_transfer
+    def write_i2c_block_data16(self, i2c_addr, register, data, byteorder="big"):
+        """
+        Write a block of data to a device with 16-bit register addresses, in
+        one transfer of any length.
+
+        :param i2c_addr: i2c address
+        :type i2c_addr: int
+        :param register: Start register
+        :type register: int
+        :param data: Bytes to write
+        :type data: bytes or list
+        :param byteorder: byte order of the register address on the wire,
+            ``"big"`` (most devices) or ``"little"``.
+        :type byteorder: str
+        :raise ValueError: if byteorder is neither "little" nor "big", or
+            if the register address and data do not fit in one message (PEC
+            byte included)
+        :rtype: None
+        """
+        if byteorder not in ("little", "big"):
+            raise ValueError(f"Unexpected byteorder={byteorder!r}")
+        buf = register.to_bytes(2, byteorder) + bytes(data)
+        if not 1 <= len(buf) <= _MSG_LEN_MAX - self._pec:
+            raise ValueError(f"Data length cannot exceed {_MSG_LEN_MAX - self._pec - 2:d} bytes")
+        write, _, ioctl_data = self._prepared16(i2c_addr, len(buf), 0)
+        memmove(write.buf, buf, len(buf))
+        if self._pec:
+            self.i2c_rdwr(write, pec=True)
+        else:
+            self._xfer(I2C_RDWR, ioctl_data)
+
+    @_transfer
+    def i2c_rdwr(self, *i2c_msgs, pec=False):
         """
         Combine a series of i2c read and write operations in a single
         transaction (with repeated start bits but no stop bits in between).
@@ -760,17 +1546,234 @@ class SMBus:
         This method takes i2c_msg instances as input, which must be created
         first with :py:meth:`i2c_msg.read` or :py:meth:`i2c_msg.write`.
 
+        With ``pec=True``, a SMBus Packet Error Code covering the whole
+        transaction (address bytes included) is computed in userspace: it is
+        appended to the last message if that is a write, or read after it
+        and verified if that is a read. This does not depend on the
+        adapter supporting ``I2C_PEC``.
+
         :param i2c_msgs: One or more i2c_msg class instances.
         :type i2c_msgs: i2c_msg
+        :param pec: append/verify a PEC byte at the end of the transaction.
+        :type pec: bool
+        :raise ValueError: if a PEC is requested with 10 bit addresses, or
+            for a transaction that writes after reading.
+        :raise OSError: with ``EBADMSG`` if the received PEC is wrong.
         :rtype: None
         """
+        if pec:
+            self._i2c_rdwr_pec(i2c_msgs)
+            return
         ioctl_data = i2c_rdwr_ioctl_data.create(*i2c_msgs)
-        ioctl(self.fd, I2C_RDWR, ioctl_data)
+        self._xfer(I2C_RDWR, ioctl_data)
+
+    def _i2c_rdwr_pec(self, i2c_msgs):
+        """
+        Perform a combined transaction terminated by a PEC byte.
+        Private.
+
+        :rtype: None
+        """
+        *head, last = i2c_msgs
+        if any(msg.flags & I2C_M_TEN for msg in i2c_msgs):
+            raise ValueError("PEC is not supported with 10 bit addresses")
+        if not last.flags & I2C_M_RD:
+            if any(msg.flags & I2C_M_RD for msg in head):
+                raise ValueError("PEC cannot be sent after a read in the same transaction")
+            buf = bytes(last) + bytes((messages_pec(i2c_msgs),))
+            wire = i2c_msg.write(last.addr, buf, flags=last.flags)
+            self._xfer(I2C_RDWR, i2c_rdwr_ioctl_data.create(*head, wire))
+            return
+        wire = i2c_msg.read(last.addr, last.len + 1, flags=last.flags)
+        self._xfer(I2C_RDWR, i2c_rdwr_ioctl_data.create(*head, wire))
+        data = bytes(wire)
+        memmove(last.buf, data, last.len)
+        crc = messages_pec(i2c_msgs)
+        if crc != data[-1]:
+            raise OSError(errno.EBADMSG, f"PEC mismatch: expected 0x{crc:02X}, got 0x{data[-1]:02X}")
+
+    def _emulate(self, i2c_addr, data, length=0, force=None):
+        """
+        Emulate an SMBus transfer with I2C_RDWR: write ``data``, then read
+        ``length`` bytes after a repeated start. The PEC, when enabled, is
+        computed in userspace. I2C_RDWR skips the check for addresses in
+        use by a driver, so the slave address is set first, like for the
+        SMBus transfer, unless ``force`` is set.
+        Private.
+
+        :rtype: bytes
+        """
+        self._set_address(i2c_addr, force=force)
+        flags = I2C_M_TEN if self._tenbit else I2C_M_WR
+        msgs = [i2c_msg.write(i2c_addr, data, flags=flags)]
+        if length:
+            msgs.append(i2c_msg.read(i2c_addr, length, flags=flags | I2C_M_RD))
+        self.i2c_rdwr(*msgs, pec=bool(self._pec))
+        return bytes(msgs[-1]) if length else b""
+
+    def _emulate_block(self, i2c_addr, data, force=None):
+        """
+        Emulate an SMBus transfer ending with a block read, in a single
+        transaction. Adapters which support SMBus block reads end the read
+        after the count byte, the data and the PEC by themselves
+        (``I2C_M_RECV_LEN``). From others, a maximal block is read and cut
+        to the count the device sent.
+        Private.
+
+        :raise OSError: with ``EPROTO`` if the device sends an invalid count.
+        :rtype: list
+        """
+        self._set_address(i2c_addr, force=force)
+        flags = I2C_M_TEN if self._tenbit else I2C_M_WR
+        pec = self._pec
+        write = i2c_msg.write(i2c_addr, data, flags=flags)
+        length = 1 + I2C_SMBUS_BLOCK_MAX + pec
+        if self.funcs & I2cFunc.SMBUS_READ_BLOCK_DATA:
+            read = i2c_msg.read(i2c_addr, length, flags=flags | I2C_M_RD | I2C_M_RECV_LEN)
+            # i2c-dev takes the number of bytes besides the data from buf[0]
+            read.buf[0] = bytes((1 + pec,))
+        else:
+            read = i2c_msg.read(i2c_addr, length, flags=flags | I2C_M_RD)
+        self.i2c_rdwr(write, read)
+        buf = bytes(read)
+        length = buf[0]
+        if length > I2C_SMBUS_BLOCK_MAX or length + 1 + pec > len(buf):
+            raise OSError(errno.EPROTO, f"Invalid block length {length}")
+        if pec:
+            crc = crc8((address_byte(i2c_addr, True),), messages_pec((write,)))
+            crc = crc8(buf[: length + 1], crc)
+            if crc != buf[length + 1]:
+                raise OSError(
+                    errno.EBADMSG, f"PEC mismatch: expected 0x{crc:02X}, got 0x{buf[length + 1]:02X}"
+                )
+        return list(buf[1 : length + 1])
+
+    @_transfer
+    def _read_byte_data_rdwr(self, i2c_addr, register, force=None):
+        """
+        :py:meth:`read_byte_data` emulated with I2C_RDWR.
+        Private.
+        """
+        return self._emulate(i2c_addr, (register,), 1, force=force)[0]
+
+    @_transfer
+    def _write_byte_data_rdwr(self, i2c_addr, register, value, force=None):
+        """
+        :py:meth:`write_byte_data` emulated with I2C_RDWR.
+        Private.
+        """
+        self._emulate(i2c_addr, (register, value), force=force)
+
+    @_transfer
+    def _read_word_data_rdwr(self, i2c_addr, register, force=None):
+        """
+        :py:meth:`read_word_data` emulated with I2C_RDWR.
+        Private.
+        """
+        data = self._emulate(i2c_addr, (register,), 2, force=force)
+        return data[0] | data[1] << 8
+
+    @_transfer
+    def _write_word_data_rdwr(self, i2c_addr, register, value, force=None):
+        """
+        :py:meth:`write_word_data` emulated with I2C_RDWR.
+        Private.
+        """
+        self._emulate(i2c_addr, (register, value & 0xFF, value >> 8 & 0xFF), force=force)
+
+    @_transfer
+    def _process_call_rdwr(self, i2c_addr, register, value, force=None):
+        """
+        :py:meth:`process_call` emulated with I2C_RDWR.
+        Private.
+        """
+        data = self._emulate(i2c_addr, (register, value & 0xFF, value >> 8 & 0xFF), 2, force=force)
+        return data[0] | data[1] << 8
+
+    @_transfer
+    def _read_block_data_rdwr(self, i2c_addr, register, force=None):
+        """
+        :py:meth:`read_block_data` emulated with I2C_RDWR.
+        Private.
+        """
+        return self._emulate_block(i2c_addr, (register,), force=force)
+
+    @_transfer
+    def _write_block_data_rdwr(self, i2c_addr, register, data, force=None):
+        """
+        :py:meth:`write_block_data` emulated with I2C_RDWR.
+        Private.
+        """
+        length = len(data)
+        if length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        self._emulate(i2c_addr, [register, length, *data], force=force)
+
+    @_transfer
+    def _block_process_call_rdwr(self, i2c_addr, register, data, force=None):
+        """
+        :py:meth:`block_process_call` emulated with I2C_RDWR.
+        Private.
+        """
+        length = len(data)
+        if length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        return self._emulate_block(i2c_addr, [register, length, *data], force=force)
+
+    @_transfer
+    def _read_i2c_block_data_rdwr(self, i2c_addr, register, length, force=None):
+        """
+        :py:meth:`read_i2c_block_data` emulated with I2C_RDWR.
+        Private.
+        """
+        if length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        return list(self._emulate(i2c_addr, (register,), length, force=force))
+
+    @_transfer
+    def _write_i2c_block_data_rdwr(self, i2c_addr, register, data, force=None):
+        """
+        :py:meth:`write_i2c_block_data` emulated with I2C_RDWR.
+        Private.
+        """
+        if len(data) > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        self._emulate(i2c_addr, [register, *data], force=force)
+
+    @_transfer
+    def _read_i2c_block_data_chunked(self, i2c_addr, register, length, force=None):
+        """
+        :py:meth:`read_i2c_block_data` as one byte data read per register,
+        for SMBus-only adapters without I2C block support.
+        Private.
+        """
+        if length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        return [
+            self.read_byte_data(i2c_addr, (register + k) & 0xFF, force=force) for k in range(length)
+        ]
+
+    @_transfer
+    def _write_i2c_block_data_chunked(self, i2c_addr, register, data, force=None):
+        """
+        :py:meth:`write_i2c_block_data` as one byte data write per register,
+        for SMBus-only adapters without I2C block support.
+        Private.
+        """
+        if len(data) > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {I2C_SMBUS_BLOCK_MAX:d} bytes")
+        for k, value in enumerate(data):
+            self.write_byte_data(i2c_addr, (register + k) & 0xFF, value, force=force)
 
     def i2c_rd(self, i2c_addr, length, flags=I2C_M_RD):
         """
         Perform a single i2c read operation, given an i2c_addr and length.
 
+        When :py:attr:`pool` is set, the message and its buffer are leased
+        from it and should be released once the data is used, see
+        :py:mod:`smbus3.buffers`. They are released by the call itself if the
+        transfer fails.
+
         :param i2c_addr: i2c address for the read operation.
         :type i2c_addr: int
         :param length: length of read.
@@ -779,8 +1782,14 @@ class SMBus:
         :type flags: int
         :rtype: i2c_msg
         """
-        msg = i2c_msg.read(i2c_addr, length, flags=flags)
-        self.i2c_rdwr(msg)
+        pool = self.pool
+        msg = i2c_msg.read(i2c_addr, length, flags=flags, pool=pool)
+        try:
+            self._i2c_rdwr_single(msg)
+        except BaseException:
+            if pool is not None:
+                pool.release(msg)
+            raise
         return msg
 
     def i2c_wr(self, i2c_addr, buf, flags=I2C_M_WR):
@@ -788,6 +1797,11 @@ class SMBus:
         Perform a single i2c write operation, given an i2c_addr and a
         buffer to copy.
 
+        When :py:attr:`pool` is set, the message and its buffer are leased
+        from it and should be released after the call, see
+        :py:mod:`smbus3.buffers`. They are released by the call itself if the
+        transfer fails.
+
         :param i2c_addr: i2c address for the write operation.
         :type i2c_addr: int
         :param buf: buffer to write.
@@ -796,6 +1810,29 @@ class SMBus:
         :type flags: int
         :rtype: i2c_msg
         """
-        msg = i2c_msg.write(i2c_addr, buf, flags=flags)
-        self.i2c_rdwr(msg)
+        pool = self.pool
+        msg = i2c_msg.write(i2c_addr, buf, flags=flags, pool=pool)
+        try:
+            self._i2c_rdwr_single(msg)
+        except BaseException:
+            if pool is not None:
+                pool.release(msg)
+            raise
         return msg
+
+    @_transfer
+    def _i2c_rdwr_single(self, msg):
+        """
+        Perform a one message transaction, reusing the calling thread's
+        ioctl argument.
+        Private.
+
+        :rtype: None
+        """
+        state = self._thread
+        if state.single is None:
+            msgs = (i2c_msg * 1)()
+            state.single = (msgs, i2c_rdwr_ioctl_data(msgs=msgs, nmsgs=1))
+        msgs, ioctl_data = state.single
+        msgs[0] = msg
+        self._xfer(I2C_RDWR, ioctl_data)
@@ -1,8 +1,15 @@
+from array import array
 from collections.abc import Generator, Iterable, Sequence
+from contextlib import AbstractContextManager
 from ctypes import Array, Structure, Union, c_uint8, c_uint16, c_uint32, pointer
 from enum import IntFlag
+from threading import RLock
 from types import TracebackType
-from typing import SupportsBytes
+from typing import Any, Literal, NamedTuple, SupportsBytes
+
+from .buffers import BufferPool
+from .capabilities import CapabilityCache
+from .utilization import BusMeter
 
 I2C_RETRIES: int
 I2C_TIMEOUT: int
@@ -24,6 +31,7 @@ I2C_SMBUS_BLOCK_DATA: int
 I2C_SMBUS_BLOCK_PROC_CALL: int
 I2C_SMBUS_I2C_BLOCK_DATA: int
 I2C_SMBUS_BLOCK_MAX: int
+I2C_RDWR_IOCTL_MAX_MSGS: int
 
 class I2C_M_Bitflag(IntFlag):
     I2C_M_RD: int = ...
@@ -63,6 +71,7 @@ class I2cFunc(IntFlag):
 I2C_M_RD: int
 I2C_M_WR: int
 I2C_M_TEN: int
+I2C_M_RECV_LEN: int
 LP_c_uint8: type[pointer[c_uint8]]  # type: ignore[valid-type]
 LP_c_uint16: type[pointer[c_uint16]]  # type: ignore[valid-type]
 LP_c_uint32: type[pointer[c_uint32]]  # type: ignore[valid-type]
@@ -84,16 +93,38 @@ class i2c_msg(Structure):
     def __repr__(self) -> str: ...
     def __str__(self) -> str: ...
     @staticmethod
-    def read(address: int, length: int, flags: int = ...) -> i2c_msg: ...
+    def read(
+        address: int, length: int, flags: int = ..., pool: BufferPool | None = None
+    ) -> i2c_msg: ...
     @staticmethod
     def write(
-        address: int, buf: str | Iterable[int] | SupportsBytes, flags: int = ...
+        address: int,
+        buf: str | Iterable[int] | SupportsBytes,
+        flags: int = ...,
+        pool: BufferPool | None = None,
     ) -> i2c_msg: ...
 
 class i2c_rdwr_ioctl_data(Structure):
     @staticmethod
     def create(*i2c_msg_instances: Sequence[i2c_msg]) -> i2c_rdwr_ioctl_data: ...
 
+class Timestamped(NamedTuple):
+    value: Any
+    timestamp_ns: int
+    start_ns: int
+    end_ns: int
+
+class _SharedAdapter:
+    path: str
+    fd: int
+    refs: int
+    lock: RLock
+    address: int | None
+    force: bool | None
+    pec: int
+    tenbit: int
+    def __init__(self, path: str, fd: int) -> None: ...
+
 class SMBus:
     fd: int | None = ...
     funcs: I2cFunc = ...
@@ -103,7 +134,20 @@ class SMBus:
     retries: int = ...
     tenbit: int = ...
     timeout: int = ...
-    def __init__(self, bus: None | int | str = ..., force: bool = ...) -> None: ...
+    stats: dict[str, int] = ...
+    meter: BusMeter | None = ...
+    pool: BufferPool | None = ...
+    _shared: _SharedAdapter | None = ...
+    cache: CapabilityCache | None = ...
+    shared: bool = ...
+    def __init__(  # noqa: PLR0913
+        self,
+        bus: None | int | str = ...,
+        force: bool = ...,
+        cache: CapabilityCache | None = ...,
+        shared: bool = ...,
+        lazy: bool = ...,
+    ) -> None: ...
     def __enter__(self) -> SMBus: ...
     def __exit__(
         self,
@@ -117,6 +161,12 @@ class SMBus:
     def enable_tenbit(self, enable: bool = True) -> None: ...
     def set_timeout(self, timeout: int) -> None: ...
     def set_retries(self, retries: int) -> None: ...
+    def warmup(self) -> int: ...
+    def deadline(self, timeout_us: float) -> AbstractContextManager[None]: ...
+    def timestamps(self, clock: int = ...) -> AbstractContextManager[list[tuple[int, int]]]: ...
+    def timestamped(
+        self, method: str, *args: Any, clock: int = ..., **kwargs: Any
+    ) -> Timestamped: ...
     def write_quick(self, i2c_addr: int, force: bool | None = None) -> None: ...
     def read_byte(self, i2c_addr: int, force: bool | None = None) -> int: ...
     def write_byte(self, i2c_addr: int, value: int, force: bool | None = None) -> None: ...
@@ -156,6 +206,33 @@ class SMBus:
         data: Sequence[int],
         force: bool | None = None,
     ) -> None: ...
-    def i2c_rdwr(self, *i2c_msgs: i2c_msg) -> None: ...
+    def read_words(  # noqa: PLR0913
+        self,
+        i2c_addr: int,
+        register: int,
+        count: int,
+        byteorder: Literal["little", "big"] = "little",
+        signed: bool = False,
+        force: bool | None = None,
+    ) -> array[int]: ...
+    def read_many(
+        self, i2c_addrs: Iterable[int], register: int, length: int
+    ) -> dict[int, bytes | OSError]: ...
+    def read_i2c_block_data16(
+        self,
+        i2c_addr: int,
+        register: int,
+        length: int,
+        byteorder: Literal["little", "big"] = "big",
+    ) -> bytes: ...
+    def write_i2c_block_data16(
+        self,
+        i2c_addr: int,
+        register: int,
+        data: Sequence[int] | bytes,
+        byteorder: Literal["little", "big"] = "big",
+    ) -> None: ...
+    def i2c_rdwr(self, *i2c_msgs: i2c_msg, pec: bool = False) -> None: ...
     def i2c_rd(self, i2c_addr: int, length: int, flags: int = ...) -> i2c_msg: ...
-    def i2c_wr(self, i2c_addr: int, buf: Sequence[int], flags: int = ...) -> None: ...
+    def i2c_wr(self, i2c_addr: int, buf: Sequence[int], flags: int = ...) -> i2c_msg: ...
+    def _i2c_rdwr_single(self, msg: i2c_msg) -> None: ...
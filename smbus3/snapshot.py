@@ -0,0 +1,352 @@
+"""
+smbus3.snapshot - Publish sampled register values through shared memory.
+
+A single :py:class:`SnapshotPublisher` samples a fixed set of registers and
+writes them into a shared memory segment. Any number of
+:py:class:`SnapshotReader` instances, in any process, can then read the
+latest consistent snapshot without touching the bus.
+
+Consistency is guaranteed with a sequence lock: the publisher makes the
+sequence number odd while it updates the segment and even again once it is
+done. Readers copy the data and retry if the sequence number was odd or
+changed in the meantime.
+
+Segment layout (all little-endian):
+
+- header: ``magic:4s count:u16 pad:u16 seq:u64 timestamp_ns:i64``
+- ``count`` entries: ``addr:u16 register:u8 pad:u8 length:u16 offset:u16``
+- register data, at ``offset`` bytes from the start of the data area.
+"""
+
+import struct
+import threading
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+from struct import Struct
+
+from .smbus3 import I2C_SMBUS_BLOCK_MAX, i2c_msg
+
+SNAPSHOT_MAGIC = b"SMB3"
+
+_HEADER = Struct("<4sHxxQq")
+_SEQ = Struct("<Q")
+_SEQ_OFFSET = 8
+_TIMESTAMP = Struct("<q")
+_TIMESTAMP_OFFSET = 16
+_ENTRY = Struct("<HBxHH")
+# Largest register count, register length and data area, stored as u16
+_U16_MAX = 0xFFFF
+
+# Segments created by publishers of this process, which stay tracked for cleanup
+_published = set()
+
+Snapshot = namedtuple("Snapshot", ["seq", "timestamp_ns", "values"])
+"""
+A consistent copy of the published registers.
+
+:ivar seq: sequence number of the snapshot (even, grows by 2 per update)
+:ivar timestamp_ns: ``time.monotonic_ns()`` at which sampling completed
+:ivar values: dict mapping ``(i2c_addr, register)`` to the register bytes
+"""
+
+
+def read_register(bus, i2c_addr, register, length):
+    """
+    Read ``length`` bytes starting at ``register`` with a single transfer.
+
+    :param bus: bus to read from.
+    :type bus: SMBus
+    :param i2c_addr: i2c address
+    :type i2c_addr: int
+    :param register: Start register
+    :type register: int
+    :param length: Number of bytes to read
+    :type length: int
+    :return: Register contents
+    :rtype: bytes
+    """
+    if length == 1:
+        return bytes((bus.read_byte_data(i2c_addr, register),))
+    if length <= I2C_SMBUS_BLOCK_MAX:
+        return bytes(bus.read_i2c_block_data(i2c_addr, register, length))
+    read = i2c_msg.read(i2c_addr, length)
+    bus.i2c_rdwr(i2c_msg.write(i2c_addr, (register,)), read)
+    return bytes(read)
+
+
+def _attach(name):
+    """
+    Attach to an existing segment without letting this process unlink it at exit.
+    Private.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no 'track'
+        shm = shared_memory.SharedMemory(name=name)
+        if shm.name not in _published:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SnapshotPublisher:
+    """
+    Samples registers over an i2c bus and publishes them in shared memory.
+    """
+
+    def __init__(self, bus, registers, name=None, deadline_us=None):
+        """
+        Create the shared memory segment for the given registers.
+
+        :param bus: open bus used for sampling.
+        :type bus: SMBus
+        :param registers: ``(i2c_addr, register, length)`` triples to sample.
+        :type registers: list
+        :param name: name of the shared memory segment.
+            A unique name is generated if not given.
+        :type name: str
+        :param deadline_us: optional time budget for sampling all registers
+            once, in microseconds (see :py:meth:`smbus3.SMBus.deadline`).
+        :type deadline_us: float
+        :raise ValueError: if the registers do not fit in the segment layout:
+            more than 65535 registers or bytes of data in total, a register
+            length below 1, or an address or register out of range.
+        """
+        self.bus = bus
+        self.deadline_us = deadline_us
+        self.registers = [tuple(entry) for entry in registers]
+        # Checked before the segment is created, so that none is left behind
+        entries = self._entries()
+        data_size = sum(length for _, _, length in self.registers)
+        self._data_offset = _HEADER.size + _ENTRY.size * len(self.registers)
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=True, size=self._data_offset + max(data_size, 1)
+        )
+        _published.add(self.shm.name)
+        self._staging = bytearray(data_size)
+        self._seq = 0
+        self._thread = None
+        self._stop = threading.Event()
+        buf = self.shm.buf
+        _HEADER.pack_into(buf, 0, SNAPSHOT_MAGIC, len(self.registers), 0, 0)
+        buf[_HEADER.size : self._data_offset] = entries
+
+    def _entries(self):
+        """
+        Encode the register table of the segment.
+        Private.
+
+        :raise ValueError: if the registers do not fit in the table.
+        :rtype: bytes
+        """
+        if len(self.registers) > _U16_MAX:
+            raise ValueError(f"Cannot publish more than {_U16_MAX} registers")
+        entries = bytearray()
+        offset = 0
+        for i2c_addr, register, length in self.registers:
+            if not 1 <= length <= _U16_MAX - offset:
+                raise ValueError(
+                    f"Register 0x{register:02X} of 0x{i2c_addr:02X}: length {length} does not"
+                    f" fit in the {_U16_MAX} bytes of data"
+                )
+            try:
+                entries += _ENTRY.pack(i2c_addr, register, length, offset)
+            except struct.error as e:
+                raise ValueError(f"Invalid register {(i2c_addr, register)}: {e}") from e
+            offset += length
+        return bytes(entries)
+
+    def __enter__(self):
+        """Enter handler."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.close()
+
+    @property
+    def name(self):
+        """Name of the shared memory segment, to be passed to :py:class:`SnapshotReader`."""
+        return self.shm.name
+
+    def sample(self):
+        """
+        Read all configured registers into the staging buffer.
+
+        :rtype: None
+        """
+        offset = 0
+        for i2c_addr, register, length in self.registers:
+            self._staging[offset : offset + length] = read_register(
+                self.bus, i2c_addr, register, length
+            )
+            offset += length
+
+    def publish(self):
+        """
+        Sample all registers and publish them as a new snapshot.
+
+        The bus is only accessed before the segment is locked, so readers
+        are never held up by bus latency. If sampling runs out of
+        :py:attr:`deadline_us`, nothing is published and the previous
+        snapshot stays current.
+
+        :raise TimeoutError: if sampling exceeded the deadline.
+        :return: Sequence number of the new snapshot
+        :rtype: int
+        """
+        if self.deadline_us is None:
+            self.sample()
+        else:
+            with self.bus.deadline(self.deadline_us):
+                self.sample()
+        buf = self.shm.buf
+        _SEQ.pack_into(buf, _SEQ_OFFSET, self._seq + 1)
+        buf[self._data_offset : self._data_offset + len(self._staging)] = self._staging
+        _TIMESTAMP.pack_into(buf, _TIMESTAMP_OFFSET, time.monotonic_ns())
+        self._seq += 2
+        _SEQ.pack_into(buf, _SEQ_OFFSET, self._seq)
+        return self._seq
+
+    def run(self, interval):
+        """
+        Publish every ``interval`` seconds until :py:meth:`stop` is called.
+        Cycles which exceed :py:attr:`deadline_us` are skipped.
+
+        :param interval: sampling period in seconds.
+        :type interval: float
+        :rtype: None
+        """
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.publish()
+            except TimeoutError:
+                pass
+            deadline += interval
+            self._stop.wait(max(0.0, deadline - time.monotonic()))
+
+    def start(self, interval):
+        """
+        Publish from a background daemon thread. See :py:meth:`run`.
+
+        :param interval: sampling period in seconds.
+        :type interval: float
+        :rtype: None
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(interval,), name="smbus3-snapshot")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread started with :py:meth:`start`.
+
+        :rtype: None
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """
+        Stop publishing and remove the shared memory segment.
+
+        :rtype: None
+        """
+        self.stop()
+        _published.discard(self.shm.name)
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SnapshotReader:
+    """
+    Reads consistent snapshots published by a :py:class:`SnapshotPublisher`.
+
+    :ivar timeout: seconds to wait for a snapshot being written, after
+        which the publisher is presumed to have died mid-update.
+    """
+
+    def __init__(self, name):
+        """
+        Attach to a published segment.
+
+        :param name: name of the shared memory segment.
+        :type name: str
+        :raise ValueError: if the segment was not created by a publisher.
+        """
+        self.shm = _attach(name)
+        magic, count, _, _ = _HEADER.unpack_from(self.shm.buf, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.shm.close()
+            raise ValueError(f"{name} is not a smbus3 snapshot segment")
+        self.registers = []
+        self._slices = []
+        data_offset = _HEADER.size + _ENTRY.size * count
+        for idx in range(count):
+            i2c_addr, register, length, offset = _ENTRY.unpack_from(
+                self.shm.buf, _HEADER.size + idx * _ENTRY.size
+            )
+            self.registers.append((i2c_addr, register, length))
+            self._slices.append(((i2c_addr, register), offset, offset + length))
+        self._data = slice(data_offset, data_offset + sum(r[2] for r in self.registers))
+        self.timeout = 1.0
+
+    def __enter__(self):
+        """Enter handler."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit handler."""
+        self.close()
+
+    @property
+    def seq(self):
+        """Sequence number of the latest snapshot (0 if nothing was published yet)."""
+        return _SEQ.unpack_from(self.shm.buf, _SEQ_OFFSET)[0]
+
+    def read_raw(self):
+        """
+        Copy the data area of the latest consistent snapshot.
+
+        :raise TimeoutError: if no consistent snapshot could be read within
+            :py:attr:`timeout` seconds.
+        :return: ``(seq, timestamp_ns, data)``
+        :rtype: tuple
+        """
+        buf = self.shm.buf
+        deadline = None
+        while True:
+            seq = _SEQ.unpack_from(buf, _SEQ_OFFSET)[0]
+            if not seq & 1:
+                data = bytes(buf[self._data])
+                timestamp = _TIMESTAMP.unpack_from(buf, _TIMESTAMP_OFFSET)[0]
+                if _SEQ.unpack_from(buf, _SEQ_OFFSET)[0] == seq:
+                    return seq, timestamp, data
+            # Retrying: a snapshot is being written
+            if deadline is None:
+                deadline = time.monotonic() + self.timeout
+            elif time.monotonic() > deadline:
+                raise TimeoutError(f"No consistent snapshot in {self.timeout}s, seq={seq}")
+            time.sleep(0)
+
+    def read(self):
+        """
+        Return the latest consistent snapshot.
+
+        :rtype: Snapshot
+        """
+        seq, timestamp, data = self.read_raw()
+        values = {key: data[start:end] for key, start, end in self._slices}
+        return Snapshot(seq, timestamp, values)
+
+    def close(self):
+        """
+        Detach from the segment.
+
+        :rtype: None
+        """
+        self.shm.close()
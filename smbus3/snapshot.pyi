@@ -0,0 +1,63 @@
+from collections.abc import Iterable
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+from typing import NamedTuple
+
+from .smbus3 import SMBus
+
+SNAPSHOT_MAGIC: bytes
+_published: set[str]
+
+class Snapshot(NamedTuple):
+    seq: int
+    timestamp_ns: int
+    values: dict[tuple[int, int], bytes]
+
+def read_register(bus: SMBus, i2c_addr: int, register: int, length: int) -> bytes: ...
+def _attach(name: str) -> SharedMemory: ...
+
+class SnapshotPublisher:
+    bus: SMBus
+    registers: list[tuple[int, int, int]]
+    shm: SharedMemory
+    deadline_us: float | None
+    def __init__(
+        self,
+        bus: SMBus,
+        registers: Iterable[tuple[int, int, int]],
+        name: str | None = None,
+        deadline_us: float | None = None,
+    ) -> None: ...
+    def __enter__(self) -> SnapshotPublisher: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    @property
+    def name(self) -> str: ...
+    def sample(self) -> None: ...
+    def publish(self) -> int: ...
+    def run(self, interval: float) -> None: ...
+    def start(self, interval: float) -> None: ...
+    def stop(self) -> None: ...
+    def close(self) -> None: ...
+
+class SnapshotReader:
+    shm: SharedMemory
+    registers: list[tuple[int, int, int]]
+    timeout: float
+    def __init__(self, name: str) -> None: ...
+    def __enter__(self) -> SnapshotReader: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    @property
+    def seq(self) -> int: ...
+    def read_raw(self) -> tuple[int, int, bytes]: ...
+    def read(self) -> Snapshot: ...
+    def close(self) -> None: ...
@@ -0,0 +1,284 @@
+"""
+smbus3.stream - Processing stages for sampled register frames.
+
+Stages consume :py:class:`smbus3.sampling.Sample` objects (or anything with
+``seq``, ``timestamp_ns`` and ``frame`` attributes) and emit compact records
+for downstream consumers. They can be chained over a
+:py:class:`~smbus3.sampling.Sampler` with their ``process()`` generators.
+
+:py:class:`Aggregator` uses NumPy when it is installed, and the standard
+library otherwise.
+"""
+
+import math
+from array import array
+from collections import namedtuple
+from operator import mul
+from struct import Struct
+
+from .sampling import frame_layout
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+Change = namedtuple("Change", ["seq", "timestamp_ns", "values"])
+"""
+Registers which changed in one sample.
+
+:ivar seq: sequence number of the sample
+:ivar timestamp_ns: timestamp of the sample
+:ivar values: dict mapping ``(i2c_addr, register)`` to the new register bytes
+"""
+
+Statistics = namedtuple("Statistics", ["min", "max", "mean", "rms"])
+"""Statistics of one register over an aggregation window."""
+
+Aggregate = namedtuple("Aggregate", ["seq", "start_ns", "end_ns", "samples", "fields"])
+"""
+Statistics of the samples of one aggregation window.
+
+:ivar seq: sequence number of the first sample of the window
+:ivar start_ns: timestamp of the first sample of the window
+:ivar end_ns: timestamp of the last sample of the window
+:ivar samples: number of samples in the window
+:ivar fields: dict mapping ``(i2c_addr, register)`` to :py:class:`Statistics`
+"""
+
+# Unsigned struct and array type codes of numeric registers, by length
+_TYPECODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+
+class ChangeDetector:
+    """
+    Emits only the registers whose value changed since they were last
+    emitted.
+
+    The last emitted frame is kept in a single buffer: unchanged frames are
+    detected with one bytewise comparison, and only frames that differ are
+    compared register by register.
+    """
+
+    def __init__(self, registers, deadbands=None, byteorder="little", signed=False):
+        """
+        Configure the detector.
+
+        :param registers: ``(i2c_addr, register, length)`` triples making up
+            the frames, as passed to the sampler.
+        :type registers: list
+        :param deadbands: optional ``{(i2c_addr, register): deadband}`` for
+            numeric registers: a change is only emitted once the decoded
+            value moved by more than ``deadband`` from the last emitted one.
+        :type deadbands: dict
+        :param byteorder: byte order of numeric registers, ``"little"`` or ``"big"``.
+        :type byteorder: str
+        :param signed: decode numeric registers as two's complement.
+        :type signed: bool
+        """
+        self.layout = frame_layout(registers)
+        self.deadbands = dict(deadbands or {})
+        self.byteorder = byteorder
+        self.signed = signed
+        self._previous = None
+
+    def reset(self):
+        """
+        Forget the last emitted values, so the next frame is emitted whole.
+
+        :rtype: None
+        """
+        self._previous = None
+
+    def _moved(self, key, new, old):
+        """
+        Whether a register changed enough to be emitted.
+        Private.
+        """
+        deadband = self.deadbands.get(key)
+        if deadband is None:
+            return True
+        byteorder, signed = self.byteorder, self.signed
+        new_value = int.from_bytes(new, byteorder, signed=signed)
+        old_value = int.from_bytes(old, byteorder, signed=signed)
+        return abs(new_value - old_value) > deadband
+
+    def update(self, frame):
+        """
+        Compare a frame with the last emitted values.
+
+        :param frame: register contents, see :py:class:`smbus3.sampling.Sample`.
+        :type frame: bytes
+        :return: ``{(i2c_addr, register): bytes}`` of the changed registers,
+            every register for the first frame
+        :rtype: dict
+        """
+        previous = self._previous
+        if previous is None:
+            self._previous = bytearray(frame)
+            return {key: frame[start:end] for key, start, end in self.layout}
+        if previous == frame:
+            return {}
+        changes = {}
+        new_view = memoryview(frame)
+        old_view = memoryview(previous)
+        for key, start, end in self.layout:
+            new = new_view[start:end]
+            old = old_view[start:end]
+            if new != old and self._moved(key, new, old):
+                changes[key] = bytes(new)
+                previous[start:end] = new
+        return changes
+
+    def process(self, samples):
+        """
+        Turn a stream of samples into a stream of changes. Samples without
+        changes produce nothing.
+
+        :param samples: samples, e.g. a :py:class:`~smbus3.sampling.Sampler`.
+        :type samples: Iterable[Sample]
+        :rtype: Iterator[Change]
+        """
+        for sample in samples:
+            changes = self.update(sample.frame)
+            if changes:
+                yield Change(sample.seq, sample.timestamp_ns, changes)
+
+
+class Aggregator:
+    """
+    Reduces windows of consecutive samples to the min, max, mean and RMS of
+    each numeric register (registers of 1, 2, 4 or 8 bytes).
+
+    Every frame is decoded with one precompiled ``struct`` call into
+    per-register ``array`` buffers, so memory use stays at one machine word
+    per value and statistics are computed in bulk when the window closes.
+    """
+
+    def __init__(self, registers, window, byteorder="little", signed=False, fields=None):  # noqa: PLR0913
+        """
+        Configure the aggregator.
+
+        :param registers: ``(i2c_addr, register, length)`` triples making up
+            the frames, as passed to the sampler.
+        :type registers: list
+        :param window: number of samples per aggregate (the decimation factor).
+        :type window: int
+        :param byteorder: byte order of the registers, ``"little"`` or ``"big"``.
+        :type byteorder: str
+        :param signed: decode registers as two's complement.
+        :type signed: bool
+        :param fields: ``(i2c_addr, register)`` keys to aggregate, repeated
+            keys being aggregated once. Defaults to every numeric register.
+        :type fields: list
+        :raise ValueError: if window is not positive, for an unknown
+            byteorder or a field which is not a numeric register, or if
+            there is no field to aggregate.
+        """
+        if window < 1:
+            raise ValueError(f"Unexpected window={window}")
+        if byteorder not in ("little", "big"):
+            raise ValueError(f"Unexpected byteorder={byteorder!r}")
+        layout = {key: (start, end) for key, start, end in frame_layout(registers)}
+        if fields is None:
+            fields = [key for key, (start, end) in layout.items() if end - start in _TYPECODES]
+        keys = sorted(dict.fromkeys(fields), key=lambda key: layout.get(key, (-1,))[0])
+        if not keys:
+            raise ValueError("No numeric register to aggregate")
+        fmt = "<" if byteorder == "little" else ">"
+        position = 0
+        typecodes = []
+        for key in keys:
+            start, end = layout.get(key, (0, 0))
+            if end - start not in _TYPECODES:
+                raise ValueError(f"Register {key} is not numeric")
+            typecode = _TYPECODES[end - start]
+            typecode = typecode.lower() if signed else typecode
+            fmt += f"{start - position}x{typecode}"
+            typecodes.append(typecode)
+            position = end
+        self.keys = keys
+        self.window = window
+        self._struct = Struct(fmt)
+        self._buffers = [array(typecode) for typecode in typecodes]
+        self._first = None
+        self._last_ns = None
+
+    def __len__(self):
+        return len(self._buffers[0])
+
+    def update(self, sample):
+        """
+        Add a sample to the current window.
+
+        :param sample: sample to aggregate.
+        :type sample: Sample
+        :return: The aggregate, if this sample completed a window
+        :rtype: Aggregate or None
+        """
+        if self._first is None:
+            self._first = sample
+        self._last_ns = sample.timestamp_ns
+        for buffer, value in zip(self._buffers, self._struct.unpack_from(sample.frame)):  # noqa: B905
+            buffer.append(value)
+        if len(self) >= self.window:
+            return self.flush()
+        return None
+
+    def flush(self):
+        """
+        Close the current window, even if it is not full.
+
+        :return: The aggregate, or None if the window is empty
+        :rtype: Aggregate or None
+        """
+        first = self._first
+        if first is None:
+            return None
+        count = len(self)
+        fields = {}
+        for key, buffer in zip(self.keys, self._buffers):  # noqa: B905
+            fields[key] = _statistics(buffer)
+            del buffer[:]
+        self._first = None
+        return Aggregate(first.seq, first.timestamp_ns, self._last_ns, count, fields)
+
+    def process(self, samples):
+        """
+        Turn a stream of samples into a stream of aggregates. A partial last
+        window is emitted when the samples run out.
+
+        :param samples: samples, e.g. a :py:class:`~smbus3.sampling.Sampler`.
+        :type samples: Iterable[Sample]
+        :rtype: Iterator[Aggregate]
+        """
+        for sample in samples:
+            aggregate = self.update(sample)
+            if aggregate is not None:
+                yield aggregate
+        aggregate = self.flush()
+        if aggregate is not None:
+            yield aggregate
+
+
+def _statistics(buffer):
+    """
+    Statistics of a non-empty ``array`` of values.
+    Private.
+    """
+    count = len(buffer)
+    if numpy is not None:
+        values = numpy.frombuffer(buffer, dtype=buffer.typecode)
+        squares = numpy.square(values, dtype=numpy.float64)
+        return Statistics(
+            int(values.min()),
+            int(values.max()),
+            float(values.mean(dtype=numpy.float64)),
+            math.sqrt(float(squares.mean())),
+        )
+    return Statistics(
+        min(buffer),
+        max(buffer),
+        sum(buffer) / count,
+        math.sqrt(sum(map(mul, buffer, buffer)) / count),
+    )
@@ -0,0 +1,57 @@
+from collections.abc import Iterable, Iterator
+from types import ModuleType
+from typing import Literal, NamedTuple
+
+from .sampling import Sample
+
+numpy: ModuleType | None
+
+class Change(NamedTuple):
+    seq: int
+    timestamp_ns: int
+    values: dict[tuple[int, int], bytes]
+
+class ChangeDetector:
+    layout: list[tuple[tuple[int, int], int, int]]
+    deadbands: dict[tuple[int, int], float]
+    byteorder: Literal["little", "big"]
+    signed: bool
+    def __init__(
+        self,
+        registers: Iterable[tuple[int, int, int]],
+        deadbands: dict[tuple[int, int], float] | None = None,
+        byteorder: Literal["little", "big"] = "little",
+        signed: bool = False,
+    ) -> None: ...
+    def reset(self) -> None: ...
+    def update(self, frame: bytes) -> dict[tuple[int, int], bytes]: ...
+    def process(self, samples: Iterable[Sample]) -> Iterator[Change]: ...
+
+class Statistics(NamedTuple):
+    min: int
+    max: int
+    mean: float
+    rms: float
+
+class Aggregate(NamedTuple):
+    seq: int
+    start_ns: int
+    end_ns: int
+    samples: int
+    fields: dict[tuple[int, int], Statistics]
+
+class Aggregator:
+    keys: list[tuple[int, int]]
+    window: int
+    def __init__(  # noqa: PLR0913
+        self,
+        registers: Iterable[tuple[int, int, int]],
+        window: int,
+        byteorder: Literal["little", "big"] = "little",
+        signed: bool = False,
+        fields: Iterable[tuple[int, int]] | None = None,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def update(self, sample: Sample) -> Aggregate | None: ...
+    def flush(self) -> Aggregate | None: ...
+    def process(self, samples: Iterable[Sample]) -> Iterator[Aggregate]: ...
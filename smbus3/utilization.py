@@ -0,0 +1,269 @@
+"""
+smbus3.utilization - Bus time cost model and utilization accounting.
+
+The wire time of a transfer is estimated from its protocol shape: a start
+condition, the address phase, command and data bytes (each 8 bits plus an
+ACK), a repeated start and second address phase where the direction turns
+around, the PEC byte and the final stop condition. Start, repeated start and
+stop conditions are counted as one bit time each.
+
+A :py:class:`BusMeter` attached to an :py:class:`~smbus3.SMBus` accumulates
+the estimated wire time and the measured ioctl latency of every transfer per
+device, and reports them as a percentage of elapsed time.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+
+from .smbus3 import (
+    I2C_M_TEN,
+    I2C_SMBUS,
+    I2C_SMBUS_BLOCK_DATA,
+    I2C_SMBUS_BLOCK_PROC_CALL,
+    I2C_SMBUS_BYTE,
+    I2C_SMBUS_BYTE_DATA,
+    I2C_SMBUS_I2C_BLOCK_DATA,
+    I2C_SMBUS_PROC_CALL,
+    I2C_SMBUS_QUICK,
+    I2C_SMBUS_READ,
+    I2C_SMBUS_WORD_DATA,
+)
+
+# Standard mode, the clock assumed when the adapter does not report one
+DEFAULT_CLOCK_HZ = 100000
+
+# A byte followed by its ACK/NACK bit
+_BYTE_BITS = 9
+# Start, repeated start or stop condition
+_CONDITION_BITS = 1
+
+# Bytes of each SMBus transfer, address phases excluded, as
+# (fixed bytes, bytes per block data byte)
+_SMBUS_PAYLOAD = {
+    I2C_SMBUS_BYTE: (1, 0),
+    I2C_SMBUS_BYTE_DATA: (2, 0),
+    I2C_SMBUS_WORD_DATA: (3, 0),
+    I2C_SMBUS_PROC_CALL: (5, 0),
+    I2C_SMBUS_BLOCK_DATA: (2, 1),
+    I2C_SMBUS_I2C_BLOCK_DATA: (1, 1),
+    I2C_SMBUS_BLOCK_PROC_CALL: (3, 2),
+}
+# Transfers writing, then reading after a repeated start, in both directions
+_SMBUS_CALLS = (I2C_SMBUS_PROC_CALL, I2C_SMBUS_BLOCK_PROC_CALL)
+
+Usage = namedtuple("Usage", ["transfers", "wire_ns", "latency_ns", "utilization"])
+"""
+Bus usage accumulated by a :py:class:`BusMeter`.
+
+:ivar transfers: number of transfers.
+:ivar wire_ns: estimated time spent on the wire.
+:ivar latency_ns: measured time spent in the transfer ioctls.
+:ivar utilization: wire time in percent of the time elapsed since the meter
+    was reset.
+"""
+
+
+def smbus_bits(size, read_write, length=0, pec=False, tenbit=False):
+    """
+    Bit times taken by an SMBus transfer.
+
+    :param size: transfer type, e.g. ``I2C_SMBUS_BYTE_DATA``.
+    :type size: int
+    :param read_write: ``I2C_SMBUS_READ`` or ``I2C_SMBUS_WRITE``.
+    :type read_write: int
+    :param length: number of data bytes of block transfers.
+    :type length: int
+    :param pec: the transfer ends with a PEC byte.
+    :type pec: bool
+    :param tenbit: the device has a 10 bit address.
+    :type tenbit: bool
+    :raise ValueError: on an unknown transfer type.
+    :rtype: int
+    """
+    address = _BYTE_BITS * (2 if tenbit else 1)
+    if size == I2C_SMBUS_QUICK:
+        return _CONDITION_BITS + address + _CONDITION_BITS
+    try:
+        fixed, per_byte = _SMBUS_PAYLOAD[size]
+    except KeyError:
+        raise ValueError(f"Unexpected size={size}") from None
+    bits = _CONDITION_BITS + address + (fixed + per_byte * length + bool(pec)) * _BYTE_BITS
+    if size in _SMBUS_CALLS or (read_write == I2C_SMBUS_READ and size != I2C_SMBUS_BYTE):
+        # Repeated start and the address byte with the read bit
+        bits += _CONDITION_BITS + _BYTE_BITS
+    return bits + _CONDITION_BITS
+
+
+def msg_bits(msg):
+    """
+    Bit times taken by one message of a combined transaction: its start (or
+    repeated start) condition, address phase and data, without the stop.
+
+    :param msg: message.
+    :type msg: i2c_msg
+    :rtype: int
+    """
+    address = _BYTE_BITS * (2 if msg.flags & I2C_M_TEN else 1)
+    return _CONDITION_BITS + address + msg.len * _BYTE_BITS
+
+
+def bus_clock_hz(filepath, sysfs="/sys", default=DEFAULT_CLOCK_HZ):
+    """
+    SCL frequency of an adapter, from its device tree ``clock-frequency``.
+
+    :param filepath: device node path, e.g. ``/dev/i2c-1``.
+    :type filepath: str
+    :param sysfs: sysfs mount point.
+    :type sysfs: str
+    :param default: frequency returned when the adapter does not report one.
+    :type default: int
+    :rtype: int
+    """
+    if filepath is None:
+        return default
+    node = os.path.basename(os.path.realpath(filepath))
+    path = os.path.join(sysfs, "bus", "i2c", "devices", node, "of_node", "clock-frequency")
+    try:
+        with open(path, "rb") as f:
+            value = f.read()
+    except OSError:
+        return default
+    frequency = int.from_bytes(value[:4], "big")
+    return frequency or default
+
+
+class BusMeter:
+    """
+    Accumulates the bus time used by each device of one adapter.
+
+    Attach the meter to every :py:class:`~smbus3.SMBus` instance opened on
+    the adapter to account for all of its traffic.
+    """
+
+    def __init__(self, clock_hz=None, sysfs="/sys"):
+        """
+        Create the meter.
+
+        :param clock_hz: SCL frequency. By default it is read from sysfs when
+            the first transfer is recorded, see :py:func:`bus_clock_hz`.
+        :type clock_hz: int
+        :param sysfs: sysfs mount point.
+        :type sysfs: str
+        """
+        self.clock_hz = clock_hz
+        self.sysfs = sysfs
+        self._lock = threading.Lock()
+        self._devices = {}
+        self._since_ns = time.monotonic_ns()
+
+    def attach(self, bus):
+        """
+        Record the transfers of ``bus``.
+
+        :param bus: bus to meter.
+        :type bus: SMBus
+        :rtype: None
+        """
+        bus.meter = self
+
+    def detach(self, bus):
+        """
+        Stop recording the transfers of ``bus``.
+
+        :param bus: metered bus.
+        :type bus: SMBus
+        :rtype: None
+        """
+        if bus.meter is self:
+            bus.meter = None
+
+    def reset(self):
+        """
+        Clear the accumulated usage and restart the measurement window.
+
+        :rtype: None
+        """
+        with self._lock:
+            self._devices = {}
+            self._since_ns = time.monotonic_ns()
+
+    def record(self, bus, request, arg, elapsed_ns):
+        """
+        Account for a completed transfer. Called by :py:class:`~smbus3.SMBus`.
+
+        :param bus: bus the transfer was made on.
+        :type bus: SMBus
+        :param request: ioctl request, ``I2C_SMBUS`` or ``I2C_RDWR``.
+        :type request: int
+        :param arg: ioctl argument structure.
+        :param elapsed_ns: measured duration of the ioctl.
+        :type elapsed_ns: int
+        :rtype: None
+        """
+        if request != I2C_SMBUS and not arg.nmsgs:
+            # Nothing went on the wire
+            return
+        if self.clock_hz is None:
+            self.clock_hz = bus_clock_hz(bus._filepath, self.sysfs)
+        if request == I2C_SMBUS:
+            length = arg.data.contents.block[0]
+            bits = smbus_bits(arg.size, arg.read_write, length, bus._pec, bus._tenbit)
+            costs = [(bus.address, bits)]
+        else:
+            # One transfer per device taking part, the stop going to the last
+            costs = {}
+            for idx in range(arg.nmsgs):
+                msg = arg.msgs[idx]
+                costs[msg.addr] = costs.get(msg.addr, 0) + msg_bits(msg)
+            costs[msg.addr] += _CONDITION_BITS
+            costs = costs.items()
+        total = sum(bits for _, bits in costs)
+        with self._lock:
+            for address, bits in costs:
+                usage = self._devices.setdefault(address, [0, 0, 0])
+                usage[0] += 1
+                usage[1] += bits
+                usage[2] += elapsed_ns * bits // total
+
+    def _usage(self, transfers, bits, latency_ns, window_ns):
+        """
+        Convert accumulated counters to a :py:class:`Usage`.
+        Private.
+        """
+        wire_ns = bits * 10**9 // (self.clock_hz or DEFAULT_CLOCK_HZ)
+        return Usage(transfers, wire_ns, latency_ns, 100 * wire_ns / window_ns)
+
+    def devices(self):
+        """
+        Usage of each device since the meter was created or reset.
+
+        :return: ``{address: Usage}``
+        :rtype: dict
+        """
+        with self._lock:
+            window_ns = max(time.monotonic_ns() - self._since_ns, 1)
+            return {
+                address: self._usage(*usage, window_ns)
+                for address, usage in sorted(self._devices.items())
+            }
+
+    def adapter(self):
+        """
+        Usage of the whole adapter since the meter was created or reset.
+
+        :rtype: Usage
+        """
+        with self._lock:
+            window_ns = max(time.monotonic_ns() - self._since_ns, 1)
+            totals = [sum(column) for column in zip(*self._devices.values())]  # noqa: B905
+            return self._usage(*(totals or (0, 0, 0)), window_ns)
+
+    def headroom(self):
+        """
+        Percentage of bus time still available.
+
+        :rtype: float
+        """
+        return max(0.0, 100.0 - self.adapter().utilization)
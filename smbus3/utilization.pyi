@@ -0,0 +1,29 @@
+from typing import Any, NamedTuple
+
+from .smbus3 import SMBus, i2c_msg
+
+DEFAULT_CLOCK_HZ: int
+
+class Usage(NamedTuple):
+    transfers: int
+    wire_ns: int
+    latency_ns: int
+    utilization: float
+
+def smbus_bits(
+    size: int, read_write: int, length: int = 0, pec: bool = False, tenbit: bool = False
+) -> int: ...
+def msg_bits(msg: i2c_msg) -> int: ...
+def bus_clock_hz(filepath: str | None, sysfs: str = "/sys", default: int = ...) -> int: ...
+
+class BusMeter:
+    clock_hz: int | None
+    sysfs: str
+    def __init__(self, clock_hz: int | None = None, sysfs: str = "/sys") -> None: ...
+    def attach(self, bus: SMBus) -> None: ...
+    def detach(self, bus: SMBus) -> None: ...
+    def reset(self) -> None: ...
+    def record(self, bus: SMBus, request: int, arg: Any, elapsed_ns: int) -> None: ...
+    def devices(self) -> dict[int, Usage]: ...
+    def adapter(self) -> Usage: ...
+    def headroom(self) -> float: ...
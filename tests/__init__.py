@@ -9,11 +9,53 @@ import unittest
 
 import smbus3
 
+from .test_acquisition import TestAcquisitionPool, TestAfterFork, TestSampleRing
+from .test_adapters import TestAdapterRegistry
+from .test_broker import TestBusBroker
+from .test_buffers import TestBufferPool
+from .test_capabilities import TestCapabilityCache
 from .test_datatypes import TestDataTypes
+from .test_dump import TestDump
+from .test_mux import TestMux
+from .test_pec import TestI2CRDWRPEC, TestPEC
+from .test_realtime import TestRealtime
+from .test_scheduler import TestScheduler
+from .test_script import TestScript
+from .test_simulator import TestSimulator
 from .test_smbus3 import TestI2CMsg, TestI2CMsgRDWR, TestSMBus, TestSMBusWrapper
+from .test_snapshot import TestSnapshot
+from .test_stream import TestAggregator, TestChangeDetector, TestSampler, TestSamplerTimestamps
+from .test_utilization import TestUtilization
 
 __version__ = "0.5.5"
-__all__ = ["TestDataTypes", "TestI2CMsg", "TestI2CMsgRDWR", "TestSMBus", "TestSMBusWrapper"]
+__all__ = [
+    "TestAcquisitionPool",
+    "TestAdapterRegistry",
+    "TestAfterFork",
+    "TestAggregator",
+    "TestBufferPool",
+    "TestBusBroker",
+    "TestCapabilityCache",
+    "TestChangeDetector",
+    "TestDataTypes",
+    "TestDump",
+    "TestI2CMsg",
+    "TestI2CMsgRDWR",
+    "TestI2CRDWRPEC",
+    "TestMux",
+    "TestPEC",
+    "TestRealtime",
+    "TestSMBus",
+    "TestSMBusWrapper",
+    "TestSampleRing",
+    "TestSampler",
+    "TestSamplerTimestamps",
+    "TestScheduler",
+    "TestScript",
+    "TestSimulator",
+    "TestSnapshot",
+    "TestUtilization",
+]
 
 
 class TestSMBusVersion(unittest.TestCase):
@@ -0,0 +1,211 @@
+"""
+tests/test_acquisition.py
+-------------------------
+
+Tests for multi-process acquisition into shared memory rings.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import smbus3.smbus3
+from smbus3 import SMBus
+from smbus3.acquisition import AcquisitionPool, SampleRing
+from smbus3.realtime import RealtimeOptions
+from smbus3.simulator import RegisterDevice, SimulatedAdapter, simulate
+
+from .test_smbus3 import MOCK_FD, SMBusTestCase
+
+# Samples to receive from each task
+MIN_SAMPLES = 5
+
+
+def fake_ioctl(fd, request, arg):
+    """Adapter answering block reads with the register numbers."""
+    if request == smbus3.smbus3.I2C_FUNCS:
+        arg.value = smbus3.smbus3.I2cFunc.SMBUS_READ_I2C_BLOCK
+    elif request == smbus3.smbus3.I2C_SMBUS:
+        block = arg.data.contents.block
+        for idx in range(1, block[0] + 1):
+            block[idx] = arg.command + idx - 1
+
+
+class TestSampleRing(unittest.TestCase):
+    def test_push_and_batch(self):
+        with SampleRing(3, slots=4) as ring:
+            self.assertEqual(ring.frame_size, 3)
+            self.assertTrue(ring.push(1, 100, b"abc"))
+            self.assertTrue(ring.push(2, 200, b"def"))
+            self.assertEqual(len(ring), 2)
+            with ring.batch(max_samples=1) as samples:
+                self.assertEqual([(s.seq, s.timestamp_ns) for s in samples], [(1, 100)])
+                self.assertEqual(bytes(samples[0].frame), b"abc")
+            frame = samples[0].frame
+            with self.assertRaises(ValueError):
+                bytes(frame)  # released with the batch
+            self.assertEqual(len(ring), 1)
+            # Wrap around, then overflow
+            for seq in range(3, 7):
+                ring.push(seq, seq * 100, bytes((seq,)) * 3)
+            self.assertEqual(ring.dropped, 1)
+            with ring.batch() as samples:
+                self.assertEqual([s.seq for s in samples], [2, 3, 4, 5])
+                self.assertEqual(bytes(samples[-1].frame), b"\x05\x05\x05")
+            with ring.batch() as samples:
+                self.assertEqual(samples, [])
+
+    def test_attach(self):
+        with SampleRing(2, slots=2) as ring:
+            ring.count("errors")
+            with SampleRing(name=ring.name) as other:
+                self.assertEqual((other.frame_size, other.slots), (2, 2))
+                other.push(1, 10, b"xy")
+                other.count("skipped")
+            self.assertEqual((ring.skipped, ring.errors), (1, 1))
+            with ring.batch() as samples:
+                self.assertEqual(bytes(samples[0].frame), b"xy")
+            with self.assertRaises(ValueError):
+                ring.count("dropped")
+        with self.assertRaises(ValueError):
+            SampleRing(2, slots=0)
+
+
+class TestAfterFork(SMBusTestCase):
+    def test_reset_after_fork(self):
+        bus = SMBus(1)
+        bus.read_byte_data(0x48, 0)
+        self.assertIn(bus, smbus3.smbus3._instances)
+        lock = bus._lock
+        bus._reset_after_fork()
+        self.assertIsNot(bus._lock, lock)
+        self.assertIsNone(bus.fd)
+        self.assertEqual(bus.address, 0x48)
+        # Reopened on first use
+        bus.read_byte_data(0x48, 0)
+        self.assertEqual(bus.fd, MOCK_FD)
+        bus.close()
+
+    def test_reset_shared_after_fork(self):
+        bus = SMBus(1, shared=True)
+        bus.read_byte_data(0x48, 0)
+        with mock.patch("smbus3.smbus3.os.close") as close:
+            smbus3.smbus3._after_fork()
+        close.assert_any_call(MOCK_FD)
+        self.assertEqual(smbus3.smbus3._shared_adapters, {})
+        self.assertIsNone(bus._shared)
+        self.assertIsNone(bus.fd)
+        bus.read_byte_data(0x48, 0)
+        self.assertIsNotNone(bus._shared)
+        bus.close()
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+class TestForkedBus(unittest.TestCase):
+    def test_settings_kept(self):
+        adapter = SimulatedAdapter([RegisterDevice(0x48)])
+        with simulate({1: adapter}), SMBus(1) as bus:
+            bus.pec = 1
+            bus.timeout = 5
+            bus.retries = 2
+            bus.read_byte_data(0x48, 0)
+            pid = os.fork()
+            if pid == 0:
+                # Child: record the ioctls of the reopened descriptor
+                calls = []
+                simulated = smbus3.smbus3.ioctl
+
+                def ioctl(fd, request, arg=0):
+                    calls.append((request, arg))
+                    return simulated(fd, request, arg)
+
+                status = 1
+                try:
+                    smbus3.smbus3.ioctl = ioctl
+                    bus.read_byte_data(0x48, 0)
+                    expected = [
+                        (smbus3.smbus3.I2C_PEC, 1),
+                        (smbus3.smbus3.I2C_SLAVE, 0x48),
+                        (smbus3.smbus3.I2C_TIMEOUT, 5),
+                        (smbus3.smbus3.I2C_RETRIES, 2),
+                    ]
+                    if bus.pec == 1 and calls[: len(expected)] == expected:
+                        status = 0
+                finally:
+                    os._exit(status)
+            _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+class TestAcquisitionPool(unittest.TestCase):
+    def setUp(self):
+        # Regular files stand in for the adapters' device nodes
+        self.adapters = [tempfile.NamedTemporaryFile() for _ in range(2)]
+        self.ioctl = mock.patch("smbus3.smbus3.ioctl", fake_ioctl)
+        self.ioctl.start()
+
+    def tearDown(self):
+        self.ioctl.stop()
+        for adapter in self.adapters:
+            adapter.close()
+
+    def test_rejects_open_bus(self):
+        bus = SMBus(self.adapters[0].name)
+        with self.assertRaises(TypeError):
+            AcquisitionPool([(bus, [(0x48, 0, 2)])], 0.01)
+        bus.close()
+
+    def test_acquire(self):
+        # An open bus in the parent is not used by the forked worker
+        parent = SMBus(self.adapters[0].name)
+        parent.read_i2c_block_data(0x48, 0x10, 2)
+        tasks = [
+            (self.adapters[0].name, [(0x48, 0x10, 2), (0x49, 0x20, 3)]),
+            (self.adapters[1].name, [(0x50, 0x00, 4)]),
+        ]
+        received = [[], []]
+        with AcquisitionPool(tasks, 0.001, slots=64, processes=1, start_method="fork") as pool:
+            end = time.monotonic() + 10
+            while min(map(len, received)) < MIN_SAMPLES and time.monotonic() < end:
+                for task in (0, 1):
+                    with pool.batch(task) as samples:
+                        received[task].extend((s.seq, bytes(s.frame)) for s in samples)
+                time.sleep(0.01)
+            self.assertEqual(pool.failed(), {})
+        self.assertGreaterEqual(len(received[0]), MIN_SAMPLES)
+        self.assertEqual(received[0][0], (1, b"\x10\x11\x20\x21\x22"))
+        self.assertEqual(received[1][0], (1, b"\x00\x01\x02\x03"))
+        seqs = [seq for seq, _ in received[0]]
+        self.assertEqual(seqs, list(range(1, len(seqs) + 1)))
+        # The parent's descriptor is still usable
+        self.assertEqual(parent.read_i2c_block_data(0x48, 0x10, 2), [0x10, 0x11])
+        parent.close()
+        self.assertTrue(os.path.exists(self.adapters[0].name))
+
+    def test_failed(self):
+        tasks = [(self.adapters[0].name, [(0x48, 0x00, 2)]), ("/nonexistent/i2c-9", [(0x48, 0, 1)])]
+        with AcquisitionPool(tasks, 0.001, start_method="fork") as pool:
+            end = time.monotonic() + 10
+            while not pool.failed() and time.monotonic() < end:
+                time.sleep(0.01)
+            pool.stop()
+            # Kept once stopped, without the worker stop() terminated
+            self.assertEqual(pool.failed(), {1: 1})
+
+    def test_realtime(self):
+        tasks = [(adapter.name, [(0x48, 0x00, 2)]) for adapter in self.adapters]
+        cpus = os.sched_getaffinity(0)
+        realtime = [RealtimeOptions(cpus=cpus), None]
+        with self.assertRaises(ValueError):
+            AcquisitionPool(tasks, 0.001, realtime=realtime[:1])
+        with AcquisitionPool(tasks, 0.001, start_method="fork", realtime=realtime) as pool:
+            end = time.monotonic() + 10
+            while not pool.realtime_reports() and time.monotonic() < end:
+                time.sleep(0.01)
+            reports = pool.realtime_reports()
+        self.assertEqual(list(reports), ["smbus3-acquisition-0"])
+        self.assertEqual(reports["smbus3-acquisition-0"].affinity, cpus)
@@ -0,0 +1,104 @@
+"""
+tests/test_adapters.py
+----------------------
+
+Tests for adapter discovery, against a fake sysfs tree.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from smbus3.adapters import I2C_ADDR_OFFSET_TEN_BIT, AdapterRegistry, _parse_client
+
+# Adapter 3 with a PCA9548 at 0x70, whose channels 0 and 1 are adapters 10 and 11
+ADAPTERS = {
+    0: "bcm2835 (i2c@7e205000)",
+    3: "i2c-designware",
+    10: "i2c-3-mux (chan_id 0)",
+    11: "i2c-3-mux (chan_id 1)",
+}
+CLIENTS = {
+    "3-0070": "pca9548",
+    "3-0050": "at24",
+    "3-a050": "eeprom",
+    "10-0048": "tmp102",
+    "11-0048": "tmp102",
+    "0-a050": "eeprom",
+}
+
+
+def write_name(directory, name):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "name"), "w") as f:
+        f.write(name + "\n")
+
+
+class TestAdapterRegistry(unittest.TestCase):
+    def setUp(self):
+        self.sysfs = tempfile.mkdtemp()
+        devices = os.path.join(self.sysfs, "bus", "i2c", "devices")
+        for number, name in ADAPTERS.items():
+            write_name(os.path.join(devices, f"i2c-{number}"), name)
+            if number != 0:
+                os.makedirs(os.path.join(self.sysfs, "class", "i2c-dev", f"i2c-{number}"))
+        for entry, name in CLIENTS.items():
+            write_name(os.path.join(devices, entry), name)
+        mux = os.path.join(devices, "3-0070")
+        for channel, number in ((0, 10), (1, 11)):
+            os.symlink(
+                os.path.join(devices, f"i2c-{number}"), os.path.join(mux, f"channel-{channel}")
+            )
+            os.symlink(mux, os.path.join(devices, f"i2c-{number}", "mux_device"))
+
+    def tearDown(self):
+        shutil.rmtree(self.sysfs)
+
+    def test_index(self):
+        registry = AdapterRegistry(self.sysfs)
+        self.assertEqual(len(registry), 4)
+        self.assertEqual([adapter.number for adapter in registry], [0, 3, 10, 11])
+        adapter = registry.get(10)
+        self.assertEqual(adapter.name, "i2c-3-mux (chan_id 0)")
+        self.assertEqual(adapter.path, "/dev/i2c-10")
+        self.assertEqual((adapter.parent, adapter.mux_address, adapter.channel), (3, 0x70, 0))
+        self.assertEqual(adapter.clients, {0x48: "tmp102"})
+        # Seven and ten bit clients at the same address are kept apart
+        self.assertEqual(
+            registry.get(3).clients,
+            {0x70: "pca9548", 0x50: "at24", 0x50 | I2C_ADDR_OFFSET_TEN_BIT: "eeprom"},
+        )
+        self.assertEqual(registry.get(0).clients, {0x50 | I2C_ADDR_OFFSET_TEN_BIT: "eeprom"})
+        self.assertIsNone(registry.get(0).path)
+        self.assertIsNone(registry.get(3).parent)
+
+    def test_parse_client(self):
+        self.assertEqual(_parse_client("3-0050"), (3, 0x50, False))
+        self.assertEqual(_parse_client("3-a050"), (3, 0x50, True))
+        self.assertIsNone(_parse_client("i2c-3"))
+
+    def test_lookup(self):
+        registry = AdapterRegistry(self.sysfs)
+        self.assertEqual(registry.lookup("i2c-designware").number, 3)
+        self.assertEqual(registry.find("missing"), [])
+        self.assertRaises(KeyError, registry.lookup, "missing")
+        self.assertEqual([adapter.number for adapter in registry.children(3)], [10, 11])
+        self.assertEqual(registry.root(11).number, 3)
+
+        write_name(os.path.join(self.sysfs, "bus", "i2c", "devices", "i2c-4"), "i2c-designware")
+        registry.refresh()
+        self.assertEqual([adapter.number for adapter in registry.find("i2c-designware")], [3, 4])
+        self.assertRaises(ValueError, registry.lookup, "i2c-designware")
+
+    def test_open(self):
+        registry = AdapterRegistry(self.sysfs)
+        self.assertRaises(OSError, registry.open, 0)
+        with mock.patch("smbus3.adapters.SMBus") as smbus:
+            registry.open("i2c-3-mux (chan_id 1)")
+        smbus.assert_called_once_with("/dev/i2c-11", force=False)
+
+    def test_no_sysfs(self):
+        registry = AdapterRegistry(os.path.join(self.sysfs, "missing"))
+        self.assertEqual(len(registry), 0)
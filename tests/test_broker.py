@@ -0,0 +1,248 @@
+"""
+tests/test_broker.py
+--------------------
+
+Tests for the local bus broker and its SMBus compatible client.
+"""
+
+import errno
+import os
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from smbus3 import SMBus, i2c_msg
+from smbus3.broker import (
+    _MSG,
+    _REQUEST,
+    OP_I2C_RDWR,
+    OP_READ_BYTE_DATA,
+    OP_READ_I2C_BLOCK_DATA,
+    OP_READ_WORD_DATA,
+    OP_WRITE_BYTE_DATA,
+    OP_WRITE_WORD_DATA,
+    BusBroker,
+    SMBusClient,
+    _Request,
+)
+
+from .test_smbus3 import (
+    MOCK_FD,
+    mock_close,
+    mock_i2c_rdwr,
+    mock_ioctl_limited,
+    mock_open,
+)
+
+I2C_RDWR = 0x0707
+I2C_SLAVE = 0x0703
+I2C_SLAVE_FORCE = 0x0706
+
+# Combined transfers seen by the mocked adapter, as lists of message lengths.
+rdwr_calls: list = []
+# Addresses that NACK every combined transfer.
+nack_addresses: set = set()
+
+
+def mock_ioctl_rdwr(fd, command, msg):
+    """
+    Extend the limited ioctl mock with a register file reachable through I2C_RDWR.
+    """
+    if command != I2C_RDWR:
+        return mock_ioctl_limited(fd, command, msg)
+    assert fd == MOCK_FD
+    msgs = [msg.msgs[k] for k in range(msg.nmsgs)]
+    rdwr_calls.append([m.len for m in msgs])
+    if any(m.addr in nack_addresses for m in msgs):
+        raise OSError(6, "No such device or address")
+    mock_i2c_rdwr(msg)
+
+
+class BrokerTestCase(unittest.TestCase):
+    def setUp(self):
+        # Create the socket directory first, os.open is mocked below
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "broker.sock")
+        self.patches = [
+            mock.patch("smbus3.smbus3.os.open", mock_open),
+            mock.patch("smbus3.smbus3.os.close", mock_close),
+            mock.patch("smbus3.smbus3.ioctl", mock_ioctl_rdwr),
+        ]
+        for patch in self.patches:
+            patch.start()
+        rdwr_calls.clear()
+        nack_addresses.clear()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        shutil.rmtree(self.tmpdir)
+
+
+class TestBusBroker(BrokerTestCase):
+    def test_client_roundtrip(self):
+        with BusBroker(1, self.path), SMBusClient(self.path) as client:
+            self.assertEqual(client.funcs, 0xEFF0001)
+            self.assertEqual(client.read_byte_data(80, 5), 5)
+            self.assertEqual(client.read_word_data(80, 1), 2 * 256 + 1)
+            self.assertEqual(client.read_i2c_block_data(80, 4, 3), [4, 5, 6])
+            self.assertEqual(client.read_block_data(80, 0), list(range(32)))
+            client.write_byte_data(80, 1, 7)
+            client.write_word_data(80, 1, 0x0102)
+            client.write_i2c_block_data(80, 1, [1, 2, 3])
+            with self.assertRaises(ValueError):
+                client.write_i2c_block_data(80, 1, list(range(35)))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_client_errors(self):
+        with BusBroker(1, self.path), SMBusClient(self.path) as client:
+            # The limited mock fails quick writes
+            with self.assertRaises(OSError):
+                client.write_quick(80)
+            # The connection is still usable afterwards
+            self.assertEqual(client.read_byte_data(80, 3), 3)
+
+    def test_client_i2c_rdwr(self):
+        with BusBroker(1, self.path), SMBusClient(self.path) as client:
+            write = i2c_msg.write(80, [10])
+            read = i2c_msg.read(80, 4)
+            client.i2c_rdwr(write, read)
+            self.assertEqual(list(read), [10, 11, 12, 13])
+            self.assertEqual(list(client.i2c_rd(80, 2)), [0, 1])
+            self.assertEqual(list(client.i2c_wr(80, [1, 2])), [1, 2])
+
+    def test_malformed_rdwr(self):
+        with BusBroker(1, self.path) as broker, SMBusClient(self.path) as client:
+            truncated = [
+                b"",
+                _MSG.pack(80, 0, 4)[:4],
+                _MSG.pack(80, 0, 4) + b"\x01",
+                _MSG.pack(80, 1, 1) * 43,
+            ]
+            for payload in truncated:
+                with self.assertRaises(OSError) as context:
+                    client._call(OP_I2C_RDWR, payload=payload)
+                self.assertEqual(context.exception.errno, errno.EINVAL)
+            # The broker still serves its clients
+            self.assertTrue(broker._thread.is_alive())
+            self.assertEqual(client.read_byte_data(80, 3), 3)
+            # Responses larger than 64 KiB
+            reads = [i2c_msg.read(80, 0xFFFF) for _ in range(2)]
+            client.i2c_rdwr(*reads)
+            self.assertEqual(bytes(reads[1])[:3], b"\x00\x01\x02")
+
+    def test_stalled_client(self):
+        with BusBroker(1, self.path) as broker, SMBusClient(self.path) as client:
+            broker.send_timeout = 0.1
+            stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stalled.connect(self.path)
+            # Ask for far more data than the socket buffers hold, never read it
+            payload = _MSG.pack(80, 1, 0xFFFF) * 8
+            request = _REQUEST.pack(OP_I2C_RDWR, 0, 0, 0, 0, len(payload)) + payload
+            stalled.sendall(request * 8)
+            self.assertEqual(client.read_byte_data(80, 3), 3)
+            # Dropped once a response waits for longer than send_timeout
+            for _ in range(100):
+                if len(broker._buffers) == 1:
+                    break
+                time.sleep(0.05)
+            self.assertEqual(len(broker._buffers), 1)
+            self.assertEqual(client.read_byte_data(80, 4), 4)
+            # The stalled client sees the end of the stream after its backlog
+            stalled.settimeout(5)
+            while stalled.recv(1 << 20):
+                pass
+            stalled.close()
+
+    def test_multiple_clients(self):
+        with BusBroker(1, self.path):
+            clients = [SMBusClient(self.path) for _ in range(4)]
+            for k, client in enumerate(clients):
+                self.assertEqual(client.read_byte_data(80, k), k)
+            for client in clients:
+                client.close()
+
+    def test_combined_batch(self):
+        broker = BusBroker(SMBus(1), self.path)
+        pending = [
+            _Request(None, (OP_READ_BYTE_DATA, 0, 3, 80, 0), b""),
+            _Request(None, (OP_READ_WORD_DATA, 0, 4, 81, 0), b""),
+            _Request(None, (OP_READ_I2C_BLOCK_DATA, 0, 8, 82, 3), b""),
+            _Request(None, (OP_WRITE_BYTE_DATA, 0, 1, 80, 0), b"\x05"),
+            _Request(None, (OP_READ_BYTE_DATA, 0, 9, 80, 0), b""),
+        ]
+        results = broker._execute(pending)
+        self.assertEqual(
+            results, [(0, b"\x03"), (0, b"\x04\x05"), (0, b"\x08\x09\x0a"), (0, b""), (0, b"\x09")]
+        )
+        # Three reads closed by a write share one transfer, the last read runs alone
+        self.assertEqual(rdwr_calls, [[1, 1, 1, 2, 1, 3, 2]])
+        self.assertEqual(broker.requests, 5)
+        self.assertEqual(broker.transfers, 2)
+        broker.close()
+
+    def test_combined_batch_malformed(self):
+        broker = BusBroker(SMBus(1), self.path)
+        pending = [
+            _Request(None, (OP_READ_BYTE_DATA, 0, 3, 80, 0), b""),
+            _Request(None, (OP_READ_BYTE_DATA, 0, 4, 80, 0), b""),
+            # Payloads longer than the written value are not combined
+            _Request(None, (OP_WRITE_BYTE_DATA, 0, 1, 80, 0), b"\x05\x06"),
+            _Request(None, (OP_WRITE_WORD_DATA, 0, 1, 80, 0), b"\x05"),
+            _Request(None, (OP_READ_I2C_BLOCK_DATA, 0, 8, 82, 0), b""),
+        ]
+        for request in pending[2:]:
+            self.assertFalse(request.combinable())
+        broker._execute(pending)
+        self.assertEqual(rdwr_calls, [[1, 1, 1, 1]])
+        broker.close()
+
+    def test_combined_batch_force(self):
+        broker = BusBroker(SMBus(1), self.path)
+        commands = []
+
+        def mock_ioctl_capture(fd, command, msg):
+            commands.append(command)
+            return mock_ioctl_rdwr(fd, command, msg)
+
+        pending = [
+            _Request(None, (OP_READ_BYTE_DATA, 0, 3, 80, 0), b""),
+            _Request(None, (OP_READ_BYTE_DATA, 0x03, 3, 81, 0), b""),
+        ]
+        broker.bus.warmup()
+        with mock.patch("smbus3.smbus3.ioctl", mock_ioctl_capture):
+            broker._execute(pending)
+        # The busy address check of each device precedes the combined transfer
+        self.assertEqual(commands, [I2C_SLAVE, I2C_SLAVE_FORCE, I2C_RDWR])
+        broker.close()
+
+    def test_combined_batch_error_isolation(self):
+        broker = BusBroker(SMBus(1), self.path)
+        nack_addresses.add(81)
+        pending = [
+            _Request(None, (OP_READ_I2C_BLOCK_DATA, 0, 0, 80, 2), b""),
+            _Request(None, (OP_READ_I2C_BLOCK_DATA, 0, 0, 81, 2), b""),
+        ]
+        results = broker._execute(pending)
+        # The failing combined transfer falls back to individual SMBus transfers
+        self.assertEqual(results, [(0, b"\x00\x01"), (0, b"\x00\x01")])
+        self.assertEqual(broker.transfers, 3)
+        broker.close()
+
+    def test_deadline(self):
+        broker = BusBroker(SMBus(1), self.path)
+        broker.deadline_us = 0
+        pending = [_Request(None, (OP_READ_BYTE_DATA, 0, k, 80, 0), b"") for k in range(3)]
+        self.assertEqual(broker._execute(pending), [(errno.ETIMEDOUT, b"")] * 3)
+        self.assertEqual(rdwr_calls, [])
+        broker.close()
+
+    def test_combine_disabled(self):
+        broker = BusBroker(SMBus(1), self.path, combine=False)
+        pending = [_Request(None, (OP_READ_BYTE_DATA, 0, k, 80, 0), b"") for k in range(3)]
+        self.assertEqual(broker._execute(pending), [(0, bytes((k,))) for k in range(3)])
+        self.assertEqual(rdwr_calls, [])
+        broker.close()
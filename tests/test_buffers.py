@@ -0,0 +1,128 @@
+"""
+tests/test_buffers.py
+---------------------
+
+Tests for pooled i2c message buffers.
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+from smbus3 import SMBus, i2c_msg
+from smbus3.buffers import BufferPool
+from smbus3.simulator import RegisterDevice, SimulatedAdapter, simulate
+
+# Idle buffers kept per size class by the pools under test
+MAX_FREE = 2
+
+
+class TestBufferPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = BufferPool((8, 32), max_free=MAX_FREE)
+
+    def test_size_classes(self):
+        pool = self.pool
+        self.assertEqual(
+            [len(pool.acquire(length)) for length in (0, 8, 9, 32, 33)], [8, 8, 32, 32, 33]
+        )
+        self.assertEqual(pool.leased, 5)
+        self.assertEqual(pool.stats["allocations"], 5)
+        with self.assertRaises(ValueError):
+            BufferPool(())
+
+    def test_reuse(self):
+        pool = self.pool
+        buffer = pool.acquire(4)
+        pool.release(buffer)
+        self.assertIs(pool.acquire(6), buffer)
+        self.assertEqual(pool.stats, {"allocations": 1, "reuses": 1, "releases": 1, "discards": 0})
+        with self.assertRaises(ValueError):
+            pool.release(BufferPool().acquire(1))
+        pool.release(buffer)
+        with self.assertRaises(ValueError):
+            pool.release(buffer)
+
+    def test_bounded(self):
+        pool = self.pool
+        buffers = [pool.acquire(size) for size in (8, 8, 8, 32, 100)]
+        for buffer in buffers:
+            pool.release(buffer)
+        # One 8 byte buffer beyond max_free and the oversized one are dropped
+        self.assertEqual(pool.stats["discards"], 2)
+        self.assertEqual(pool.free_bytes, 2 * 8 + 32)
+        self.assertEqual(pool.leased, 0)
+
+    def test_scope(self):
+        pool = self.pool
+        with pool.scope():
+            pool.acquire(1)
+            with pool.scope():
+                pool.acquire(1)
+            self.assertEqual(pool.leased, 1)
+        self.assertEqual(pool.leased, 0)
+        leases = []
+        with pool.scope():
+            mine = pool.acquire(1)
+            pool.release(mine)
+            # Leased again by another thread, outside of any scope
+            thread = threading.Thread(target=lambda: leases.append(pool.acquire(1)))
+            thread.start()
+            thread.join()
+        self.assertIs(leases[0], mine)
+        self.assertEqual(pool.leased, 1)
+
+    def test_i2c_msg(self):
+        pool = self.pool
+        read = i2c_msg.read(0x40, 3, pool=pool)
+        write = i2c_msg.write(0x40, [1, 2, 3], pool=pool)
+        self.assertEqual((len(read), len(write)), (3, 3))
+        self.assertEqual(bytes(write), b"\x01\x02\x03")
+        pool.release(read)
+        pool.release(write)
+        self.assertEqual(pool.leased, 0)
+        self.assertEqual(bytes(i2c_msg.write(0x40, b"\x04\x05", pool=pool)), b"\x04\x05")
+
+    def test_steady_state(self):
+        pool = BufferPool()
+        adapter = SimulatedAdapter([RegisterDevice(0x40)])
+        created = []
+        init = i2c_msg.__init__
+
+        def counting_init(msg, *args, **kwargs):
+            created.append(msg)
+            init(msg, *args, **kwargs)
+
+        patches = (
+            mock.patch.object(i2c_msg, "__init__", counting_init),
+            mock.patch("smbus3.smbus3.create_string_buffer"),
+        )
+        with simulate({1: adapter}), SMBus(1) as bus, patches[0], patches[1] as create_buffer:
+            bus.pool = pool
+            for idx in range(10):
+                with pool.scope():
+                    bus.i2c_wr(0x40, [0x10, idx])
+                    bus.i2c_wr(0x40, [0x10])
+                    self.assertEqual(list(bus.i2c_rd(0x40, 1)), [idx])
+                # Only the first iteration allocates buffers and messages
+                self.assertEqual(pool.stats["allocations"], 3)
+                self.assertEqual(len(created), 3)
+        create_buffer.assert_not_called()
+        self.assertEqual(pool.stats["reuses"], 27)
+        self.assertEqual(pool.leased, 0)
+
+    def test_failed_transfer(self):
+        # Messages of failed transfers go back to the pool
+        pool = BufferPool()
+        adapter = SimulatedAdapter([RegisterDevice(0x40)])
+        with simulate({1: adapter}), SMBus(1) as bus:
+            bus.pool = pool
+            with self.assertRaises(OSError):
+                bus.i2c_rd(0x41, 4)
+            with self.assertRaises(OSError):
+                bus.i2c_wr(0x41, [0x10, 1])
+            self.assertEqual(pool.leased, 0)
+            with pool.scope():
+                with self.assertRaises(OSError):
+                    bus.i2c_rd(0x41, 4)
+            self.assertEqual(pool.stats["releases"], 3)
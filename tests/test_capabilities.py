@@ -0,0 +1,88 @@
+"""
+tests/test_capabilities.py
+--------------------------
+
+Tests for lazy capability probing and the persisted capability cache.
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from smbus3 import SMBus
+from smbus3.capabilities import CapabilityCache
+
+from .test_smbus3 import I2C_FUNCS, MOCK_I2C_FUNC_LIMITED, SMBusTestCase, mock_ioctl_limited
+
+funcs_calls = []
+
+
+def mock_ioctl_counting(fd, command, msg):
+    if command == I2C_FUNCS:
+        funcs_calls.append(fd)
+    return mock_ioctl_limited(fd, command, msg)
+
+
+class TestCapabilityCache(SMBusTestCase):
+    def setUp(self):
+        # Create the fake sysfs first, os.open is mocked below
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "funcs.json")
+        adapter = os.path.join(self.tmpdir, "class", "i2c-dev", "i2c-1")
+        os.makedirs(adapter)
+        with open(os.path.join(adapter, "name"), "w") as f:
+            f.write("bcm2835 (i2c@7e804000)\n")
+        super().setUp()
+        self.ioctl_mock = mock.patch("smbus3.smbus3.ioctl", mock_ioctl_counting)
+        self.ioctl_mock.start()
+        funcs_calls.clear()
+
+    def tearDown(self):
+        self.ioctl_mock.stop()
+        super().tearDown()
+        shutil.rmtree(self.tmpdir)
+
+    def test_lazy_funcs(self):
+        bus = SMBus(1)
+        bus.write_byte(0x48, 0x01)
+        self.assertEqual(funcs_calls, [])
+        self.assertEqual(bus.funcs, MOCK_I2C_FUNC_LIMITED)
+        self.assertEqual(bus.funcs, MOCK_I2C_FUNC_LIMITED)
+        self.assertEqual(len(funcs_calls), 1)
+        bus.close()
+
+    def test_persisted_cache(self):
+        cache = CapabilityCache(self.path, sysfs=self.tmpdir)
+        self.assertEqual(cache.key("/dev/i2c-1"), "1:bcm2835 (i2c@7e804000)")
+        self.assertIsNone(cache.key("/dev/i2c-7"))
+        with SMBus(1, cache=cache) as bus:
+            self.assertEqual(bus.funcs, MOCK_I2C_FUNC_LIMITED)
+        cache.save()
+        self.assertEqual((cache.hits, cache.misses, len(funcs_calls)), (0, 1, 1))
+
+        # A new process reuses the probed value
+        cache = CapabilityCache(self.path, sysfs=self.tmpdir)
+        with SMBus("/dev/i2c-1", cache=cache) as bus:
+            self.assertEqual(bus.funcs, MOCK_I2C_FUNC_LIMITED)
+        self.assertEqual((cache.hits, cache.misses, len(funcs_calls)), (1, 0, 1))
+
+        # A different adapter under the same number is probed again
+        with open(os.path.join(self.tmpdir, "class", "i2c-dev", "i2c-1", "name"), "w") as f:
+            f.write("i2c-designware\n")
+        with SMBus(1, cache=cache) as bus:
+            self.assertEqual(bus.funcs, MOCK_I2C_FUNC_LIMITED)
+        self.assertEqual(len(funcs_calls), 2)
+
+    def test_corrupt_file(self):
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        cache = CapabilityCache(self.path, sysfs=self.tmpdir)
+        self.assertEqual(cache.entries, {})
+        cache.save()
+        cache.set("/dev/i2c-1", 1)
+        with cache:
+            pass
+        self.assertEqual(
+            CapabilityCache(self.path, sysfs=self.tmpdir).entries, {"1:bcm2835 (i2c@7e804000)": 1}
+        )
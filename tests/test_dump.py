@@ -0,0 +1,101 @@
+"""
+tests/test_dump.py
+------------------
+
+Tests for register dumps.
+"""
+
+import io
+import json
+from contextlib import redirect_stdout
+from unittest import mock
+
+from smbus3 import I2C_M_Bitflag, I2cFunc, SMBus
+from smbus3.dump import dump, dump_many, format_binary, format_hex, main, select_mode
+
+from .test_pec import last_transfer, mock_ioctl_pec
+from .test_smbus3 import (
+    I2C_RDWR,
+    I2C_SLAVE_FORCE,
+    I2C_SMBUS,
+    SMBusTestCase,
+    mock_ioctl_full,
+    mock_ioctl_limited,
+    switch_to_full_featured_ioctl_mock,
+)
+
+
+class TestDump(SMBusTestCase):
+    def test_select_mode(self):
+        self.assertEqual(select_mode(I2cFunc.I2C | I2cFunc.SMBUS_EMUL), "rdwr")
+        self.assertEqual(select_mode(I2cFunc.SMBUS_EMUL), "i2c_block")
+        self.assertEqual(select_mode(I2cFunc.SMBUS_WORD_DATA), "word")
+        self.assertEqual(select_mode(0), "byte")
+
+    def test_dump_modes(self):
+        expected = bytes(range(0x10, 0x51))
+        with mock.patch("smbus3.smbus3.ioctl", wraps=mock_ioctl_limited) as ioctl:
+            bus = SMBus(1)
+            self.assertEqual(dump(bus, 0x50, 0x10, 0x50), expected)
+            commands = [call.args[1] for call in ioctl.call_args_list]
+            self.assertEqual(commands.count(I2C_RDWR), 1)
+            for mode, transfers in (("i2c_block", 3), ("word", 33), ("byte", 65)):
+                ioctl.reset_mock()
+                self.assertEqual(dump(bus, 0x50, 0x10, 0x50, mode=mode), expected)
+                commands = [call.args[1] for call in ioctl.call_args_list]
+                self.assertEqual(commands.count(I2C_SMBUS), transfers, msg=mode)
+            bus.close()
+        self.assertRaises(ValueError, dump, bus, 0x50, 0x20, 0x10)
+        self.assertRaises(ValueError, dump, bus, 0x50, mode="quick")
+
+    def test_dump_rdwr_settings(self):
+        # 10-bit addressing and force
+        with mock.patch("smbus3.smbus3.ioctl", wraps=mock_ioctl_full) as ioctl:
+            bus = SMBus(1)
+            bus.tenbit = 1
+            self.assertEqual(dump(bus, 0x250, 0, 3, mode="rdwr", force=True), b"\x00\x01\x02\x03")
+            commands = [call.args[1] for call in ioctl.call_args_list]
+            self.assertEqual(commands[-2:], [I2C_SLAVE_FORCE, I2C_RDWR])
+            msgs = ioctl.call_args.args[2].msgs
+            self.assertTrue(msgs[0].flags & msgs[1].flags & I2C_M_Bitflag.I2C_M_TEN)
+            bus.close()
+        # PEC read and checked after the registers
+        with mock.patch("smbus3.smbus3.ioctl", mock_ioctl_pec):
+            bus = SMBus(1)
+            bus.funcs = I2cFunc.I2C | I2cFunc.SMBUS_PEC
+            bus.pec = 1
+            self.assertEqual(dump(bus, 0x50, 0x10, 0x13), b"\x10\x11\x12\x13")
+            self.assertEqual(len(last_transfer[1][2]), 5)
+            bus.close()
+
+    def test_format_hex(self):
+        lines = format_hex(b"AB\x00", 0x0E).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("     0  1  2"))
+        self.assertEqual(lines[1], "00: " + "   " * 14 + "41 42    " + " " * 14 + "AB")
+        self.assertEqual(lines[2], "10: 00" + " " * 45 + "    ." + " " * 15)
+
+    def test_format_binary(self):
+        dumps = {(1, 0x50): b"\x01\x02", (2, 0x50): OSError(6, "No such device"), (1, 0x51): b"\x03"}
+        records = [
+            b"\x50\x00\x10\x02\x00\x01\x02",
+            # Failed devices keep their place, with no data
+            b"\x50\x00\x10\x00\x00",
+            b"\x51\x00\x10\x01\x00\x03",
+        ]
+        self.assertEqual(format_binary(dumps, 0x10), b"".join(records))
+
+    def test_dump_many(self):
+        with switch_to_full_featured_ioctl_mock():
+            dumps = dump_many([(1, 0x50), (2, 0x51), (1, 0x52)], 0, 3)
+        self.assertEqual(list(dumps), [(1, 0x50), (2, 0x51), (1, 0x52)])
+        self.assertTrue(all(data == b"\x00\x01\x02\x03" for data in dumps.values()))
+
+    def test_main(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            self.assertEqual(main(["1:0x50", "--end", "0x03", "--format", "json"]), 0)
+        # Skip the output of the mocks
+        output = stdout.getvalue()
+        devices = json.loads(output[output.index("[\n {") :])
+        self.assertEqual(devices, [{"bus": 1, "address": 0x50, "start": 0, "data": [0, 1, 2, 3]}])
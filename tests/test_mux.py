@@ -0,0 +1,116 @@
+"""
+tests/test_mux.py
+-----------------
+
+Tests for i2c multiplexer support.
+"""
+
+import unittest
+from unittest import mock
+
+from smbus3.mux import I2cMux, MuxedSMBus
+
+
+class FakeBus:
+    """
+    Minimal SMBus stand-in recording every transfer.
+    """
+
+    def __init__(self):
+        self.log = []
+        self.fail = set()
+
+    def write_byte(self, i2c_addr, value, force=None):
+        if i2c_addr in self.fail:
+            raise OSError(121, "Remote I/O error")
+        self.log.append(("write_byte", i2c_addr, value))
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        if i2c_addr in self.fail:
+            raise OSError(121, "Remote I/O error")
+        self.log.append(("read_byte_data", i2c_addr, register))
+        return register
+
+
+class MuxedSMBusTestCase(unittest.TestCase):
+    def setUp(self):
+        self.bus = FakeBus()
+        self.muxed = MuxedSMBus(self.bus)
+        self.mux = self.muxed.add_mux(0x70)
+
+    def selects(self):
+        return [entry for entry in self.bus.log if entry[0] == "write_byte"]
+
+
+class TestMux(MuxedSMBusTestCase):
+    def test_skip_redundant_select(self):
+        sensor = self.muxed.channel(self.mux, 3)
+        for _ in range(4):
+            self.assertEqual(sensor.read_byte_data(0x48, 0x05), 0x05)
+        self.assertEqual(self.selects(), [("write_byte", 0x70, 0x08)])
+        self.muxed.select(self.mux, None)
+        self.assertEqual(self.selects()[-1], ("write_byte", 0x70, 0x00))
+        self.assertRaises(ValueError, self.muxed.select, self.mux, 8)
+
+    def test_cascaded_and_siblings(self):
+        sibling = self.muxed.add_mux(0x71)
+        child = self.muxed.add_mux(0x72, channels=4, parent=(self.mux, 1))
+        self.assertEqual(child.path(), [(self.mux, 1)])
+        self.muxed.select(child, 2)
+        # Unknown sibling state is cleared before enabling the path
+        self.assertEqual(
+            self.selects(),
+            [("write_byte", 0x71, 0x00), ("write_byte", 0x70, 0x02), ("write_byte", 0x72, 0x04)],
+        )
+        self.bus.log.clear()
+        self.muxed.select(sibling, 0)
+        self.assertEqual(self.selects(), [("write_byte", 0x70, 0x00), ("write_byte", 0x71, 0x01)])
+        self.assertIsNone(self.mux.selected)
+        self.bus.log.clear()
+        # The cascaded mux kept its selection and is reached again to clear it
+        self.muxed.deselect_all()
+        self.assertEqual(
+            self.selects(),
+            [("write_byte", 0x71, 0x00), ("write_byte", 0x70, 0x02), ("write_byte", 0x72, 0x00)],
+        )
+
+    def test_failed_select_invalidates(self):
+        self.muxed.select(self.mux, 1)
+        self.bus.fail.add(0x70)
+        self.assertRaises(OSError, self.muxed.select, self.mux, 2)
+        self.assertEqual(self.mux.selected, I2cMux.UNKNOWN)
+        self.bus.fail.clear()
+        self.muxed.select(self.mux, 1)
+        self.assertEqual(self.selects()[-1], ("write_byte", 0x70, 0x02))
+        self.assertEqual(self.mux.selected, 1)
+
+    def test_flush_groups_by_channel(self):
+        self.muxed.select(self.mux, 5)
+        self.bus.log.clear()
+        for channel in (0, 5, 0, 5, 0):
+            self.muxed.submit(self.mux, channel, "read_byte_data", 0x48, channel)
+        self.muxed.submit(None, None, "read_byte_data", 0x20, 0x01)
+        self.bus.fail.add(0x20)
+        results = self.muxed.flush()
+        self.assertEqual(results[:5], [0, 5, 0, 5, 0])
+        self.assertIsInstance(results[5], OSError)
+        # Already selected channel first, then one switch
+        self.assertEqual(self.selects(), [("write_byte", 0x70, 0x01)])
+        self.assertEqual(self.muxed.selects, 2)
+        self.assertEqual(self.muxed.flush(), [])
+
+
+class TestBusOwnership(unittest.TestCase):
+    def test_owned(self):
+        with mock.patch("smbus3.mux.SMBus") as smbus:
+            with MuxedSMBus(3) as muxed:
+                self.assertIs(muxed.bus, smbus.return_value)
+        smbus.assert_called_once_with(3)
+        smbus.return_value.close.assert_called_once_with()
+
+    def test_borrowed(self):
+        # Any object besides a bus number or path is used as is, and left open
+        bus = mock.Mock(spec=["read_byte_data", "close"])
+        with MuxedSMBus(bus) as muxed:
+            self.assertIs(muxed.bus, bus)
+        bus.close.assert_not_called()
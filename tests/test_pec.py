@@ -0,0 +1,204 @@
+"""
+tests/test_pec.py
+-----------------
+
+Tests for userspace SMBus PEC (CRC-8) and PEC-terminated i2c_rdwr transfers.
+"""
+
+import errno
+import os
+import unittest
+from ctypes import memmove
+from unittest import mock
+
+from smbus3 import I2cFunc, SMBus, i2c_msg
+from smbus3.pec import _crc8_bitwise, address_byte, crc8, messages_pec
+from smbus3.simulator import Device, SimulatedAdapter, simulate
+from smbus3.smbus3 import I2C_SMBUS_BLOCK_MAX
+
+from .test_smbus3 import SMBusTestCase
+
+I2C_RDWR = 0x0707
+
+# Block sent by BlockDevice
+BLOCK = b"\x01\x02\x03"
+
+# Messages of the last I2C_RDWR transfer, as (addr, flags, bytes)
+last_transfer: list = []
+# XOR applied to the PEC returned by the mocked device
+pec_error = 0
+
+
+def mock_ioctl_pec(fd, command, msg):
+    """
+    Answer combined transfers like devices computing their own PEC over a
+    register file where register N holds value N. A write after a read
+    starts the transaction of the next device.
+    """
+    if command != I2C_RDWR:
+        return
+    msgs = [msg.msgs[k] for k in range(msg.nmsgs)]
+    crc = 0
+    offset = 0
+    after_read = False
+    for m in msgs:
+        if m.flags & 1:
+            data = bytes(range(offset, offset + m.len - 1))
+            crc = crc8(data, crc8((address_byte(m.addr, True),), crc))
+            memmove(m.buf, data + bytes((crc ^ pec_error,)), m.len)
+        else:
+            if after_read:
+                crc = 0
+            offset = bytes(m)[0]
+            crc = crc8(bytes(m), crc8((address_byte(m.addr, False),), crc))
+        after_read = m.flags & 1
+    last_transfer[:] = [(m.addr, m.flags, bytes(m)) for m in msgs]
+
+
+class BlockDevice(Device):
+    """
+    Answers every read with an SMBus block: the count, BLOCK and the PEC of
+    the transfer. Records the number of bytes read in each transfer.
+    """
+
+    def __init__(self, address):
+        super().__init__(address)
+        self.read_lengths = []
+        self._written = b""
+        self._sent = b""
+        self._stream = b""
+
+    def write(self, data):
+        self._written += data
+
+    def read(self, length):
+        if not self._sent:
+            crc = crc8(self._written, crc8((address_byte(self.address, False),)))
+            block = bytes((len(BLOCK),)) + BLOCK
+            self._stream = block + bytes(
+                (crc8(block, crc8((address_byte(self.address, True),), crc)),)
+            )
+        data = self._stream[len(self._sent) : len(self._sent) + length].ljust(length, b"\xff")
+        self._sent += data
+        return data
+
+    def stop(self):
+        self.read_lengths.append(len(self._sent))
+        self._written = self._sent = b""
+
+
+class TestPEC(unittest.TestCase):
+    def test_crc8(self):
+        # Check value of CRC-8/SMBUS
+        self.assertEqual(crc8(b"123456789"), 0xF4)
+        self.assertEqual(crc8([]), 0)
+        for length in (1, 31, 255, 256, 257, 4096):
+            data = os.urandom(length)
+            self.assertEqual(crc8(data), _crc8_bitwise(data))
+            # Computations can be continued
+            half = length // 2
+            self.assertEqual(crc8(data[half:], crc8(data[:half])), crc8(data))
+
+    def test_messages_pec(self):
+        write = i2c_msg.write(0x50, [0x10])
+        read = i2c_msg.write(0x50, [0x10, 0x11])
+        read.flags = 1
+        expected = _crc8_bitwise([0xA0, 0x10, 0xA1, 0x10, 0x11])
+        self.assertEqual(messages_pec([write, read]), expected)
+
+
+class TestI2CRDWRPEC(SMBusTestCase):
+    def setUp(self):
+        super().setUp()
+        global pec_error  # noqa: PLW0603
+        pec_error = 0
+        self.ioctl_mock = mock.patch("smbus3.smbus3.ioctl", mock_ioctl_pec)
+        self.ioctl_mock.start()
+
+    def tearDown(self):
+        self.ioctl_mock.stop()
+        super().tearDown()
+
+    def test_write_pec(self):
+        with SMBus(1) as bus:
+            msg = i2c_msg.write(0x50, [0x10, 0x42])
+            bus.i2c_rdwr(msg, pec=True)
+            pec = _crc8_bitwise([0xA0, 0x10, 0x42])
+            self.assertEqual(last_transfer, [(0x50, 0, bytes((0x10, 0x42, pec)))])
+            # The caller's message is left untouched
+            self.assertEqual(bytes(msg), b"\x10\x42")
+
+    def test_read_pec(self):
+        with SMBus(1) as bus:
+            write = i2c_msg.write(0x50, [0x10])
+            read = i2c_msg.read(0x50, 4)
+            bus.i2c_rdwr(write, read, pec=True)
+            self.assertEqual(list(read), [0x10, 0x11, 0x12, 0x13])
+            self.assertEqual(len(last_transfer[1][2]), 5)
+
+    def test_read_pec_mismatch(self):
+        global pec_error  # noqa: PLW0603
+        pec_error = 0xFF
+        with SMBus(1) as bus:
+            write = i2c_msg.write(0x50, [0x10])
+            read = i2c_msg.read(0x50, 4)
+            with self.assertRaises(OSError) as ctx:
+                bus.i2c_rdwr(write, read, pec=True)
+            self.assertEqual(ctx.exception.errno, errno.EBADMSG)
+
+    def test_pec_invalid(self):
+        with SMBus(1) as bus:
+            with self.assertRaises(ValueError):
+                bus.i2c_rdwr(i2c_msg.read(0x50, 1), i2c_msg.write(0x50, [1]), pec=True)
+            with self.assertRaises(ValueError):
+                bus.i2c_rdwr(i2c_msg.write(0x50, [1], flags=0x10), pec=True)
+
+    def test_emulated_pec(self):
+        with SMBus(1) as bus:
+            # Adapter with kernel PEC but no SMBus word transfers
+            bus.funcs = I2cFunc.I2C | I2cFunc.SMBUS_PEC
+            bus.pec = 1
+            self.assertEqual(bus.read_word_data(0x50, 0x10), 0x1110)
+            pec = _crc8_bitwise([0xA0, 0x10, 0xA1, 0x10, 0x11])
+            self.assertEqual(last_transfer[1][2], bytes((0x10, 0x11, pec)))
+            bus.write_byte_data(0x50, 0x10, 0x42)
+            pec = _crc8_bitwise([0xA0, 0x10, 0x42])
+            self.assertEqual(last_transfer, [(0x50, 0, bytes((0x10, 0x42, pec)))])
+
+    def test_read_many_pec(self):
+        global pec_error  # noqa: PLW0603
+        with SMBus(1) as bus:
+            bus.funcs = I2cFunc.I2C | I2cFunc.SMBUS_PEC
+            bus.pec = 1
+            results = bus.read_many([0x50, 0x51], 0x10, 2)
+            self.assertEqual(results, {0x50: b"\x10\x11", 0x51: b"\x10\x11"})
+            # One transfer, each read extended by its PEC byte
+            self.assertEqual([len(data) for _, _, data in last_transfer], [1, 3, 1, 3])
+            pec_error = 0xFF
+            results = bus.read_many([0x50, 0x51], 0x10, 2)
+            self.assertEqual([result.errno for result in results.values()], [errno.EBADMSG] * 2)
+
+
+class TestEmulatedBlockPEC(unittest.TestCase):
+    def test_maximal_read(self):
+        # Without SMBus block reads, a maximal block is read in one transfer
+        device = BlockDevice(0x50)
+        adapter = SimulatedAdapter([device], funcs=I2cFunc.I2C | I2cFunc.SMBUS_PEC)
+        with simulate({1: adapter}), SMBus(1) as bus:
+            bus.pec = 1
+            self.assertEqual(bus.read_block_data(0x50, 0x10), list(BLOCK))
+            self.assertEqual(bus.block_process_call(0x50, 0x10, [7]), list(BLOCK))
+        self.assertEqual(device.read_lengths, [I2C_SMBUS_BLOCK_MAX + 2] * 2)
+        self.assertEqual(adapter.transfers, 2)
+
+    def test_recv_len(self):
+        # The adapter ends the read after the count byte, the block and the PEC
+        device = BlockDevice(0x50)
+        funcs = I2cFunc.I2C | I2cFunc.SMBUS_PEC | I2cFunc.SMBUS_READ_BLOCK_DATA
+        adapter = SimulatedAdapter([device], funcs=funcs)
+        with simulate({1: adapter}), SMBus(1) as bus:
+            bus.pec = 1
+            self.assertEqual(bus.block_process_call(0x50, 0x10, [7, 8]), list(BLOCK))
+            bus.pec = 0
+            self.assertEqual(bus.block_process_call(0x50, 0x10, [7, 8]), list(BLOCK))
+        self.assertEqual(device.read_lengths, [len(BLOCK) + 2, len(BLOCK) + 1])
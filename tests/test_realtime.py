@@ -0,0 +1,88 @@
+"""
+tests/test_realtime.py
+----------------------
+
+Tests for the real-time options of acquisition threads.
+"""
+
+import errno
+import os
+import unittest
+from itertools import islice
+from unittest import mock
+
+from smbus3.realtime import MCL_CURRENT, MCL_FUTURE, RealtimeOptions
+from smbus3.sampling import Sampler
+from smbus3.scheduler import TransferScheduler
+
+from .test_snapshot import REGISTERS, FakeBus
+
+
+class FakeLibc:
+    """C library stand-in, refusing mlockall()."""
+
+    def __init__(self):
+        self.calls = []
+
+    def mallopt(self, param, value):
+        self.calls.append(("mallopt", param, value))
+        return 1
+
+    def mlockall(self, flags):
+        self.calls.append(("mlockall", flags))
+        return -1
+
+
+class TestRealtime(unittest.TestCase):
+    def setUp(self):
+        self.libc = FakeLibc()
+        patchers = [
+            mock.patch("smbus3.realtime._libc", lambda: self.libc),
+            mock.patch("smbus3.realtime.ctypes.get_errno", lambda: errno.EPERM),
+            mock.patch(
+                "smbus3.realtime.os.sched_setscheduler",
+                side_effect=PermissionError(errno.EPERM, "Operation not permitted"),
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_nothing(self):
+        report = RealtimeOptions().apply()
+        self.assertEqual(report, (None, None, False, 0, {}))
+        self.assertEqual(self.libc.calls, [])
+
+    def test_degradation(self):
+        cpus = os.sched_getaffinity(0)
+        options = RealtimeOptions(cpus=cpus, priority=50, lock_memory=True, prefault=1 << 16)
+        report = options.apply()
+        self.assertEqual(report.affinity, cpus)
+        self.assertIsNone(report.priority)
+        self.assertFalse(report.memory_locked)
+        self.assertEqual(report.prefaulted, 1 << 16)
+        self.assertEqual(sorted(report.errors), ["lock_memory", "priority"])
+        self.assertIn("not permitted", report.errors["lock_memory"])
+        self.assertIn(("mlockall", MCL_CURRENT | MCL_FUTURE), self.libc.calls)
+
+    def test_priority(self):
+        with mock.patch("smbus3.realtime.os.sched_setscheduler") as setscheduler:
+            report = RealtimeOptions(priority=1000).apply()
+        maximum = os.sched_get_priority_max(os.SCHED_FIFO)
+        self.assertEqual(report.priority, maximum)
+        self.assertEqual(setscheduler.call_args[0][:2], (0, os.SCHED_FIFO))
+        self.assertEqual(setscheduler.call_args[0][2].sched_priority, maximum)
+
+    def test_sampler(self):
+        bus = FakeBus()
+        sampler = Sampler(bus, REGISTERS, 0, realtime=RealtimeOptions(lock_memory=True))
+        self.assertIsNone(sampler.realtime_report)
+        list(islice(sampler, 2))
+        self.assertIn("lock_memory", sampler.realtime_report.errors)
+        # One discarded warm-up frame, then the two samples
+        self.assertEqual(bus.transfers, 3 * len(REGISTERS))
+        self.assertEqual(sampler.seq, 2)
+
+    def test_scheduler(self):
+        with TransferScheduler(FakeBus(), realtime=RealtimeOptions(priority=10)) as scheduler:
+            self.assertIn("priority", scheduler.realtime_report.errors)
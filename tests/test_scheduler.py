@@ -0,0 +1,123 @@
+"""
+tests/test_scheduler.py
+-----------------------
+
+Tests for priority scheduling of transfers.
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+from smbus3.scheduler import PRIORITY_BULK, PRIORITY_HIGH, PRIORITY_NORMAL, TransferScheduler
+
+from .test_snapshot import FakeBus
+
+
+class LoggingBus(FakeBus):
+    """
+    FakeBus recording the order of transfers.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        self.log.append(("byte", register))
+        return super().read_byte_data(i2c_addr, register, force)
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        self.log.append(("block", register))
+        return super().read_i2c_block_data(i2c_addr, register, length, force)
+
+    def write_i2c_block_data(self, i2c_addr, register, data, force=None):
+        self.log.append(("write", register))
+        self.registers[register : register + len(data)] = bytes(data)
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.bus = LoggingBus()
+        self.release = threading.Event()
+
+    def hold(self, scheduler):
+        """
+        Keep the worker busy until self.release is set.
+        """
+        return scheduler.submit_steps((lambda bus: self.release.wait(),), PRIORITY_HIGH)
+
+    def test_preemption(self):
+        with TransferScheduler(self.bus, max_wait=10) as scheduler:
+            self.hold(scheduler)
+            bulk = scheduler.read_chunked(0x50, 0x00, 100)
+            normal = scheduler.submit("read_byte_data", 0x48, 0xAA)
+            high = scheduler.submit("read_byte_data", 0x48, 0xBB, priority=PRIORITY_HIGH)
+            self.release.set()
+            self.assertEqual(bulk.result(), bytes(range(100)))
+            self.assertEqual(high.result(), 0xBB)
+            self.assertEqual(normal.result(), 0xAA)
+        self.assertEqual(
+            self.bus.log,
+            [
+                ("byte", 0xBB),
+                ("byte", 0xAA),
+                ("block", 0),
+                ("block", 32),
+                ("block", 64),
+                ("block", 96),
+            ],
+        )
+
+    def test_interleaving(self):
+        with TransferScheduler(self.bus, max_wait=10) as scheduler:
+            high = []
+
+            def first_chunk(bus):
+                # A sensor read arriving while the bulk write is in progress
+                high.append(scheduler.submit("read_byte_data", 0x48, 0xCC, priority=PRIORITY_HIGH))
+                bus.write_i2c_block_data(0x50, 0x00, [0] * 32)
+
+            steps = (first_chunk, lambda bus: bus.write_i2c_block_data(0x50, 0x20, [0] * 32))
+            scheduler.submit_steps(steps, PRIORITY_BULK).result()
+            self.assertEqual(high[0].result(), 0xCC)
+        self.assertEqual(self.bus.log, [("write", 0x00), ("byte", 0xCC), ("write", 0x20)])
+        self.assertEqual(self.bus.registers[:0x40], bytes(0x40))
+
+    def test_starvation(self):
+        with TransferScheduler(self.bus, max_wait=0) as scheduler:
+            self.hold(scheduler)
+            bulk = scheduler.read_chunked(0x50, 0x00, 64)
+            normal = scheduler.submit("read_byte_data", 0x48, 0xAA, priority=PRIORITY_NORMAL)
+            self.release.set()
+            bulk.result()
+            normal.result()
+        self.assertEqual(self.bus.log, [("block", 0), ("byte", 0xAA), ("block", 32)])
+
+    def test_errors(self):
+        scheduler = TransferScheduler(self.bus)
+        failed = scheduler.submit("read_byte_data", 0x48, 0x100)
+        self.assertRaises(IndexError, failed.result)
+        self.assertEqual(scheduler.view(PRIORITY_HIGH).read_byte_data(0x48, 0x01), 0x01)
+        self.assertIsNone(scheduler.write_chunked(0x50, 0x10, b"\x01" * 40).result())
+        self.assertEqual(self.bus.log[-2:], [("write", 0x10), ("write", 0x30)])
+        self.assertEqual(self.bus.registers[0x10:0x38], b"\x01" * 40)
+        self.assertRaises(ValueError, scheduler.submit, "read_byte", 0x48, priority=3)
+        # Chunked transfers do not wrap past register 0xFF
+        self.assertRaises(ValueError, scheduler.read_chunked, 0x50, 0xF0, 17)
+        self.assertRaises(ValueError, scheduler.write_chunked, 0x50, 0xF0, bytes(17))
+        self.assertEqual(len(scheduler.read_chunked(0x50, 0xF0, 16).result()), 16)
+        scheduler.close()
+        self.assertRaises(RuntimeError, scheduler.submit, "read_byte", 0x48)
+        self.assertGreaterEqual(scheduler.max_latency[PRIORITY_HIGH], 0)
+
+    def test_bus_ownership(self):
+        with mock.patch("smbus3.scheduler.SMBus") as smbus:
+            with TransferScheduler(3) as scheduler:
+                self.assertIs(scheduler.bus, smbus.return_value)
+        smbus.return_value.close.assert_called_once_with()
+        # Any object besides a bus number or path is used as is, and left open
+        bus = mock.Mock(spec=["read_i2c_block_data", "close"])
+        with TransferScheduler(bus) as scheduler:
+            self.assertIs(scheduler.bus, bus)
+        bus.close.assert_not_called()
@@ -0,0 +1,102 @@
+"""
+tests/test_script.py
+--------------------
+
+Tests for i2ctransfer style transaction scripts.
+"""
+
+import io
+import json
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from smbus3 import SMBus
+from smbus3.script import compile_script, main, run_script
+from smbus3.simulator import RegisterDevice, SimulatedAdapter, simulate
+from smbus3.smbus3 import I2C_RDWR_IOCTL_MAX_MSGS
+
+SCRIPT = """
+# Two devices, one combined transfer before the delay
+w3@0x40 0x10 0xaa 0xbb ; w1 0x10 r2 > ident
+w5@0x41 0x00 0x01+
+w1 0x00 r4>counting
+delay 1ms
+w4@0x41 0x20 0xff=   # fill
+w1 0x20 r3
+stop
+w1@0x41 0x03 r1
+"""
+
+# Register reads of a long polling sequence
+REGISTER_READS = 300
+
+
+class TestScript(unittest.TestCase):
+    def setUp(self):
+        self.adapter = SimulatedAdapter([RegisterDevice(0x40), RegisterDevice(0x41)])
+        self.simulation = simulate({1: self.adapter})
+        self.simulation.__enter__()
+        self.addCleanup(self.simulation.__exit__, None, None, None)
+
+    def test_run(self):
+        plan = compile_script(SCRIPT)
+        self.assertEqual((plan.ioctls, plan.messages), (6, 11))
+        self.assertEqual(plan.steps[3], 0.001)
+        with SMBus(1) as bus:
+            for _ in range(2):
+                result = plan.run(bus)
+                self.assertEqual(
+                    result.reads, [b"\xaa\xbb", b"\x01\x02\x03\x04", b"\xff\xff\xff", b"\x04"]
+                )
+                self.assertEqual(
+                    result.captures, {"ident": b"\xaa\xbb", "counting": b"\x01\x02\x03\x04"}
+                )
+        self.assertEqual(self.adapter.transfers, 12)
+
+    def test_packing(self):
+        script = "\n".join(f"w1@0x40 0x{idx & 0xFF:02x} r1" for idx in range(REGISTER_READS))
+        plan = compile_script(script)
+        self.assertEqual(plan.ioctls, -(-2 * REGISTER_READS // I2C_RDWR_IOCTL_MAX_MSGS))
+        # A write ends its ioctl with a stop condition, e.g. for EEPROM page writes
+        plan = compile_script("w2@0x50 0x00 1\nw2@0x50 0x08 2\nw1 0x00 r1; w1 0x08 r1")
+        self.assertEqual([len(msgs) for msgs, _ in plan.steps], [1, 1, 4])
+        # Transactions are not split between ioctls
+        plan = compile_script("w1@0x40 0x00 r1\n" * I2C_RDWR_IOCTL_MAX_MSGS)
+        self.assertEqual([len(msgs) for msgs, _ in plan.steps], [I2C_RDWR_IOCTL_MAX_MSGS] * 2)
+        with SMBus(1) as bus:
+            self.assertEqual(len(run_script(bus, "w2@0x40 0 7; w1 0 r1; r1 >a").reads), 2)
+        with self.assertRaises(ValueError):
+            compile_script("w1@0x40 0x00 r1 " * I2C_RDWR_IOCTL_MAX_MSGS)
+
+    def test_errors(self):
+        errors = {
+            "r2": "No address",
+            "w2@0x40 0x01": "Expected 2 data bytes",
+            "w1@0x40 0x01 0x02": "Expected a message",
+            "w1@0x80 1": "Address 0x80 out of range",
+            "w1@0x40 0x100": "Data byte 0x100 out of range",
+            "w1@0x40 0x1p": "Unsupported data suffix",
+            "r1@0x40 > 1x": "Invalid capture name",
+            "r1@0x40 >a; r1 >a": "Duplicate capture name",
+            "delay 1 ms": "Expected delay DURATION",
+            "stop now": "stop takes no arguments",
+        }
+        for script, error in errors.items():
+            with self.assertRaisesRegex(ValueError, f"^line 2: {error}"):
+                compile_script(f"# comment\n{script}")
+        with SMBus(1) as bus, self.assertRaises(OSError):
+            run_script(bus, "w1@0x42 0x00")
+
+    def test_main(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            self.assertEqual(main(["1", "w3@0x40 0x00 1 2;", "w1 0x00 r2 >x; r1"]), 0)
+            self.assertEqual(main(["1", "--format", "json", "w1@0x40 0x01 r1"]), 0)
+            self.assertEqual(main(["1", "-n", "w1@0x40 0 r1; delay 5us; r1"]), 0)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[:2], ["x: 0x01 0x02", "0x00"])
+        self.assertEqual(json.loads("".join(lines[2:-4]))["reads"], [[2]])
+        self.assertEqual([lines[-3], lines[-1]], ["delay 0.005ms", "3 messages in 2 ioctls"])
+        with redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["1", "w1@0x40"]), 2)
+            self.assertEqual(main(["1", "r1@0x42"]), 1)
@@ -0,0 +1,150 @@
+"""
+tests/test_simulator.py
+-----------------------
+
+Tests for the simulated adapter and device models.
+"""
+
+import errno
+import threading
+import time
+import unittest
+
+from smbus3 import SMBus, i2c_msg
+from smbus3.simulator import (
+    EEPROM,
+    I2C_M_RECV_LEN,
+    Device,
+    RegisterDevice,
+    SimulatedAdapter,
+    simulate,
+)
+from smbus3.smbus3 import I2C_M_RD, I2C_RDWR, i2c_rdwr_ioctl_data
+
+# Many devices on one bus, as for load tests
+DEVICES = 100
+# Wire time of each quick write in test_wire_time
+QUICK_NS = 50_000_000
+# Bounds on the NACKs of 200 reads with a rate of 0.5
+NACKS = range(50, 150)
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        self.adapter = SimulatedAdapter(RegisterDevice(0x08 + idx) for idx in range(DEVICES))
+        self.simulation = simulate({1: self.adapter})
+        self.simulation.__enter__()
+        self.bus = SMBus(1)
+
+    def tearDown(self):
+        self.bus.close()
+        self.simulation.__exit__(None, None, None)
+
+    def test_smbus_transfers(self):
+        bus = self.bus
+        bus.write_byte_data(0x08, 0x10, 0xAB)
+        self.assertEqual(bus.read_byte_data(0x08, 0x10), 0xAB)
+        bus.write_word_data(0x09, 0x20, 0x1234)
+        self.assertEqual(bus.read_word_data(0x09, 0x20), 0x1234)
+        self.assertEqual(bus.read_byte_data(0x09, 0x21), 0x12)
+        # Auto-increment wraps at the end of the register file
+        bus.write_i2c_block_data(0x0A, 0xFE, [1, 2, 3])
+        self.assertEqual(bus.read_i2c_block_data(0x0A, 0xFE, 3), [1, 2, 3])
+        self.assertEqual(bus.read_byte_data(0x0A, 0x00), 3)
+        # The pointer set by the last transfer is kept
+        self.assertEqual(bus.read_byte(0x0A), 0)
+        bus.write_byte(0x0A, 0xFE)
+        self.assertEqual(bus.read_byte(0x0A), 1)
+        # SMBus block transfers: the first byte is the count
+        bus.write_block_data(0x0B, 0x00, [7, 8, 9])
+        self.assertEqual(bus.read_block_data(0x0B, 0x00), [7, 8, 9])
+        # Process call: the word is written at the command, then the next is read
+        bus.write_word_data(0x0B, 0x42, 0x0304)
+        self.assertEqual(bus.process_call(0x0B, 0x40, 0x0102), 0x0304)
+        self.assertEqual(bus.read_word_data(0x0B, 0x40), 0x0102)
+        bus.write_quick(0x0C)
+        self.assertEqual(self.adapter.transfers, 17)
+
+    def test_rdwr(self):
+        bus = self.bus
+        bus.i2c_rdwr(i2c_msg.write(0x10, [0x00, 1, 2, 3]), i2c_msg.write(0x11, [0x00, 4, 5]))
+        reads = [i2c_msg.read(address, 3) for address in (0x10, 0x11)]
+        bus.i2c_rdwr(i2c_msg.write(0x10, [0x00]), reads[0], i2c_msg.write(0x11, [0x00]), reads[1])
+        self.assertEqual([bytes(read) for read in reads], [b"\x01\x02\x03", b"\x04\x05\x00"])
+        self.assertEqual(bus.read_many(range(0x10, 0x13), 0x01, 2)[0x11], b"\x05\x00")
+        # Receive length: the device sends the count first
+        self.adapter.devices[0x12].registers[0:4] = b"\x02\xaa\xbb\xcc"
+        read = i2c_msg.read(0x12, 33, flags=I2C_M_RD | I2C_M_RECV_LEN)
+        read.buf[0] = b"\x01"
+        ioctl_data = i2c_rdwr_ioctl_data.create(i2c_msg.write(0x12, [0x00]), read)
+        self.adapter.ioctl(None, I2C_RDWR, ioctl_data)
+        self.assertEqual(bytes(ioctl_data.msgs[1]), b"\x02\xaa\xbb")
+
+    def test_nack(self):
+        with self.assertRaises(OSError) as context:
+            self.bus.read_byte_data(0x7F, 0)
+        self.assertEqual(context.exception.errno, errno.ENXIO)
+        flaky = RegisterDevice(0x70, nack_rate=0.5, seed=1)
+        self.adapter.attach(flaky)
+        failures = 0
+        for _ in range(200):
+            try:
+                self.bus.read_byte_data(0x70, 0)
+            except OSError:
+                failures += 1
+        self.assertIn(failures, NACKS)
+        self.assertIs(self.adapter.detach(0x70), flaky)
+        with self.assertRaises(ValueError):
+            self.adapter.attach(RegisterDevice(0x08))
+
+    def test_register_device(self):
+        device = RegisterDevice(
+            0x70,
+            size=0x200,
+            address_bytes=2,
+            read_only={0x101},
+            volatile={0x1FF: lambda device, register: register},
+        )
+        self.adapter.attach(device)
+        self.bus.write_i2c_block_data16(0x70, 0x100, b"\x01\x02\x03")
+        self.assertEqual(bytes(device.registers[0x100:0x103]), b"\x01\x00\x03")
+        self.assertEqual(self.bus.read_i2c_block_data16(0x70, 0x1FE, 3), b"\x00\xff\x00")
+        with self.assertRaises(ValueError):
+            RegisterDevice(0x70, address_bytes=3)
+        self.assertEqual(Device(0x71).read(2), b"\xff\xff")
+
+    def test_eeprom(self):
+        eeprom = EEPROM(0x50, size=64, page_size=8, write_cycle_ns=20_000_000)
+        self.adapter.detach(0x50)
+        self.adapter.attach(eeprom)
+        self.bus.write_i2c_block_data(0x50, 0x06, [1, 2, 3, 4])
+        # Busy during the write cycle
+        self.assertRaises(OSError, self.bus.read_byte_data, 0x50, 0x06)
+        time.sleep(0.03)
+        # The write wrapped within the page, reads do not
+        self.assertEqual(
+            self.bus.read_i2c_block_data(0x50, 0x00, 10), [3, 4] + [255] * 4 + [1, 2, 255, 255]
+        )
+        self.assertEqual(self.bus.read_byte_data(0x50, 0x3F), 255)
+
+    def test_wire_time(self):
+        # Transfers from separate descriptors take turns on the wire
+        self.adapter.byte_ns = QUICK_NS
+        buses = [SMBus(1) for _ in range(2)]
+        threads = [
+            threading.Thread(target=bus.write_quick, args=(0x08 + idx,))
+            for idx, bus in enumerate(buses)
+        ]
+        start = time.perf_counter_ns()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.perf_counter_ns() - start, 2 * QUICK_NS)
+        for bus in buses:
+            bus.close()
+
+    def test_other_buses(self):
+        # Buses which are not simulated still open device nodes
+        with self.assertRaises(FileNotFoundError):
+            SMBus("/nonexistent/i2c-9")
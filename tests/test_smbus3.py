@@ -5,14 +5,21 @@ tests/test_smbus3.py
 Main tests for SMBus class, i2c_msg, and I2cFunc.
 """
 
+import errno
+import threading
+import time
 import unittest
 from contextlib import contextmanager
+from ctypes import memmove
 from unittest import mock
 
 from smbus3 import I2C_M_Bitflag, I2cFunc, SMBus, i2c_msg
 
 # Required I2C constant definitions repeated
 I2C_FUNCS = 0x0705  # Get the adapter functionality mask
+I2C_RDWR = 0x0707
+I2C_SLAVE = 0x0703
+I2C_SLAVE_FORCE = 0x0706
 I2C_SMBUS = 0x0720
 I2C_SMBUS_WRITE = 0
 I2C_SMBUS_READ = 1
@@ -27,7 +34,7 @@ I2C_SMBUS_BLOCK_MAX = 32
 
 MOCK_FD = "Mock file descriptor"
 MOCK_I2C_FUNC_LIMITED = 0xEFF0001
-MOCK_I2C_FUNC_FULL = 0xEFF000B
+MOCK_I2C_FUNC_FULL = 0xFFF800B
 MOCK_MSG = None
 
 # Test buffer for read operations
@@ -42,6 +49,31 @@ def mock_msg_refresh(msg):
     MOCK_MSG = msg
 
 
+def mock_i2c_rdwr(data):
+    """
+    Reproduce combined transfers: a write sets the register offset, a read
+    returns test_buffer from there. Reads of a whole SMBus block at
+    register 0 are answered like the SMBus block mocks: a
+    count of 32 and test_buffer. After the write of a block process call,
+    reads return the written block.
+    """
+    offset = 0
+    written = b""
+    for k in range(data.nmsgs):
+        msg = data.msgs[k]
+        if msg.flags & 1:
+            if written[2:] and written[1] == len(written[2:]):
+                buf = written[1:]
+            elif written == b"\0" and msg.len == I2C_SMBUS_BLOCK_MAX + 1:
+                buf = bytes([32, *test_buffer[:32]])
+            else:
+                buf = bytes(test_buffer[offset : offset + msg.len])
+            memmove(msg.buf, buf[: msg.len].ljust(msg.len, b"\0"), msg.len)
+        elif msg.len:
+            written = bytes(msg)
+            offset = written[0]
+
+
 # Mock open, close and ioctl so we can run our unit tests anywhere.
 def mock_open(*args):
     print(f"Mocking open: {args[0]}")
@@ -66,6 +98,10 @@ def mock_ioctl_limited(fd, command, msg):
         print(f"Setting msg val: 0x{msg.value:X}")
         return
 
+    if command == I2C_RDWR:
+        mock_i2c_rdwr(msg)
+        return
+
     # Reproduce ioctl read operations
     if command == I2C_SMBUS and msg.read_write == I2C_SMBUS_READ:
         offset = msg.command
@@ -105,6 +141,10 @@ def mock_ioctl_full(fd, command, msg):
         print(f"Setting msg val: 0x{msg.value:X}")
         return
 
+    if command == I2C_RDWR:
+        mock_i2c_rdwr(msg)
+        return
+
     # Reproduce ioctl read operations
     if command == I2C_SMBUS and msg.read_write == I2C_SMBUS_READ:
         offset = msg.command
@@ -332,6 +372,148 @@ class TestSMBus(SMBusTestCase):
 
         bus.close()
 
+    def test_read_words(self):
+        bus = SMBus(1)
+        self.assertEqual(list(bus.read_words(80, 0, 3)), [0x0100, 0x0302, 0x0504])
+        self.assertEqual(list(bus.read_words(80, 0, 3, byteorder="big")), [0x0001, 0x0203, 0x0405])
+        words = bus.read_words(80, 0x80, 2, byteorder="big", signed=True)
+        self.assertEqual(words.typecode, "h")
+        self.assertEqual(list(words), [0x8081 - 0x10000, 0x8283 - 0x10000])
+        # Longer than one SMBus block: single I2C_RDWR transfer
+        words = bus.read_words(80, 0, 64)
+        self.assertEqual(words.typecode, "H")
+        self.assertEqual(len(words), 64)
+        self.assertEqual(words[63], 127 * 256 + 126)
+        with self.assertRaises(ValueError):
+            bus.read_words(80, 0, 2, byteorder="middle")
+        for count in (0, -1, 0x8000):
+            with self.assertRaises(ValueError):
+                bus.read_words(80, 0, count)
+        bus.close()
+
+    def test_read_words_tenbit(self):
+        flags = []
+
+        def mock_ioctl_capture(fd, command, msg):
+            if command == I2C_RDWR:
+                flags.extend(msg.msgs[k].flags for k in range(msg.nmsgs))
+            return mock_ioctl_full(fd, command, msg)
+
+        with mock.patch("smbus3.smbus3.ioctl", mock_ioctl_capture):
+            bus = SMBus(1)
+            bus.tenbit = 1
+            self.assertEqual(bus.read_words(0x250, 0, 64)[1], 3 * 256 + 2)
+        ten = I2C_M_Bitflag.I2C_M_TEN
+        self.assertEqual(flags, [ten, ten | I2C_M_Bitflag.I2C_M_RD])
+        bus.close()
+
+    def test_read_many(self):
+        transfers = []
+
+        def mock_ioctl_nack(fd, command, msg):
+            # Devices at 0x45 and 0x66 do not answer
+            if command == I2C_RDWR:
+                addrs = {msg.msgs[k].addr for k in range(msg.nmsgs)}
+                transfers.append(msg.nmsgs)
+                if addrs & {0x45, 0x66}:
+                    raise OSError(errno.ENXIO, "No such device")
+            return mock_ioctl_limited(fd, command, msg)
+
+        bus = SMBus(1)
+        with mock.patch("smbus3.smbus3.ioctl", mock_ioctl_nack):
+            results = bus.read_many(range(0x40, 0x40 + 50), 0x10, 6)
+        self.assertEqual(list(results), list(range(0x40, 0x40 + 50)))
+        failed = {addr for addr, result in results.items() if isinstance(result, OSError)}
+        self.assertEqual(failed, {0x45, 0x66})
+        self.assertEqual(results[0x40], bytes(range(0x10, 0x16)))
+        self.assertEqual(results[0x71], bytes(range(0x10, 0x16)))
+        # Three batches of at most 21 pairs, and the bisections isolating
+        # the two failing devices
+        self.assertEqual(transfers[0], 42)
+        self.assertEqual(transfers.count(42), 2)
+        self.assertLess(len(transfers), 3 + 2 * 2 * 5)
+
+        # Without I2C support, one block read per device
+        bus.funcs = I2cFunc.SMBUS_READ_I2C_BLOCK
+        self.assertEqual(
+            bus.read_many([0x40, 0x41], 0x00, 2), {0x40: b"\x00\x01", 0x41: b"\x00\x01"}
+        )
+        bus.close()
+
+    def test_block_data16(self):
+        writes = []
+
+        def mock_ioctl_capture(fd, command, msg):
+            if command == I2C_RDWR:
+                writes.append(bytes(msg.msgs[0]))
+            return mock_ioctl_limited(fd, command, msg)
+
+        bus = SMBus(1)
+        with mock.patch("smbus3.smbus3.ioctl", mock_ioctl_capture):
+            self.assertEqual(bus.read_i2c_block_data16(80, 0x2010, 4), bytes(range(0x20, 0x24)))
+            self.assertEqual(
+                bus.read_i2c_block_data16(80, 0x1020, 4, byteorder="little"),
+                bytes(range(0x20, 0x24)),
+            )
+            # Any length in a single transfer
+            self.assertEqual(bus.read_i2c_block_data16(80, 0x0000, 100), bytes(range(100)))
+            bus.write_i2c_block_data16(80, 0x0102, [0xAA] * 40)
+        self.assertEqual(writes, [b"\x20\x10", b"\x20\x10", b"\x00\x00", b"\x01\x02" + b"\xaa" * 40])
+        # Messages are reused for repeated accesses of the same shape
+        self.assertEqual(len(bus._thread.prepared), 3)
+        with self.assertRaises(ValueError):
+            bus.read_i2c_block_data16(80, 0, 2, byteorder="middle")
+        for length in (0, -1, 0x10000):
+            with self.assertRaises(ValueError):
+                bus.read_i2c_block_data16(80, 0, length)
+        with self.assertRaises(ValueError):
+            bus.write_i2c_block_data16(80, 0, [1], byteorder="middle")
+        # The register address and the data share the 16-bit message length
+        with self.assertRaises(ValueError):
+            bus.write_i2c_block_data16(80, 0, bytes(0xFFFE))
+        bus.funcs = I2cFunc.I2C | I2cFunc.SMBUS_PEC
+        bus.pec = 1
+        with self.assertRaises(ValueError):
+            bus.write_i2c_block_data16(80, 0, bytes(0xFFFD))
+        bus.close()
+
+    def test_threads(self):
+        slave = {}
+
+        def mock_ioctl_slow(fd, command, msg):
+            # Read back the slave address, yielding to other threads between
+            # the address change and the transfer
+            if command == I2C_SLAVE:
+                slave["address"] = msg
+            elif command == I2C_SMBUS:
+                address = slave["address"]
+                time.sleep(0)
+                msg.data.contents.byte = address
+                return None
+            return mock_ioctl_limited(fd, command, msg)
+
+        bus = SMBus(1)
+        errors = []
+
+        def worker(address):
+            for _ in range(200):
+                if bus.read_byte_data(address, 0) != address:
+                    errors.append(address)
+            # Deadlines only apply to the thread that set them
+            with bus.deadline(0):
+                self.assertRaises(TimeoutError, bus.read_byte_data, address, 0)
+
+        with mock.patch("smbus3.smbus3.ioctl", mock_ioctl_slow):
+            threads = [threading.Thread(target=worker, args=(0x40 + k,)) for k in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(bus.read_byte_data(0x50, 0), 0x50)
+        self.assertEqual(errors, [])
+        self.assertEqual(bus.stats["deadline_timeouts"], 4)
+        bus.close()
+
     def test_write_full(self):
         """
         Test writes with 10bit + PEC enabled.
@@ -450,6 +632,157 @@ class TestSMBus(SMBusTestCase):
         self.assertEqual(bus.timeout, 15)
         bus.close()
 
+    def test_deadline(self):
+        bus = SMBus(1)
+        with bus.deadline(1_000_000):
+            self.assertEqual(bus.read_byte_data(80, 1), 1)
+            # Nested deadlines can only shorten the enclosing one
+            with bus.deadline(0):
+                self.assertRaises(TimeoutError, bus.read_byte_data, 80, 1)
+                self.assertRaises(TimeoutError, bus.i2c_rd, 80, 1)
+            self.assertEqual(bus.read_word_data(80, 0), 256)
+        self.assertEqual(bus.stats["deadline_timeouts"], 2)
+
+        # Transfers expected to overrun the remaining budget are not issued
+        bus._xfer_estimate_ns = 10**9
+        with bus.deadline(1000):
+            self.assertRaises(TimeoutError, bus.read_byte_data, 80, 1)
+        self.assertEqual(bus.stats["deadline_timeouts"], 3)
+
+        # No deadline outside of the with block
+        self.assertEqual(bus.read_byte_data(80, 1), 1)
+        bus.close()
+
+    def test_timestamped(self):
+        bus = SMBus(1)
+        before = time.monotonic_ns()
+        result = bus.timestamped("read_word_data", 80, 0)
+        self.assertEqual(result.value, 256)
+        self.assertLessEqual(before, result.start_ns)
+        self.assertLessEqual(result.start_ns, result.timestamp_ns)
+        self.assertLessEqual(result.timestamp_ns, result.end_ns)
+        self.assertLessEqual(result.end_ns, time.monotonic_ns())
+        raw = bus.timestamped("read_byte_data", 80, 1, clock=time.CLOCK_MONOTONIC_RAW)
+        self.assertEqual(raw.value, 1)
+        # Slave address changes are not timestamped, every transfer is
+        with bus.timestamps() as stamps:
+            bus.read_byte_data(81, 1)
+            bus.read_i2c_block_data(81, 0, 4)
+        self.assertEqual(len(stamps), 2)
+        self.assertLessEqual(stamps[0][1], stamps[1][0])
+        bus.read_byte_data(80, 1)
+        self.assertEqual(len(stamps), 2)
+        self.assertRaises(ValueError, bus.timestamped, "close")
+        bus.close()
+
+    def test_shared(self):
+        calls = []
+
+        def mock_ioctl_shared(fd, command, msg):
+            # Transfers on a shared descriptor happen under its lock
+            calls.append((command, msg if command == I2C_SLAVE else None, shared.lock._is_owned()))
+            return mock_ioctl_limited(fd, command, msg)
+
+        with mock.patch("smbus3.smbus3.os.open", wraps=mock_open) as opened:
+            bus1 = SMBus(1, shared=True)
+            bus2 = SMBus("/dev/i2c-1", shared=True)
+            bus3 = SMBus(1)
+        self.assertEqual(opened.call_count, 2)
+        shared = bus1._shared
+        self.assertIs(bus2._shared, shared)
+        self.assertEqual(shared.refs, 2)
+
+        with mock.patch("smbus3.smbus3.ioctl", mock_ioctl_shared):
+            self.assertEqual(bus1.read_byte_data(80, 1), 1)
+            self.assertEqual(bus2.read_byte_data(80, 2), 2)
+            self.assertEqual(bus2.read_byte_data(81, 2), 2)
+            self.assertEqual(bus1.read_byte_data(80, 3), 3)
+        slaves = [msg for command, msg, _ in calls if command == I2C_SLAVE]
+        self.assertEqual(slaves, [80, 81, 80])
+        self.assertTrue(all(owned for _, _, owned in calls))
+
+        with mock.patch("smbus3.smbus3.os.close", wraps=mock_close) as closed:
+            bus1.close()
+            self.assertEqual(closed.call_count, 0)
+            bus2.close()
+            bus3.close()
+            self.assertEqual(closed.call_count, 2)
+        self.assertEqual(shared.refs, 0)
+
+    def test_lazy(self):
+        with mock.patch("smbus3.smbus3.os.open", wraps=mock_open) as opened:
+            bus = SMBus(1, lazy=True)
+            self.assertIsNone(bus.fd)
+            self.assertEqual(bus.read_byte_data(80, 1), 1)
+            self.assertEqual(opened.call_count, 1)
+            self.assertEqual(bus.read_byte_data(80, 2), 2)
+            self.assertEqual(opened.call_count, 1)
+            bus.close()
+
+            bus = SMBus(1, lazy=True)
+            self.assertEqual(bus.warmup(), MOCK_I2C_FUNC_LIMITED)
+            self.assertEqual(bus.fd, MOCK_FD)
+            bus.close()
+
+            # Never used: never opened
+            bus = SMBus(1, lazy=True)
+            bus.close()
+            self.assertEqual(opened.call_count, 2)
+
+    def test_dispatch(self):
+        # The limited adapter lacks SMBus block reads and block process calls
+        def mock_ioctl_no_block(fd, command, msg):
+            if command == I2C_SMBUS and msg.size == I2C_SMBUS_BLOCK_DATA:
+                raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+            return mock_ioctl_limited(fd, command, msg)
+
+        with mock.patch("smbus3.smbus3.ioctl", wraps=mock_ioctl_no_block) as ioctl:
+            bus = SMBus(1)
+            self.assertEqual(bus.read_block_data(80, 0), list(range(32)))
+            self.assertEqual(bus.block_process_call(80, 1, [1, 2, 3]), [1, 2, 3])
+            self.assertRaises(ValueError, bus.block_process_call, 80, 1, list(range(33)))
+            self.assertEqual(bus.read_byte_data(80, 3), 3)
+            commands = [call.args[1] for call in ioctl.call_args_list]
+        # The functionality is probed after the first native call failed
+        self.assertEqual(commands.count(I2C_FUNCS), 1)
+        # Block reads take a single transfer each
+        self.assertEqual(commands.count(I2C_RDWR), 2)
+        self.assertEqual(commands.count(I2C_SMBUS), 2)
+        self.assertNotIn("read_byte_data", vars(bus))
+
+        # SMBus-only adapter without I2C block transfers
+        bus.funcs = I2cFunc.SMBUS_BYTE_DATA
+        with mock.patch("smbus3.smbus3.ioctl", wraps=mock_ioctl_limited) as ioctl:
+            self.assertEqual(bus.read_i2c_block_data(80, 4, 3), [4, 5, 6])
+            bus.write_i2c_block_data(80, 1, [1, 2])
+        self.assertEqual([call.args[1] for call in ioctl.call_args_list], [I2C_SMBUS] * 5)
+        self.assertEqual((MOCK_MSG.command, MOCK_MSG.data.contents.byte), (2, 2))
+        bus.close()
+
+    def test_dispatch_lazy(self):
+        # Native transfers which succeed never probe the functionality
+        with mock.patch("smbus3.smbus3.ioctl", wraps=mock_ioctl_full) as ioctl:
+            bus = SMBus(1)
+            self.assertEqual(bus.read_byte_data(80, 3), 3)
+            self.assertEqual(bus.read_block_data(80, 0), list(range(32)))
+            bus.write_word_data(80, 1, 0x0203)
+            commands = [call.args[1] for call in ioctl.call_args_list]
+        self.assertNotIn(I2C_FUNCS, commands)
+        self.assertIsNone(bus._funcs)
+        bus.close()
+
+    def test_emulation_force(self):
+        # I2C_RDWR skips the busy address check, the emulation sets the
+        # slave address first
+        bus = SMBus(1)
+        bus.funcs = I2cFunc.I2C
+        with mock.patch("smbus3.smbus3.ioctl", wraps=mock_ioctl_limited) as ioctl:
+            bus.read_byte_data(80, 3)
+            bus.read_byte_data(80, 3, force=True)
+            commands = [call.args[1] for call in ioctl.call_args_list]
+        self.assertEqual(commands, [I2C_SLAVE, I2C_RDWR, I2C_SLAVE_FORCE, I2C_RDWR])
+        bus.close()
+
     def test_retries(self):
         def set_retries(bus, retries=3):
             bus.retries = retries
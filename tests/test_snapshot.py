@@ -0,0 +1,140 @@
+"""
+tests/test_snapshot.py
+----------------------
+
+Tests for shared memory snapshot publishing.
+"""
+
+import time
+import unittest
+from contextlib import contextmanager
+from ctypes import memmove
+from unittest import mock
+
+from smbus3.snapshot import SnapshotPublisher, SnapshotReader, read_register
+
+
+class FakeBus:
+    """
+    Minimal SMBus stand-in backed by a register file, counting transfers.
+    """
+
+    def __init__(self):
+        self.registers = bytearray(range(256))
+        self.transfers = 0
+        self.expired = False
+
+    @contextmanager
+    def deadline(self, timeout_us):
+        self.expired = timeout_us <= 0
+        yield
+        self.expired = False
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        if self.expired:
+            raise TimeoutError("Transfer deadline exceeded")
+        self.transfers += 1
+        return self.registers[register]
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        self.transfers += 1
+        return list(self.registers[register : register + length])
+
+    def i2c_rdwr(self, *msgs):
+        self.transfers += 1
+        register = bytes(msgs[0])[0]
+        memmove(msgs[1].buf, bytes(self.registers[register : register + msgs[1].len]), msgs[1].len)
+
+
+REGISTERS = [(0x48, 0x00, 2), (0x48, 0x10, 1), (0x50, 0x40, 40)]
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_read_register(self):
+        bus = FakeBus()
+        self.assertEqual(read_register(bus, 0x48, 5, 1), b"\x05")
+        self.assertEqual(read_register(bus, 0x48, 5, 3), b"\x05\x06\x07")
+        self.assertEqual(read_register(bus, 0x48, 5, 40), bytes(range(5, 45)))
+        self.assertEqual(bus.transfers, 3)
+
+    def test_publish_and_read(self):
+        bus = FakeBus()
+        with SnapshotPublisher(bus, REGISTERS) as publisher:
+            with SnapshotReader(publisher.name) as reader:
+                self.assertEqual(reader.registers, REGISTERS)
+                self.assertEqual(reader.seq, 0)
+                self.assertEqual(publisher.publish(), 2)
+                snapshot = reader.read()
+                self.assertEqual(snapshot.seq, 2)
+                self.assertGreater(snapshot.timestamp_ns, 0)
+                self.assertEqual(snapshot.values[(0x48, 0x00)], b"\x00\x01")
+                self.assertEqual(snapshot.values[(0x48, 0x10)], b"\x10")
+                self.assertEqual(snapshot.values[(0x50, 0x40)], bytes(range(0x40, 0x68)))
+
+                # Readers never touch the bus
+                transfers = bus.transfers
+                for _ in range(10):
+                    reader.read()
+                self.assertEqual(bus.transfers, transfers)
+
+                bus.registers[0x10] = 0xAA
+                publisher.publish()
+                snapshot = reader.read()
+                self.assertEqual(snapshot.seq, 4)
+                self.assertEqual(snapshot.values[(0x48, 0x10)], b"\xaa")
+
+    def test_background_publishing(self):
+        bus = FakeBus()
+        with SnapshotPublisher(bus, REGISTERS) as publisher:
+            with SnapshotReader(publisher.name) as reader:
+                publisher.start(0.001)
+                deadline = time.monotonic() + 5
+                while reader.seq < 6 and time.monotonic() < deadline:  # noqa: PLR2004
+                    time.sleep(0.001)
+                publisher.stop()
+                snapshot = reader.read()
+                self.assertGreaterEqual(snapshot.seq, 6)
+                self.assertEqual(snapshot.seq % 2, 0)
+
+    def test_deadline(self):
+        bus = FakeBus()
+        with SnapshotPublisher(bus, REGISTERS, deadline_us=1000) as publisher:
+            with SnapshotReader(publisher.name) as reader:
+                self.assertEqual(publisher.publish(), 2)
+                # A cycle running out of time publishes nothing
+                publisher.deadline_us = 0
+                self.assertRaises(TimeoutError, publisher.publish)
+                self.assertEqual(reader.read().seq, 2)
+
+    def test_stuck_writer(self):
+        bus = FakeBus()
+        with SnapshotPublisher(bus, REGISTERS) as publisher:
+            with SnapshotReader(publisher.name) as reader:
+                publisher.publish()
+                # A publisher which died mid-update leaves an odd sequence
+                publisher.shm.buf[8:16] = (3).to_bytes(8, "little")
+                reader.timeout = 0.01
+                with self.assertRaises(TimeoutError):
+                    reader.read()
+
+    def test_layout_limits(self):
+        # Registers not fitting in the u16 fields of the layout are rejected
+        # before any segment is created
+        invalid = [
+            [(0x50, 0x00, 0x8000), (0x51, 0x00, 0x8000)],
+            [(0x50, 0x00, 0x10000)],
+            [(0x50, 0x00, 0)],
+            [(0x50, 0x100, 1)],
+        ]
+        with mock.patch("smbus3.snapshot.shared_memory.SharedMemory") as shm:
+            for registers in invalid:
+                with self.assertRaises(ValueError):
+                    SnapshotPublisher(FakeBus(), registers)
+        shm.assert_not_called()
+
+    def test_not_a_snapshot(self):
+        bus = FakeBus()
+        with SnapshotPublisher(bus, REGISTERS) as publisher:
+            publisher.shm.buf[0:4] = b"XXXX"
+            with self.assertRaises(ValueError):
+                SnapshotReader(publisher.name)
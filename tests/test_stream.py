@@ -0,0 +1,170 @@
+"""
+tests/test_stream.py
+--------------------
+
+Tests for periodic sampling and the stream processing stages.
+"""
+
+import time
+import unittest
+from itertools import islice
+
+from smbus3 import SMBus, stream
+from smbus3.sampling import Jitter, Sample, Sampler, frame_layout
+from smbus3.stream import Aggregator, ChangeDetector, Statistics
+
+from .test_smbus3 import SMBusTestCase
+from .test_snapshot import REGISTERS, FakeBus
+
+
+class TestSampler(unittest.TestCase):
+    def test_frame_layout(self):
+        self.assertEqual(
+            frame_layout(REGISTERS),
+            [((0x48, 0x00), 0, 2), ((0x48, 0x10), 2, 3), ((0x50, 0x40), 3, 43)],
+        )
+
+    def test_sampling(self):
+        bus = FakeBus()
+        sampler = Sampler(bus, REGISTERS, 0.001)
+        samples = list(islice(sampler, 3))
+        self.assertEqual([sample.seq for sample in samples], [1, 2, 3])
+        self.assertEqual(samples[0].frame, bytes((0, 1, 0x10, *range(0x40, 0x68))))
+        self.assertEqual(sampler.frame_size, len(samples[0].frame))
+        self.assertLess(samples[0].timestamp_ns, samples[2].timestamp_ns)
+
+    def test_deadline(self):
+        sampler = Sampler(FakeBus(), REGISTERS, 0.001, deadline_us=0)
+        self.assertRaises(TimeoutError, sampler.sample)
+        sampler.deadline_us = 1000
+        sample = next(iter(sampler))
+        self.assertEqual((sample.seq, sampler.skipped), (2, 0))
+
+    def test_jitter(self):
+        jitter = Jitter(window=4)
+        # Scheduled every 1000 ns, taken 10, 30, 0, 20 and 50 ns late
+        for idx, late in enumerate((10, 30, 0, 20, 50)):
+            jitter.record(idx * 1000, idx * 1000 + late)
+        stats = jitter.statistics()
+        self.assertEqual(stats.samples, 5)
+        self.assertEqual(stats.interval_mean_ns, 1010)
+        # Intervals 1020, 970, 1020, 1030
+        self.assertAlmostEqual(stats.interval_stddev_ns, 550**0.5)
+        # The first deviation fell out of the window
+        self.assertEqual(stats.deviation_ns, {50: 20, 90: 50, 99: 50, 100: 50})
+        jitter.reset()
+        self.assertEqual(jitter.statistics(), (0, 0.0, 0.0, {}))
+
+    def test_iteration_jitter(self):
+        sampler = Sampler(FakeBus(), REGISTERS, 0.001)
+        list(islice(sampler, 5))
+        stats = sampler.jitter.statistics()
+        self.assertEqual(stats.samples, 5)
+        self.assertGreater(stats.interval_mean_ns, 0)
+        self.assertGreaterEqual(stats.deviation_ns[50], 0)
+
+
+class TestSamplerTimestamps(SMBusTestCase):
+    def test_clock(self):
+        registers = [(80, 0, 2), (80, 4, 1), (81, 8, 4)]
+        bus = SMBus(1)
+        sampler = Sampler(bus, registers, 0.001, clock=time.CLOCK_MONOTONIC_RAW)
+        before = time.clock_gettime_ns(time.CLOCK_MONOTONIC_RAW)
+        sample = next(iter(sampler))
+        times = list(sampler.transfer_times)
+        self.assertEqual(times, sorted(times))
+        self.assertLessEqual(before, times[0])
+        self.assertLessEqual(times[0], sample.timestamp_ns)
+        self.assertLessEqual(sample.timestamp_ns, times[-1])
+        self.assertEqual(sampler.jitter.samples, 1)
+        sampler.deadline_us = 0
+        self.assertRaises(TimeoutError, sampler.sample)
+        bus.close()
+
+
+class TestChangeDetector(unittest.TestCase):
+    def test_changes(self):
+        bus = FakeBus()
+        sampler = Sampler(bus, REGISTERS, 0)
+        detector = ChangeDetector(REGISTERS)
+        self.assertEqual(len(detector.update(sampler.sample().frame)), 3)
+        self.assertEqual(detector.update(sampler.sample().frame), {})
+        bus.registers[0x45] = 0
+        self.assertEqual(
+            detector.update(sampler.sample().frame),
+            {(0x50, 0x40): bytes((*range(0x40, 0x45), 0, *range(0x46, 0x68)))},
+        )
+        detector.reset()
+        self.assertEqual(len(detector.update(sampler.sample().frame)), 3)
+
+    def test_deadband(self):
+        registers = [(0x48, 0x00, 2), (0x48, 0x02, 1)]
+        detector = ChangeDetector(registers, deadbands={(0x48, 0x00): 10}, signed=True)
+        frames = [
+            b"\x00\x01\x00",  # 256
+            b"\x05\x01\x00",  # 261: within the deadband
+            b"\x0a\x01\x01",  # 266: still within, compared with the emitted 256
+            b"\x0b\x01\x01",  # 267
+            b"\xff\x00\x01",  # 255
+        ]
+        samples = [Sample(seq, seq * 1000, frame) for seq, frame in enumerate(frames)]
+        changes = list(detector.process(samples))
+        self.assertEqual([change.seq for change in changes], [0, 2, 3, 4])
+        self.assertEqual(changes[1].values, {(0x48, 0x02): b"\x01"})
+        self.assertEqual(changes[2].values, {(0x48, 0x00): b"\x0b\x01"})
+        self.assertEqual(changes[3].values, {(0x48, 0x00): b"\xff\x00"})
+
+
+class TestAggregator(unittest.TestCase):
+    def samples(self):
+        registers = [(0x48, 0x00, 2), (0x48, 0x02, 3), (0x48, 0x05, 1)]
+        values = [(-3, 7), (1, 1), (5, 255), (3, 0), (10, 10)]
+        frames = [
+            value.to_bytes(2, "big", signed=True) + b"abc" + bytes((other,))
+            for value, other in values
+        ]
+        return registers, [Sample(seq, seq * 1000, frame) for seq, frame in enumerate(frames)]
+
+    def test_windows(self):
+        registers, samples = self.samples()
+        aggregator = Aggregator(registers, 2, byteorder="big", signed=True)
+        self.assertEqual(aggregator.keys, [(0x48, 0x00), (0x48, 0x05)])
+        self.assertIsNone(aggregator.update(samples[0]))
+        self.assertEqual(len(aggregator), 1)
+        first = aggregator.update(samples[1])
+        self.assertEqual((first.seq, first.start_ns, first.end_ns, first.samples), (0, 0, 1000, 2))
+        self.assertEqual(first.fields[0x48, 0x00], Statistics(-3, 1, -1.0, 5**0.5))
+        self.assertEqual(first.fields[0x48, 0x05], Statistics(1, 7, 4.0, 5.0))
+        aggregates = list(aggregator.process(samples[2:]))
+        self.assertEqual([aggregate.samples for aggregate in aggregates], [2, 1])
+        self.assertEqual(aggregates[0].fields[0x48, 0x00], Statistics(3, 5, 4.0, 17**0.5))
+        self.assertEqual(aggregates[1].fields[0x48, 0x05], Statistics(10, 10, 10.0, 10.0))
+        self.assertIsNone(aggregator.flush())
+
+    def test_fields(self):
+        registers, samples = self.samples()
+        aggregator = Aggregator(registers, 5, fields=[(0x48, 0x05)])
+        (aggregate,) = aggregator.process(samples)
+        self.assertEqual(list(aggregate.fields), [(0x48, 0x05)])
+        self.assertEqual(aggregate.fields[0x48, 0x05][:3], (0, 255, 54.6))
+        self.assertRaises(ValueError, Aggregator, registers, 5, fields=[(0x48, 0x02)])
+        self.assertRaises(ValueError, Aggregator, registers, 5, fields=[(0x49, 0x00)])
+        self.assertRaises(ValueError, Aggregator, registers, 0)
+        self.assertRaises(ValueError, Aggregator, registers, 5, fields=[])
+        self.assertRaises(ValueError, Aggregator, [(0x48, 0x02, 3)], 5)
+        # Repeated fields are aggregated once
+        aggregator = Aggregator(registers, 5, fields=[(0x48, 0x05), (0x48, 0x00), (0x48, 0x05)])
+        self.assertEqual(aggregator.keys, [(0x48, 0x00), (0x48, 0x05)])
+        (aggregate,) = aggregator.process(samples)
+        self.assertEqual(aggregate.fields[0x48, 0x05][:2], (0, 255))
+
+    @unittest.skipIf(stream.numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        registers, samples = self.samples()
+        expected = list(Aggregator(registers, 2, signed=True).process(samples))
+        numpy, stream.numpy = stream.numpy, None
+        try:
+            fallback = list(Aggregator(registers, 2, signed=True).process(samples))
+        finally:
+            stream.numpy = numpy
+        self.assertEqual(expected, fallback)
@@ -0,0 +1,87 @@
+"""
+tests/test_utilization.py
+-------------------------
+
+Tests for the bus time cost model and utilization accounting.
+"""
+
+import os
+import shutil
+import tempfile
+
+from smbus3 import SMBus, i2c_msg
+from smbus3.utilization import DEFAULT_CLOCK_HZ, BusMeter, bus_clock_hz, msg_bits, smbus_bits
+
+from .test_smbus3 import (
+    I2C_SMBUS_BYTE_DATA,
+    I2C_SMBUS_I2C_BLOCK_DATA,
+    I2C_SMBUS_QUICK,
+    I2C_SMBUS_READ,
+    I2C_SMBUS_WRITE,
+    SMBusTestCase,
+)
+
+
+class TestUtilization(SMBusTestCase):
+    def setUp(self):
+        # Create the fake sysfs first, os.open is mocked below
+        self.tmpdir = tempfile.mkdtemp()
+        of_node = os.path.join(self.tmpdir, "bus", "i2c", "devices", "i2c-1", "of_node")
+        os.makedirs(of_node)
+        with open(os.path.join(of_node, "clock-frequency"), "wb") as f:
+            f.write((400000).to_bytes(4, "big"))
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.tmpdir)
+
+    def test_cost_model(self):
+        # S, address, command, data, P
+        self.assertEqual(smbus_bits(I2C_SMBUS_BYTE_DATA, I2C_SMBUS_WRITE), 29)
+        # Plus Sr and the address again to read
+        self.assertEqual(smbus_bits(I2C_SMBUS_BYTE_DATA, I2C_SMBUS_READ), 39)
+        self.assertEqual(smbus_bits(I2C_SMBUS_BYTE_DATA, I2C_SMBUS_READ, pec=True), 48)
+        self.assertEqual(smbus_bits(I2C_SMBUS_BYTE_DATA, I2C_SMBUS_WRITE, tenbit=True), 38)
+        self.assertEqual(smbus_bits(I2C_SMBUS_I2C_BLOCK_DATA, I2C_SMBUS_READ, 4), 66)
+        self.assertEqual(smbus_bits(I2C_SMBUS_QUICK, I2C_SMBUS_WRITE), 11)
+        self.assertRaises(ValueError, smbus_bits, 6, I2C_SMBUS_READ)
+        self.assertEqual(msg_bits(i2c_msg.write(0x50, [0, 1])), 28)
+
+    def test_clock(self):
+        self.assertEqual(bus_clock_hz("/dev/i2c-1", self.tmpdir), 400000)
+        self.assertEqual(bus_clock_hz("/dev/i2c-2", self.tmpdir), DEFAULT_CLOCK_HZ)
+        self.assertEqual(bus_clock_hz(None, self.tmpdir), DEFAULT_CLOCK_HZ)
+
+    def test_meter(self):
+        meter = BusMeter(sysfs=self.tmpdir)
+        bus = SMBus(1)
+        meter.attach(bus)
+        bus.read_byte_data(0x48, 1)
+        bus.write_byte_data(0x48, 1, 2)
+        bus.i2c_rdwr(i2c_msg.write(0x50, [0]), i2c_msg.read(0x50, 4))
+        self.assertEqual(meter.clock_hz, 400000)
+
+        devices = meter.devices()
+        self.assertEqual(list(devices), [0x48, 0x50])
+        # 2.5 us per bit at 400 kHz
+        self.assertEqual(devices[0x48][:2], (2, (39 + 29) * 2500))
+        self.assertEqual(devices[0x50][:2], (1, 66 * 2500))
+        self.assertGreaterEqual(devices[0x50].latency_ns, 0)
+        adapter = meter.adapter()
+        self.assertEqual(adapter[:2], (3, 134 * 2500))
+        self.assertGreater(adapter.utilization, 0)
+        # The window keeps growing, so the headroom can only increase
+        self.assertGreaterEqual(meter.headroom(), 100 - adapter.utilization)
+
+        # A transfer without messages is not accounted for
+        bus.i2c_rdwr()
+        self.assertEqual(meter.adapter().transfers, 3)
+
+        meter.detach(bus)
+        bus.read_byte_data(0x48, 1)
+        self.assertEqual(meter.adapter().transfers, 3)
+        meter.reset()
+        self.assertEqual(meter.devices(), {})
+        self.assertEqual(meter.adapter()[:3], (0, 0, 0))
+        bus.close()